@@ -4,6 +4,7 @@ import json
 import os
 import sys
 import asyncio
+import time
 from tqdm.asyncio import tqdm
 import json
 from typing import List, Dict
@@ -13,167 +14,42 @@ from typing import List, Dict
 project_root="."
 sys.path.insert(0, project_root)
 
-from utils.client import MistralClientWrapper
 from utils.utils import load_config
-from utils.models import ExtractedIssueList, DetectedIssue, IsValidIssue
-from utils.pptx_utils import extract_text_from_pptx
-from utils.prompts import build_system_prompt, build_user_prompt
-from utils.screenshots import convert_pptx_to_images
+from utils.pptx_utils import extract_text_from_pptx, extract_slide_models_from_pptx
+from utils.screenshots import convert_pptx_to_pdf, pdf_to_images
+from utils.pdf_utils import extract_text_from_pdf
 from utils.image_utils import encode_image, get_image_data_url
-from utils.deduplication import deduplicate_issues
+from utils.results_store import ResultsStore, hash_file
+from utils.jobs import JobManager
+from utils.workspace import Workspace, RenderCache
+from utils.issue_memory import IssueMemory
+from utils.executors import configure_executors, run_io, run_cpu
+from utils.tracing import tracing, trace_path
+from utils.pipeline import process_file_scheduled, process_presentation_streaming, analyze_presentation
 
 IMG_PLACEHOLDER = "https://via.placeholder.com/150"
+# The app state, created by `init_app` in the server process only: the process pool workers import this module too
+RESULTS_STORE = None
+JOBS = None
+RENDER_CACHE = None
+ISSUE_MEMORY = None
+
+
+def init_app(config_path='config/config.yaml'):
+    global RESULTS_STORE, JOBS, RENDER_CACHE, ISSUE_MEMORY
+    config = load_config(config_path)
+    # Results of unchanged checker×slide pairs are reused across runs
+    RESULTS_STORE = ResultsStore('data_cache/results.sqlite')
+    # Blocking calls run in a thread pool, image encoding and parsing in a process pool
+    configure_executors(**config.get('executors', {}))
+    # Analyses run as background jobs on one long-lived event loop shared by all users
+    JOBS = JobManager(max_concurrent=config.get('jobs', {}).get('max_concurrent', 4))
+    # Screenshots of unchanged decks are reused across jobs
+    RENDER_CACHE = RenderCache('data_cache/renders') if config.get('workspaces', {}).get('render_cache') else None
+    # Issues dismissed in the review are suppressed on later runs
+    memory_settings = config.get('memory', {})
+    ISSUE_MEMORY = IssueMemory(memory_settings.get('root', 'data_cache/issue_memory'), memory_settings.get('org', 'default')) if memory_settings.get('enabled') else None
 
-async def run_checker(client: MistralClientWrapper, model: str, checker: dict, user_context: str, slide_content:str|None, image_path: str|None, slide_number: int, pptx_file: str) -> List[DetectedIssue]:
-    system_prompt=build_system_prompt(checker['task'], user_context, checker['criteria'])
-    user_prompt=build_user_prompt(slide_content)
-
-    messages = client.build_messages(
-        system_prompt=system_prompt,
-        user_prompt=user_prompt,
-        image_path=image_path
-    )
-    
-    result = await client.complete_with_retry(
-        model=model,
-        messages=messages,
-        ResponseModel=ExtractedIssueList
-    )
-    
-    issues=[
-        DetectedIssue(
-            extracted_issue=issue,
-            category=checker['name'],
-            page_id=slide_number,
-            file=pptx_file
-        ) for issue in result.issues
-    ]
-    return issues
-
-async def validate_issue_description(client: MistralClientWrapper, model:str, issue_description: str) -> bool:
-    """
-    Validate that the issue description is not useless using Mistral small model.
-
-    Args:
-        client (MistralClientWrapper): The Mistral client wrapper.
-        issue_description (str): The issue description to validate.
-
-    Returns:
-        bool: True if the description is valid, False otherwise.
-    """
-    
-    system_prompt = """
-    Your task is to determine if an issue description for a presentation slide is useful or not.
-    A useful description should be specific, actionable, and provide clear information about what needs to be fixed.
-    Example of invalid description 
-    Respond with only 'true' if the description is useful, or 'false' if it's not.
-    """
-    
-    user_prompt = f"Is this  description useful? '{issue_description}'"
-    
-    messages = client.build_messages(system_prompt=system_prompt, user_prompt=user_prompt)
-    
-    try:
-        result = await client.complete_with_retry(
-            model=model,
-            messages=messages,
-            ResponseModel=IsValidIssue
-        )
-        return result.is_valid
-    except Exception as e:
-        print(f"Error validating issue description: {e}")
-        return False  # Assume invalid if there's an error
-
-async def run_checker(client: MistralClientWrapper, model: str, checker: dict, user_context: str, slide_content:str|None, image_path: str|None, slide_number: int, pptx_file: str) -> List[DetectedIssue]:
-    system_prompt=build_system_prompt(checker['task'], user_context, checker['criteria'])
-    user_prompt=build_user_prompt(slide_content)
-
-    messages = client.build_messages(
-        system_prompt=system_prompt,
-        user_prompt=user_prompt,
-        image_path=image_path
-    )
-    
-    result = await client.complete_with_retry(
-        model=model,
-        messages=messages,
-        ResponseModel=ExtractedIssueList
-    )
-    
-    issues=[
-        DetectedIssue(
-            extracted_issue=issue,
-            category=checker['name'],
-            page_id=slide_number,
-            file=pptx_file
-        ) for issue in result.issues
-    ]
-    return issues
-
-
-async def process_presentation(pptx_path: str, config: Dict, user_context: str, slides_content: dict, screenshots: dict) -> List[DetectedIssue]:
-    # Initialize the client
-    client = MistralClientWrapper(api_key=os.getenv("MISTRAL_API_KEY"))
-    model_text = "mistral-large-latest"
-    model_screenshot = "pixtral-12b-2409"
-    model_validate = "mistral-small-latest"
-    model_embed ="mistral-embed"
-
-    all_tasks = []
-    
-    # Prepare tasks for text-based checkers
-    for checker in config['checkers']:
-        if checker['type'] == 'text':
-            # For each slide
-            for slide_number, slide_content in slides_content.items():
-                all_tasks.append(run_checker(
-                    client, model_text,
-                    checker, user_context, slide_content,
-                    None, # no image_path
-                    int(slide_number),
-                    pptx_path
-                ))
-    
-    # Prepare tasks for screenshot-based checkers
-    for checker in config['checkers']:
-        if checker['type'] == 'screenshot':
-            for page_id, screenshot_path in screenshots.items():
-                all_tasks.append(run_checker(
-                    client, model_screenshot,
-                    checker, user_context, 
-                    None, # no slide content
-                    screenshot_path,
-                    int(page_id),
-                    pptx_path
-                ))
-    
-    # Run all checkers
-    results = await tqdm.gather(*all_tasks, desc="Processing all checkers")
-    
-    # Combine all results
-    all_issues = [issue for result in results for issue in result]
-
-    # Prepare tasks for issue validation
-    validation_tasks = [validate_issue_description(client, model_validate, issue.extracted_issue.issue_description) for issue in all_issues]
-
-    # Run all validation tasks
-    valid_issues = await tqdm.gather(*validation_tasks, desc="Validating issues")
-    
-    # Filter out invalid issues
-    valid_issues = [issue for issue, is_valid in zip(all_issues, valid_issues) if is_valid]
-
-    # Deduplicate
-    print("Deduplicating issues")
-    deduplicated_issues = deduplicate_issues(client, model_embed, valid_issues)
-    
-    print(f"Original issues: {len(all_issues)}")
-    print(f"Valid issues: {len(valid_issues)}")
-    print(f"Deduplicated issues: {len(deduplicated_issues)}")
-
-    # Sort issues by severity (high, medium, low)
-    severity_order = {'high': 0, 'medium': 1, 'low': 2}
-    deduplicated_issues.sort(key=lambda x: severity_order.get(x.extracted_issue.severity.lower(), 3))
-    return deduplicated_issues
 
 def create_slide_html(issues_data, merged_dict):
     slides = {}
@@ -197,43 +73,122 @@ def create_slide_html(issues_data, merged_dict):
         for i, issue in enumerate(issues, 1):
             issue_description = issue.extracted_issue.issue_description
             severity = issue.extracted_issue.severity.capitalize()
-            html_content += f"<p><strong>Issue {i}:</strong> {issue_description} (Severity: {severity})</p>"
+            also_on = [page for page in issue.affected_pages if page != slide_number]
+            also_on_text = f" (Also on slides {', '.join(map(str, also_on))})" if also_on else ""
+            html_content += f"<p><strong>Issue {i}:</strong> {issue_description} (Severity: {severity}){also_on_text}</p>"
         html_content += "</div>"
 
     return html_content
 
 
 
-def process_ppt(context_info, ppt_upload):
-    # Generate mock issues data
+async def load_slides(upload_path):
+    # Text and slide models come from the .pptx, a PDF only has its text; parsing runs in the CPU pool
+    if upload_path.lower().endswith('.pdf'):
+        return await run_cpu(extract_text_from_pdf, upload_path), None
+    return await asyncio.gather(run_cpu(extract_text_from_pptx, upload_path), run_cpu(extract_slide_models_from_pptx, upload_path))
+
+
+def to_pdf(upload_path, output_folder):
+    return upload_path if upload_path.lower().endswith('.pdf') else convert_pptx_to_pdf(upload_path, output_folder)
+
+
+def render_deck(upload_path, output_folder):
+    return {str(page_num): path for page_num, path in pdf_to_images(to_pdf(upload_path, output_folder), output_folder).items()}
+
+
+async def encode_screenshots(img_paths):
+    encoded = await asyncio.gather(*(run_cpu(encode_image, path) for path in img_paths.values()))
+    return {
+        key: {"img_path": get_image_data_url(encoded_image, image_format)}
+        for key, (encoded_image, image_format) in zip(img_paths, encoded)
+    }
+
+
+async def analyse_ppt(job, context_info, upload_path, time_budget=0):
+    # Runs on the shared job loop: blocking steps go to threads, progress and partial results go to the job
+    started = time.monotonic()
     config = load_config('config/config.yaml')
     user_context = context_info
-    output_folder = 'data_temp' 
-
-    # Delete the 'pics' folder if it exists
-    if os.path.exists('data_temp'):
-        shutil.rmtree('data_temp')
-        print("Deleted old 'data_temp' folder")
-
-    # Extract text from the uploaded PowerPoint file
-    slides_content = extract_text_from_pptx(ppt_upload)
-    # Process screenshots
-    ## TODO: remove json layer! unnecessary
-    img_paths = json.loads(convert_pptx_to_images(ppt_upload, output_folder))
-
-    merged_dict = {}
-    for key in slides_content.keys():
-        if key in img_paths:
-            path=img_paths[str(key)]
-            print("query", key, " ",path)
-            encoded_image, image_format = encode_image(path)
-            img_payload= get_image_data_url(encoded_image, image_format)
-            merged_dict[key] = {
-                "img_path": img_payload,
-                "text": slides_content[str(key)]
-            }
- 
-    issues_data = asyncio.run(process_presentation(ppt_upload.name, config, user_context, slides_content, img_paths))
+    settings = config.get('workspaces', {})
+
+    # Each job writes to a folder of its own, removed when the job ends, and a trace of its own if tracing is on
+    with tracing(trace_path(config, upload_path)), Workspace(settings.get('root', 'data_temp'), settings.get('quota_mb')) as workspace:
+        output_folder = workspace.path
+
+        def on_progress(done, total):
+            workspace.check_quota()
+            job.update(done, total)
+
+        # Screenshots of a deck checked before are reused, copied into the workspace
+        deck_hash = await run_io(hash_file, upload_path)
+        cached = await run_io(RENDER_CACHE.get, deck_hash, output_folder) if RENDER_CACHE is not None else None
+        if cached is not None:
+            workspace.check_quota()
+
+        # The deduplicated issues so far, by cluster, shown while the job runs
+        deduplicated = job.partial.setdefault('deduplicated', {})
+        def on_dedup(events):
+            for event in events:
+                for cluster_id in event.removed_clusters:
+                    deduplicated.pop(cluster_id, None)
+                deduplicated[event.cluster_id] = event.issue
+
+        streaming = config.get('streaming', {})
+        coverage = None
+        errors = []
+        if streaming.get('enabled') and not time_budget:
+            # Bounded-memory mode: slides are rendered, checked and released a few at a time
+            slides_content, slide_models = await load_slides(upload_path)
+            if cached is None:
+                job.message = "Converting slides"
+                pdf_path = await run_io(to_pdf, upload_path, output_folder)
+                workspace.check_quota()
+            else:
+                pdf_path = None
+
+            # Keep only small thumbnails for the page view instead of full-size screenshots, show each slide as soon as it is checked
+            merged_dict = job.partial.setdefault('merged_dict', {})
+            job.message = "Checking slides"
+            def on_slide(slide_result):
+                merged_dict[str(slide_result.page_id)] = {"img_path": slide_result.thumbnail_url or IMG_PLACEHOLDER}
+                errors.extend(slide_result.errors)
+                on_progress(len(merged_dict), len(slides_content))
+
+            issues_data = await process_presentation_streaming(
+                pdf_path, upload_path, config, user_context, slides_content, output_folder, slide_models,
+                store=RESULTS_STORE, max_in_flight=streaming.get('max_in_flight', 4), on_slide=on_slide, memory=ISSUE_MEMORY, on_dedup=on_dedup,
+                screenshots=cached, max_concurrency=config.get('scheduling', {}).get('max_concurrency')
+            )
+        else:
+            if time_budget:
+                # Best-effort mode: the most valuable checks run first and the run returns within the budget
+                slides_content, slide_models = await load_slides(upload_path)
+                if cached is not None:
+                    img_paths = cached
+                else:
+                    job.message = "Rendering slides"
+                    img_paths = await run_io(render_deck, upload_path, output_folder)
+                    workspace.check_quota()
+
+                job.message = "Checking slides"
+                report = await analyze_presentation(
+                    upload_path, config, user_context, slides_content, img_paths, slide_models, store=RESULTS_STORE,
+                    time_budget=max(time_budget - (time.monotonic() - started), 1) if time_budget else None, on_progress=on_progress,
+                    memory=ISSUE_MEMORY, max_concurrency=config.get('scheduling', {}).get('max_concurrency'), on_dedup=on_dedup
+                )
+                issues_data, coverage, errors = report.issues, report.coverage, report.errors
+            else:
+                # Text checkers run while LibreOffice converts and renders (unless the screenshots are cached), each screenshot checker starts once its page is rendered
+                job.message = "Checking slides"
+                issues_data, img_paths, errors = await process_file_scheduled(
+                    upload_path, config, user_context, output_folder, store=RESULTS_STORE, on_progress=on_progress, memory=ISSUE_MEMORY, screenshots=cached,
+                    max_concurrency=config.get('scheduling', {}).get('max_concurrency'), on_dedup=on_dedup
+                )
+
+            if RENDER_CACHE is not None and cached is None:
+                await run_io(RENDER_CACHE.put, deck_hash, img_paths)
+            merged_dict = await encode_screenshots(img_paths)
     
     # Create the HTML content for slide view
     slide_html = create_slide_html(issues_data, merged_dict)
@@ -244,29 +199,99 @@ def process_ppt(context_info, ppt_upload):
     
     summary = f"Total issues detected: {total_issues}\n"
     summary += f"High severity issues: {high_severity_issues}"
-    # Return both the summary and the HTML content
-    return summary, slide_html
+    if coverage is not None and coverage.deadline_hit:
+        summary += f"\nTime budget hit: {coverage.completed_tasks}/{coverage.total_tasks} checks done, "
+        summary += f"slides not fully checked: {', '.join(map(str, coverage.slides_partial + coverage.slides_uncovered))}"
+    if errors:
+        summary += f"\nFailed checks: " + ", ".join(f"{error.checker} on slide {error.page_id}" if error.page_id is not None else error.checker for error in errors)
+    # Return the summary, the HTML content and the issues for the review
+    return summary, slide_html, issues_data
+
+
+def submit_analysis(context_info, ppt_upload, time_budget=0):
+    # Returns at once, the timer polls the job until it is finished
+    if ppt_upload is None:
+        return None, "Please upload a presentation", gr.Timer(active=False)
+    upload_path = getattr(ppt_upload, 'name', ppt_upload)
+    job_id = JOBS.submit(lambda job: analyse_ppt(job, context_info, upload_path, time_budget))
+    return job_id, "Queued", gr.Timer(active=True)
+
+
+def poll_analysis(job_id):
+    job = JOBS.get(job_id)
+    if job is None:
+        return gr.update(), gr.update(), gr.Timer(active=False), gr.update()
+    if job.status == 'done':
+        summary, slide_html, issues_data = job.result
+        choices = [(f"Slide {issue.page_id}: {issue.extracted_issue.issue_description}", index) for index, issue in enumerate(issues_data)]
+        return summary, slide_html, gr.Timer(active=False), gr.update(choices=choices, value=[])
+    if job.is_finished:
+        return f"Analysis {job.status}: {job.error or ''}", "", gr.Timer(active=False), gr.update()
+
+    # Still running: show the progress and whatever slides are ready
+    summary = job.message
+    if job.total:
+        summary += f": {job.done}/{job.total} ({job.progress:.0%})"
+    slide_html = create_slide_html(list(dict(job.partial.get('deduplicated', {})).values()), dict(job.partial.get('merged_dict', {})))
+    return summary, slide_html, gr.Timer(active=True), gr.update()
+
+
+def review_issues(job_id, selected, verdict):
+    # Remembered for this deck, later runs suppress the dismissed issues before validating them
+    job = JOBS.get(job_id)
+    if ISSUE_MEMORY is None:
+        return "Issue memory is disabled (see `memory` in config/config.yaml)"
+    if job is None or job.status != 'done' or not selected:
+        return "Select issues of a finished analysis first"
+    issues_data = job.result[2]
+    ISSUE_MEMORY.record([issues_data[index] for index in selected], verdict)
+    return f"Marked {len(selected)} issues as {verdict}"
 
 # Building the Gradio interface
-with gr.Blocks() as demo:
-    gr.Markdown("Slide Doctor")
+def build_interface():
+    with gr.Blocks() as demo:
+        gr.Markdown("Slide Doctor")
 
-    context_input = gr.Textbox(label="Context Information", placeholder="Enter context for the presentation")
-    ppt_upload = gr.File(label="Upload PPTX", file_count="single", file_types=[".pptx"])
+        context_input = gr.Textbox(label="Context Information", placeholder="Enter context for the presentation")
+        ppt_upload = gr.File(label="Upload PPTX or PDF", file_count="single", file_types=[".pptx", ".pdf"])
 
-    generate_button = gr.Button("Analyse")
+        time_budget_input = gr.Number(label="Time budget in seconds (0 = no limit)", value=0, precision=0)
 
-    gr.Markdown("### Summary")
-    summary_output = gr.Textbox(label="Summary", lines=4, interactive=False)
+        generate_button = gr.Button("Analyse")
 
-    gr.Markdown("### Page View")
-    slide_sections_container = gr.HTML("")  # Use HTML component to dynamically render slide sections
+        gr.Markdown("### Summary")
+        summary_output = gr.Textbox(label="Summary", lines=4, interactive=False)
 
-    # Generate Page View on button click
-    generate_button.click(
-        process_ppt,
-        inputs=[context_input, ppt_upload],
-        outputs=[summary_output, slide_sections_container]
-    )
+        gr.Markdown("### Page View")
+        slide_sections_container = gr.HTML("")  # Use HTML component to dynamically render slide sections
 
-demo.launch()
+        gr.Markdown("### Review")
+        issue_picker = gr.CheckboxGroup(label="Issues", choices=[])
+        with gr.Row():
+            dismiss_button = gr.Button("Dismiss selected")
+            accept_button = gr.Button("Accept selected")
+        review_output = gr.Markdown("")
+
+        # The analysis runs as a background job, the timer polls its progress
+        job_state = gr.State(None)
+        poll_timer = gr.Timer(1.0, active=False)
+
+        # Generate Page View on button click
+        generate_button.click(
+            submit_analysis,
+            inputs=[context_input, ppt_upload, time_budget_input],
+            outputs=[job_state, summary_output, poll_timer]
+        )
+        poll_timer.tick(
+            poll_analysis,
+            inputs=[job_state],
+            outputs=[summary_output, slide_sections_container, poll_timer, issue_picker]
+        )
+        dismiss_button.click(lambda job_id, selected: review_issues(job_id, selected, 'dismissed'), inputs=[job_state, issue_picker], outputs=[review_output])
+        accept_button.click(lambda job_id, selected: review_issues(job_id, selected, 'accepted'), inputs=[job_state, issue_picker], outputs=[review_output])
+    return demo
+
+# Guarded, as the process pool workers import this module
+if __name__ == "__main__":
+    init_app()
+    build_interface().launch()
@@ -0,0 +1,156 @@
+"""
+Check a folder (or glob) of decks in one run.
+
+All decks share one rate-limited client, so the concurrency budget holds for the whole batch. Every finished
+checker×slide task is appended to a JSONL checkpoint; running the same command again after a crash resumes
+from it without redoing finished work.
+
+    python scripts/batch_check.py "decks/*.pptx" --checkpoint data_batch/checkpoint.jsonl --context "Investor update"
+"""
+import os
+import sys
+import glob
+import time
+import shutil
+import asyncio
+import argparse
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from utils.client import MistralClientWrapper, RateLimitedClient
+from utils.utils import load_config
+from utils.checkpoint import Checkpoint
+from utils.issue_memory import IssueMemory
+from utils.results_store import hash_file
+from utils.pptx_utils import extract_text_from_pptx, extract_slide_models_from_pptx
+from utils.pdf_utils import extract_text_from_pdf
+from utils.screenshots import convert_pptx_to_pdf, pdf_to_images
+from utils.pipeline import analyze_presentation
+from utils.executors import configure_executors, run_io, run_cpu
+from utils.tracing import tracing, trace_path
+
+DECK_EXTENSIONS = ('.pptx', '.pdf')
+
+
+def find_decks(source: str) -> list[str]:
+    """The .pptx and .pdf files in a directory, or matching a glob, without the lock files Office leaves next to open decks."""
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+    else:
+        paths = glob.glob(source, recursive=True)
+    return sorted(
+        path for path in paths
+        if path.lower().endswith(DECK_EXTENSIONS) and not os.path.basename(path).startswith('~$') and os.path.isfile(path)
+    )
+
+
+async def check_deck(path: str, config: dict, user_context: str, client: RateLimitedClient, checkpoint: Checkpoint, output_folder: str, convert_lock: asyncio.Lock, memory: IssueMemory | None = None) -> int:
+    """
+    Check one deck, unless the checkpoint says it is done.
+
+    Returns:
+        int: The number of slides checked in this run (0 if the deck was done already).
+    """
+    # The content hash keeps an edited deck from resuming stale results
+    deck_hash = await run_io(hash_file, path)
+    deck_id = f"{os.path.basename(path)}:{deck_hash[:16]}"
+    if checkpoint.get_deck(deck_id) is not None:
+        print(f"Skipping {path}, done in an earlier run")
+        return 0
+
+    workspace = os.path.join(output_folder, deck_hash[:16])
+    os.makedirs(workspace, exist_ok=True)
+    try:
+        if path.lower().endswith('.pdf'):
+            pdf_path = path
+            slides_content, slide_models = await run_cpu(extract_text_from_pdf, path), None
+        else:
+            slides_content, slide_models = await asyncio.gather(
+                run_cpu(extract_text_from_pptx, path), run_cpu(extract_slide_models_from_pptx, path)
+            )
+            try:
+                # LibreOffice runs one conversion at a time per user profile
+                async with convert_lock:
+                    pdf_path = await run_io(convert_pptx_to_pdf, path, workspace)
+            except Exception as e:
+                print(f"Error converting {path} to PDF, checking without screenshots: {e}")
+                pdf_path = None
+
+        screenshots = {}
+        if pdf_path is not None and os.path.exists(pdf_path):
+            screenshots = {str(page_num): image_path for page_num, image_path in (await run_io(pdf_to_images, pdf_path, workspace)).items()}
+
+        report = await analyze_presentation(
+            path, config, user_context, slides_content, screenshots, slide_models,
+            deck_id=deck_id, client=client, checkpoint=checkpoint, memory=memory,
+            max_concurrency=config.get('scheduling', {}).get('max_concurrency')
+        )
+        checkpoint.put_deck(deck_id, report.issues, len(slides_content))
+        print(f"{path}: {len(report.issues)} issues, {len(report.errors)} failed checker tasks")
+        return len(slides_content)
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Check a folder of decks with resumable checkpoints.")
+    parser.add_argument("source", help="A directory or a glob of .pptx/.pdf files")
+    parser.add_argument("--checkpoint", default="data_batch/checkpoint.jsonl", help="The JSONL checkpoint to append to and resume from")
+    parser.add_argument("--context", default="", help="The context of the presentations")
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--output-folder", default="data_batch", help="The folder for the temporary PDFs and screenshots")
+    parser.add_argument("--concurrency", type=int, default=8, help="The maximum number of API requests in flight across all decks")
+    parser.add_argument("--requests-per-second", type=float, default=None, help="The maximum API request rate across all decks")
+    parser.add_argument("--decks-in-flight", type=int, default=2, help="The number of decks checked at the same time")
+    parser.add_argument("--trace", default=None, help="Export a Chrome trace of the run to this JSON file (see the `tracing` config section)")
+    args = parser.parse_args()
+
+    decks = find_decks(args.source)
+    print(f"Found {len(decks)} decks")
+    config = load_config(args.config)
+    configure_executors(**config.get('executors', {}))
+    client = RateLimitedClient(
+        MistralClientWrapper(api_key=os.getenv("MISTRAL_API_KEY")),
+        max_concurrency=args.concurrency, requests_per_second=args.requests_per_second
+    )
+    checkpoint = Checkpoint(args.checkpoint)
+    # Issues dismissed in earlier reviews are not validated or reported again
+    memory_settings = config.get('memory', {})
+    memory = IssueMemory(memory_settings.get('root', 'data_cache/issue_memory'), memory_settings.get('org', 'default')) if memory_settings.get('enabled') else None
+    convert_lock = asyncio.Lock()
+    window = asyncio.Semaphore(args.decks_in_flight)
+
+    started = time.monotonic()
+    slides_done = 0
+    failed = []
+
+    async def run_deck(path):
+        nonlocal slides_done
+        async with window:
+            try:
+                slides = await check_deck(path, config, args.context, client, checkpoint, args.output_folder, convert_lock, memory)
+            except Exception as e:
+                # Not marked done, so the next run retries it
+                print(f"Error checking {path}: {e}")
+                failed.append(path)
+                return
+            slides_done += slides
+            minutes = (time.monotonic() - started) / 60
+            print(f"Throughput: {slides_done / minutes:.1f} slides/min ({slides_done} slides in {minutes:.1f} min)")
+
+    try:
+        with tracing(args.trace or trace_path(config, 'batch')):
+            await asyncio.gather(*(run_deck(path) for path in decks))
+    finally:
+        checkpoint.close()
+
+    minutes = (time.monotonic() - started) / 60
+    print(f"Checked {len(decks) - len(failed)}/{len(decks)} decks, {slides_done} slides in {minutes:.1f} min "
+          f"({slides_done / max(minutes, 1e-9):.1f} slides/min)")
+    for path in failed:
+        print(f"Failed: {path}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
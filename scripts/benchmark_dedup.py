@@ -0,0 +1,76 @@
+"""
+Compare the exact and the LSH deduplication on generated, clustered issue embeddings.
+
+Reports the time of each method, the share of the similar pairs the LSH finds and the share of keep decisions
+that agree with the exact deduplication, for a few `recall` settings.
+
+    python scripts/benchmark_dedup.py --sizes 2000 10000 50000 --recalls 0.9 0.99 0.999
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from utils.deduplication import dedupe_by_similarity, dedupe_by_similarity_ann, lsh_candidate_pairs, normalized_matrix
+
+
+def generate_embeddings(num_issues: int, dim: int, duplicate_share: float, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Embeddings where about `duplicate_share` of the issues are noisy copies of another issue, with random severities.
+    """
+    rng = np.random.default_rng(seed)
+    num_originals = max(1, int(num_issues * (1 - duplicate_share)))
+    originals = rng.standard_normal((num_originals, dim)).astype(np.float32)
+    copies = originals[rng.integers(num_originals, size=num_issues - num_originals)]
+    # Noise scaled so that most copies land above a 0.9 similarity and some close to it
+    noise = rng.standard_normal(copies.shape).astype(np.float32) * rng.uniform(0.1, 0.5, size=(len(copies), 1)).astype(np.float32)
+    embeddings = np.concatenate([originals, copies + noise])[rng.permutation(num_issues)]
+    severities = rng.integers(1, 4, size=num_issues)
+    return embeddings, severities
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark exact vs LSH deduplication.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 10000, 30000])
+    parser.add_argument("--recalls", type=float, nargs="+", default=[0.9, 0.99, 0.999])
+    parser.add_argument("--dim", type=int, default=1024, help="The embedding size (1024 for mistral-embed)")
+    parser.add_argument("--duplicates", type=float, default=0.3, help="The share of issues that are copies")
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'issues':>8} {'method':>12} {'seconds':>9} {'pair recall':>12} {'agreement':>10} {'kept':>8}")
+    for size in args.sizes:
+        embeddings, severities = generate_embeddings(size, args.dim, args.duplicates, args.seed)
+        exact_keep, exact_seconds = timed(dedupe_by_similarity, embeddings, severities, args.threshold)
+        exact_keep = np.array(exact_keep)
+        print(f"{size:>8} {'exact':>12} {exact_seconds:>9.2f} {'':>12} {'':>10} {exact_keep.sum():>8}")
+
+        # The similar pairs at full recall, to measure the share the LSH finds
+        matrix = normalized_matrix(embeddings)
+        reference_pairs, reference_similarities = lsh_candidate_pairs(matrix, args.threshold, recall=1 - 1e-9, seed=args.seed)
+        reference = set(map(tuple, reference_pairs[reference_similarities > args.threshold].tolist()))
+
+        for recall in args.recalls:
+            ann_keep, ann_seconds = timed(dedupe_by_similarity_ann, embeddings, severities, args.threshold, recall=recall, seed=args.seed)
+            ann_keep = np.array(ann_keep)
+            pairs, similarities = lsh_candidate_pairs(matrix, args.threshold, recall=recall, seed=args.seed)
+            found = set(map(tuple, pairs[similarities > args.threshold].tolist()))
+            pair_recall = len(found & reference) / max(len(reference), 1)
+            agreement = (ann_keep == exact_keep).mean()
+            print(f"{size:>8} {f'ann@{recall}':>12} {ann_seconds:>9.2f} {pair_recall:>12.4f} {agreement:>10.4f} {ann_keep.sum():>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Calibrate the duplicate threshold of the local embeddings against mistral-embed.
+
+Embeds the same issue descriptions with both, and maps the mistral-embed threshold to the local similarity
+that flags the same share of pairs as duplicates. Issues come from a batch checkpoint (real findings, see
+scripts/batch_check.py) or, without one, from the mock issues.
+
+    python scripts/calibrate_embeddings.py --checkpoint data_batch/checkpoint.jsonl
+"""
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from utils.client import MistralClientWrapper
+from utils.mocks import generate_mock_detected_issues
+from utils.embeddings import HashedNgramEmbedder, pairwise_similarities, calibrate_threshold, MISTRAL_SIMILARITY_THRESHOLD
+
+
+def load_descriptions(checkpoint_path: str | None, limit: int) -> list[str]:
+    """The distinct issue descriptions of a checkpoint, or of the mock issues."""
+    if checkpoint_path is None:
+        return list(dict.fromkeys(issue.extracted_issue.issue_description for issue in generate_mock_detected_issues()))
+    descriptions = []
+    with open(checkpoint_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            descriptions += [issue['extracted_issue']['issue_description'] for issue in record.get('issues', [])]
+    return list(dict.fromkeys(descriptions))[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate the local dedup threshold against mistral-embed.")
+    parser.add_argument("--checkpoint", default=None, help="A batch checkpoint to take the issue descriptions from")
+    parser.add_argument("--limit", type=int, default=500, help="The maximum number of descriptions")
+    parser.add_argument("--threshold", type=float, default=MISTRAL_SIMILARITY_THRESHOLD, help="The mistral-embed duplicate threshold")
+    args = parser.parse_args()
+
+    descriptions = load_descriptions(args.checkpoint, args.limit)
+    print(f"Embedding {len(descriptions)} descriptions")
+    client = MistralClientWrapper(api_key=os.getenv("MISTRAL_API_KEY"))
+    reference = pairwise_similarities(client.get_embeddings("mistral-embed", descriptions))
+    local = pairwise_similarities(HashedNgramEmbedder().get_embeddings("local", descriptions))
+
+    threshold = calibrate_threshold(reference, local, args.threshold)
+    duplicates = reference > args.threshold
+    agreement = np.mean((local > threshold) == duplicates)
+    print(f"Pairs: {len(reference)}, duplicates at mistral-embed > {args.threshold}: {duplicates.sum()}")
+    print(f"Local threshold: {threshold:.3f} (pair decisions agreeing with mistral-embed: {agreement:.1%})")
+    print(f"Set it in config/config.yaml under deduplication: similarity_threshold: {threshold:.3f}")
+
+if __name__ == "__main__":
+    main()
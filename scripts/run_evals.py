@@ -1 +1,178 @@
-# TODO: update to check our test data vs labels
\ No newline at end of file
+"""
+Benchmark the full pipeline (extract, render, check, validate, dedup) against a local mock LLM backend.
+
+Runs `process_file_scheduled` on the decks in `data/` and on synthetic decks of the given sizes, with
+`MockLLMClient` standing in for the API (realistic latency, no network, no cost). Each deck runs in a
+fresh process, so its peak RSS is its own. Results are saved as JSON to compare across versions:
+
+    python scripts/run_evals.py --synthetic 10 100 500 --latency-scale 0.1
+    python scripts/run_evals.py --compare data_evals/benchmark-20241019-120000.json
+    python scripts/run_evals.py --synthetic 100 --trace-folder data_traces  # where the time goes, per span
+
+Without LibreOffice, .pptx decks are checked without screenshots (see `convert` in the errors).
+"""
+import os
+import sys
+import glob
+import json
+import time
+import asyncio
+import argparse
+import resource
+import subprocess
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import fitz  # PyMuPDF
+
+from utils.utils import load_config
+from utils.mocks import MockLLMClient
+from utils.workspace import Workspace
+from utils.tracing import tracing
+from utils.executors import configure_executors, shutdown_executors
+from utils.pipeline import process_file_scheduled
+from utils.pptx_utils import extract_text_from_pptx
+
+WORDS = (
+    "revenue growth margin customer market strategy pipeline forecast quarter region product launch "
+    "pricing retention churn segment partner channel budget hiring roadmap platform analytics"
+).split()
+
+
+def make_synthetic_deck(path: str, num_slides: int, seed: int = 0) -> str:
+    """A 16:9 PDF deck with a title, bullet points, a simple bar chart on every third slide and a footer."""
+    doc = fitz.open()
+    for index in range(num_slides):
+        page = doc.new_page(width=960, height=540)
+        words = [WORDS[(seed + index * 7 + k * 3) % len(WORDS)] for k in range(24)]
+        page.insert_text((60, 80), f"{words[0].capitalize()} {words[1]} update", fontsize=32)
+        for line in range(4):
+            page.insert_text((80, 160 + line * 50), "• " + " ".join(words[4 + line * 5:9 + line * 5]), fontsize=20)
+        if index % 3 == 2:
+            for bar in range(5):
+                height = 40 + ((seed + index + bar * 37) % 120)
+                page.draw_rect(fitz.Rect(620 + bar * 50, 420 - height, 655 + bar * 50, 420), fill=(0.2, 0.4, 0.8))
+        page.insert_text((60, 520), f"Confidental - {index + 1}", fontsize=10)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def peak_rss_mb(who: int) -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_case(path: str, config_path: str, latency_scale: float, trace_folder: str | None = None) -> dict:
+    """Check one deck in this (fresh) process and measure it."""
+    config = load_config(config_path)
+    configure_executors(**config.get('executors', {}))
+    client = MockLLMClient(latency_scale=latency_scale)
+    stage_times = {}
+    trace = os.path.join(trace_folder, os.path.splitext(os.path.basename(path))[0] + '.json') if trace_folder else None
+    started = time.perf_counter()
+    with tracing(trace), Workspace(os.path.join(project_root, 'data_temp')) as workspace:
+        issues, screenshots, errors = asyncio.run(process_file_scheduled(
+            path, config, "Benchmark run", workspace.path, client=client, stage_times=stage_times,
+            max_concurrency=config.get('scheduling', {}).get('max_concurrency')
+        ))
+    wall_seconds = time.perf_counter() - started
+    shutdown_executors()
+
+    if path.lower().endswith('.pdf'):
+        with fitz.open(path) as doc:
+            slides = doc.page_count
+    else:
+        slides = len(extract_text_from_pptx(path))
+    requests_by_model = {key.split(':', 1)[1]: count for key, count in client.stats.items() if key.startswith('requests:')}
+    return {
+        'deck': os.path.relpath(path, project_root),
+        'slides': slides,
+        'screenshots': len(screenshots),
+        'issues': len(issues),
+        'errors': [f"{error.checker}: {error.error_type}" for error in errors],
+        'wall_seconds': round(wall_seconds, 3),
+        'stage_seconds': {kind: round(seconds, 3) for kind, seconds in stage_times.items()},
+        'requests': client.stats['requests'],
+        'requests_by_model': requests_by_model,
+        'bytes_sent': client.stats['bytes_sent'],
+        'peak_rss_mb': round(peak_rss_mb(resource.RUSAGE_SELF), 1),
+        'peak_rss_workers_mb': round(peak_rss_mb(resource.RUSAGE_CHILDREN), 1),
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=project_root, capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def print_results(results: list, baseline: dict | None = None) -> None:
+    previous = {result['deck']: result for result in (baseline or {}).get('results', [])}
+    print(f"{'deck':<45} {'wall s':>8} {'change':>8} {'requests':>9} {'MB sent':>8} {'peak MB':>8}  stage seconds")
+    for result in results:
+        delta = ""
+        if result['deck'] in previous:
+            delta = f"{result['wall_seconds'] - previous[result['deck']]['wall_seconds']:+.2f}"
+        stages = ", ".join(f"{kind} {seconds:.2f}" for kind, seconds in sorted(result['stage_seconds'].items(), key=lambda item: -item[1]))
+        print(f"{result['deck']:<45} {result['wall_seconds']:>8.2f} {delta:>8} {result['requests']:>9} "
+              f"{result['bytes_sent'] / 1e6:>8.2f} {result['peak_rss_mb']:>8.1f}  {stages}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline against a mock LLM backend.")
+    parser.add_argument("--synthetic", type=int, nargs="*", default=[10, 100, 500], help="The slide counts of the synthetic decks")
+    parser.add_argument("--no-data", action="store_true", help="Skip the decks in data/")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Scale the mock latencies, eg 0.1 for quick runs")
+    parser.add_argument("--config", default="config/config.yaml")
+    parser.add_argument("--output", default=None, help="The JSON file to save, by default data_evals/benchmark-<time>.json")
+    parser.add_argument("--compare", default=None, help="An earlier results JSON to show the wall time changes against")
+    parser.add_argument("--trace-folder", default=None, help="Export a Chrome trace of each deck's run to this folder")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.join(project_root, 'data_evals'), exist_ok=True)
+    decks = [] if args.no_data else sorted(glob.glob(os.path.join(project_root, 'data', '*.pdf')) + glob.glob(os.path.join(project_root, 'data', '*.pptx')))
+    # Skip the lock files Office leaves next to open decks (~$name.pptx)
+    decks = [path for path in decks if not os.path.basename(path).startswith('~$')]
+    for num_slides in args.synthetic:
+        path = os.path.join(project_root, 'data_evals', f"synthetic-{num_slides}.pdf")
+        if not os.path.exists(path):
+            make_synthetic_deck(path, num_slides)
+        decks.append(path)
+
+    results = []
+    for path in decks:
+        print(f"Benchmarking {os.path.relpath(path, project_root)}")
+        # A fresh process per deck, so peak memory is measured per deck
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+            try:
+                results.append(pool.submit(run_case, path, args.config, args.latency_scale, args.trace_folder).result())
+            except Exception as e:
+                print(f"Error benchmarking {path}: {e}")
+
+    report = {
+        'commit': git_commit(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'settings': {'latency_scale': args.latency_scale, 'config': args.config},
+        'results': results,
+    }
+    output = args.output or os.path.join(project_root, 'data_evals', f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    print(f"Saved {output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
-import os
+import os, sys
+# Add the project root directory to the Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
 from typing import List
 from pydantic import BaseModel, Field
 from langchain_mistralai import ChatMistralAI
@@ -11,6 +14,8 @@ from enum import Enum
 from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type
 from spellchecker import SpellChecker
 from textblob import TextBlob
+from utils.pptx_utils import slide_models_from_presentation
+from utils.font_checks import find_font_outliers, apply_font_fixes
 
 
 # Initialize the Mistral client with instructor
@@ -134,6 +139,12 @@ def extract_issues(slides_text: str) -> ExtractionResult:
 
 def fix_issue_on_slide(prs, slide_index, issue: Issue):
     slide = prs.slides[slide_index]
+
+    if issue.issue_category == "Consistency":
+        # Restyle only the runs on this slide that deviate from the deck's dominant style for their role
+        outliers = [o for o in find_font_outliers(slide_models_from_presentation(prs)) if o.slide_index == slide_index]
+        apply_font_fixes(prs, outliers)
+        return
     
     # Loop through shapes in the slide to find the corresponding object to fix
     for shape in slide.shapes:
@@ -150,12 +161,6 @@ def fix_issue_on_slide(prs, slide_index, issue: Issue):
                 corrected_text = spell_check_correction(shape.text) 
                 shape.text = corrected_text
             
-            elif issue.issue_category == "Consistency":
-                # Ensure all titles use the same font size and color
-                for paragraph in shape.text_frame.paragraphs:
-                    for run in paragraph.runs:
-                        run.font.size = Pt(24)
-                        run.font.color.rgb = RGBColor(0, 0, 0)  # Set to black color
 
 
 
@@ -0,0 +1,95 @@
+import numpy as np
+
+from utils.deduplication import IncrementalDeduplicator, cosine_similarity, dedupe_by_similarity, deduplicate_issues
+from utils.models import DetectedIssue, ExtractedIssue, IssueLocation
+
+SEVERITIES = ['low', 'medium', 'high']
+
+
+def scalar_dedupe(embeddings, severities, similarity_threshold):
+    # The original pairwise loop, which `dedupe_by_similarity` must match exactly
+    keep_issues = [True] * len(embeddings)
+    for i in range(len(embeddings)):
+        if not keep_issues[i]:
+            continue
+        for j in range(i + 1, len(embeddings)):
+            if not keep_issues[j]:
+                continue
+            if cosine_similarity(embeddings[i], embeddings[j]) > similarity_threshold:
+                if severities[i] >= severities[j]:
+                    keep_issues[j] = False
+                else:
+                    keep_issues[i] = False
+    return keep_issues
+
+
+def near_duplicates(rng, count, dimensions=8, topics=4, noise=0.3):
+    # Noisy copies of a few topics, so many pairs fall on either side of (and close to) the threshold
+    centers = rng.normal(size=(topics, dimensions))
+    return centers[rng.integers(topics, size=count)] + noise * rng.normal(size=(count, dimensions))
+
+
+def make_issues(rng, count):
+    categories = ['spelling', 'consistency']
+    locations = [IssueLocation.TITLE, IssueLocation.BODY_TEXT]
+    return [
+        DetectedIssue(
+            extracted_issue=ExtractedIssue(
+                issue_description=f"Issue {index}", element_location=locations[rng.integers(2)],
+                severity=SEVERITIES[rng.integers(3)],
+            ),
+            category=categories[rng.integers(2)], page_id=int(rng.integers(6)), file='deck.pptx',
+        )
+        for index in range(count)
+    ]
+
+
+def dumps(issues):
+    return [issue.model_dump() for issue in issues]
+
+
+def test_vectorized_dedupe_matches_the_pairwise_loop():
+    rng = np.random.default_rng(0)
+    for _ in range(40):
+        count = int(rng.integers(1, 60))
+        embeddings = list(near_duplicates(rng, count))
+        severities = rng.integers(1, 4, size=count).tolist()
+        threshold = float(rng.choice([0.8, 0.9, 0.95]))
+        assert dedupe_by_similarity(embeddings, severities, threshold) == scalar_dedupe(embeddings, severities, threshold)
+
+
+def test_cluster_dedupe_does_not_depend_on_the_input_order():
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        count = int(rng.integers(2, 40))
+        issues, embeddings = make_issues(rng, count), list(near_duplicates(rng, count))
+        expected = dumps(deduplicate_issues(None, "mistral-embed", issues, embeddings=embeddings))
+        order = rng.permutation(count)
+        shuffled = deduplicate_issues(None, "mistral-embed", [issues[i] for i in order], embeddings=[embeddings[i] for i in order])
+        assert dumps(shuffled) == expected
+
+
+def test_incremental_dedupe_matches_the_batch():
+    rng = np.random.default_rng(2)
+    for _ in range(30):
+        count = int(rng.integers(1, 40))
+        issues, embeddings = make_issues(rng, count), list(near_duplicates(rng, count))
+        dedup = IncrementalDeduplicator(None, "mistral-embed")
+        start = 0
+        while start < count:
+            stop = start + int(rng.integers(1, 6))
+            dedup.add(issues[start:stop], embeddings[start:stop])
+            start = stop
+        assert dumps(dedup.issues()) == dumps(deduplicate_issues(None, "mistral-embed", issues, embeddings=embeddings))
+
+
+def test_cluster_dedupe_merges_issues_of_different_checkers():
+    rng = np.random.default_rng(3)
+    spelling, chart = make_issues(rng, 2)
+    typo = ExtractedIssue(issue_description="Typo in the title: 'Revnue'", element_location=IssueLocation.TITLE, severity='medium')
+    spelling = spelling.model_copy(update={'extracted_issue': typo, 'category': 'spellchecker', 'page_id': 3})
+    chart = chart.model_copy(update={'extracted_issue': typo.model_copy(update={'severity': 'high'}), 'category': 'chartchecker', 'page_id': 4})
+    embedding = rng.normal(size=8)
+    (merged,) = deduplicate_issues(None, "mistral-embed", [spelling, chart], embeddings=[embedding, embedding])
+    assert merged.category == 'chartchecker'
+    assert merged.affected_pages == [3, 4]
@@ -0,0 +1,18 @@
+from utils.issue_memory import IssueMemory
+from utils.mocks import generate_mock_detected_issues
+
+
+def test_instances_sharing_a_root_see_each_other(tmp_path):
+    issues = generate_mock_detected_issues()
+    first, second = IssueMemory(str(tmp_path)), IssueMemory(str(tmp_path))
+    second.record(issues[:1], 'dismissed')
+    assert first.match(issues[:1]) == ['dismissed']
+
+    # Rows are assigned by SQLite, so interleaved writes neither collide nor overwrite each other's vectors
+    for _ in range(10):
+        first.record(issues[1:], 'accepted')
+        second.record(issues[:1], 'dismissed')
+    rows, max_row = first.conn.execute("SELECT COUNT(*), MAX(row) FROM issues").fetchone()
+    assert rows == max_row + 1 == 1 + 10 * len(issues)
+    assert first.suppress(issues) == issues[1:]
+    assert IssueMemory(str(tmp_path)).match(issues[1:]) == ['accepted'] * (len(issues) - 1)
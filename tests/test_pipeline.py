@@ -0,0 +1,74 @@
+import asyncio
+import os
+import re
+
+from utils.mocks import MockLLMClient
+from utils.pipeline import process_file_scheduled, run_by_priority
+from utils.utils import load_config
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class CountingClient(MockLLMClient):
+    """A mock client recording every text sent for embedding."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.embedded = []
+
+    def get_embeddings(self, model, texts):
+        self.embedded.extend(texts)
+        return super().get_embeddings(model, texts)
+
+
+def test_near_identical_issues_are_embedded_once(tmp_path, capsys):
+    client = CountingClient(latency_scale=0.01)
+    config = load_config(os.path.join(ROOT, 'config', 'config.yaml'))
+    asyncio.run(process_file_scheduled(
+        os.path.join(ROOT, 'data', '01-coastal-presentation.pdf'), config, "", str(tmp_path), client=client
+    ))
+    valid_issues = int(re.search(r"Valid issues: (\d+)", capsys.readouterr().out).group(1))
+    # The mock checkers repeat descriptions across slides: each is embedded once, by the validator
+    assert len(client.embedded) == len(set(client.embedded))
+    assert 0 < len(client.embedded) < valid_issues
+
+
+def test_budgeted_runs_start_jobs_that_fit():
+    # Model jobs used to be declined when their default latency (seconds) exceeded the time left
+    text = {'name': 'spellchecker', 'type': 'text'}
+    layout = {'name': 'layoutchecker', 'type': 'local', 'function': 'layout'}
+
+    async def job(seconds):
+        await asyncio.sleep(seconds)
+        return []
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        jobs = [(text, str(slide), job(0.05)) for slide in range(6)]
+        jobs += [(text, str(slide), job(5)) for slide in range(2)]
+        jobs += [(layout, str(slide), job(0)) for slide in range(6)]
+        return await run_by_priority(jobs, None, 2, loop.time() + 0.5, lambda index, issues: None, [])
+
+    status = asyncio.run(run())
+    assert status[:6] == ['completed'] * 6
+    assert status[6:8] == ['cancelled'] * 2
+    assert status[8:] == ['completed'] * 6
+
+
+def test_scheduled_runs_publish_deduplicated_issues(tmp_path):
+    # The view built from the events while the run goes on ends as the final result
+    shown = {}
+    def on_dedup(events):
+        for event in events:
+            for cluster_id in event.removed_clusters:
+                shown.pop(cluster_id)
+            shown[event.cluster_id] = event.issue
+
+    config = load_config(os.path.join(ROOT, 'config', 'config.yaml'))
+    issues, _, _ = asyncio.run(process_file_scheduled(
+        os.path.join(ROOT, 'data', '01-coastal-presentation.pdf'), config, "", str(tmp_path),
+        client=MockLLMClient(latency_scale=0.01), on_dedup=on_dedup
+    ))
+    assert issues
+    key = lambda issue: issue.model_dump_json()
+    assert sorted(map(key, shown.values())) == sorted(map(key, issues))
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+from utils.mocks import MockLLMClient, generate_mock_detected_issues
+from utils.validation import IssueValidator, MAX_BATCH_SIZE
+
+
+def make_issues(count):
+    template = generate_mock_detected_issues()[0]
+    return [
+        template.model_copy(update={'extracted_issue': template.extracted_issue.model_copy(update={'issue_description': f"Issue {index}: the title of slide {index} is misspelled"})})
+        for index in range(count)
+    ]
+
+
+async def validate_staggered(client, issues, per_submit, gap, **kwargs):
+    validator = IssueValidator(client, "mistral-small-latest", "local", embedder=client, **kwargs)
+    validator.start()
+    for key, start in enumerate(range(0, len(issues), per_submit)):
+        validator.submit(key, issues[start:start + per_submit])
+        await asyncio.sleep(gap)
+    return await validator.finish()
+
+
+def test_staggered_issues_are_batched():
+    # 40 issues from 20 checker results arriving 10ms apart: a request per issue before
+    client = MockLLMClient(latency_scale=0.01)
+    issues = make_issues(40)
+    valid_issues, embeddings = asyncio.run(validate_staggered(client, issues, per_submit=2, gap=0.01))
+    assert client.stats['requests:mistral-small-latest'] <= 4
+    assert len(valid_issues) == len(embeddings)
+    assert 0 < len(valid_issues) <= len(issues)
+
+
+def test_batches_respect_the_size_limit():
+    client = MockLLMClient(latency_scale=0.01)
+    issues = make_issues(3 * MAX_BATCH_SIZE)
+    valid_issues, _ = asyncio.run(validate_staggered(client, issues, per_submit=len(issues), gap=0))
+    assert client.stats['requests:mistral-small-latest'] == 3
+    # The results follow the submission order, not the completion order
+    assert [issue.extracted_issue.issue_description for issue in valid_issues] == [
+        issue.extracted_issue.issue_description for issue in issues if issue in valid_issues
+    ]
+
+
+def test_slow_requests_do_not_split_batches():
+    # With every slot busy, the issues that arrive meanwhile go into the next request
+    client = MockLLMClient(latency_scale=1.0)
+    issues = make_issues(30)
+    asyncio.run(validate_staggered(client, issues, per_submit=1, gap=0.05, concurrency=1, linger=0.05))
+    assert client.stats['requests:mistral-small-latest'] <= 6
+
+
+def test_local_issues_skip_validation():
+    # Issues of local checks are kept without a request, even when the validation model is down
+    client = MockLLMClient(latency_scale=0.01)
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("validation model unavailable")
+    client.complete_with_retry = unavailable
+    issues = [issue.model_copy(update={'local': True}) for issue in make_issues(20)]
+    valid_issues, embeddings = asyncio.run(validate_staggered(client, issues, per_submit=4, gap=0))
+    assert valid_issues == issues
+    assert len(embeddings) == len(issues)
+
+
+def test_finish_sends_the_last_batch_at_once():
+    # The last batch used to wait out the linger time although no more issues could arrive
+    client = MockLLMClient(latency_scale=0.01)
+    issues = make_issues(5)
+
+    async def run():
+        validator = IssueValidator(client, "mistral-small-latest", "local", embedder=client, linger=2.0)
+        validator.start()
+        validator.submit(0, issues)
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        await validator.finish()
+        return time.perf_counter() - started
+
+    assert asyncio.run(run()) < 0.5
+    assert client.stats['requests:mistral-small-latest'] == 1
@@ -1,9 +1,25 @@
 # Import specific functions from each module
 from .utils import load_config, extract_slide_number
-from .models import IssueLocation, ExtractedIssue, DetectedIssue, ExtractedIssueList, IsValidIssue
-from .mocks import generate_mock_detected_issues
-from .image_utils import encode_image, get_image_data_url
-from .pptx_utils import extract_text_from_pptx
-from .client import MistralClientWrapper
-from .screenshots import convert_pptx_to_images
-from .deduplication import dedupe_by_similarity, deduplicate_issues
\ No newline at end of file
+from .models import IssueLocation, ExtractedIssue, DetectedIssue, ExtractedIssueList, IsValidIssue, ChartAxisData, ChartSeriesData, ChartData, TableData, ShapeData, SlideModel, SlideResult, TextRunData, FontOutlier, IssueVerdict, IssueVerdictList, CoverageReport, PresentationReport, DedupEvent
+from .mocks import generate_mock_detected_issues, MockLLMClient
+from .image_utils import encode_image, get_image_data_url, get_thumbnail_data_url
+from .pptx_utils import extract_text_from_pptx, extract_slide_models_from_pptx, slide_models_from_presentation
+from .client import MistralClientWrapper, RateLimitedClient
+from .screenshots import convert_pptx_to_images, convert_pptx_to_pdf, render_page
+from .pdf_utils import extract_page_texts, extract_text_from_pdf
+from .deduplication import dedupe_by_similarity, dedupe_by_similarity_ann, dedupe_by_text, cluster_by_similarity, deduplicate_issues, IncrementalDeduplicator, LexicalIndex
+from .embeddings import HashedNgramEmbedder, EmbeddingBackend, resolve_embedding_backend, calibrate_threshold
+from .native_checks import check_native_charts_and_tables, needs_screenshot_check
+from .layout_checks import check_layout, find_overlaps, find_near_misses
+from .font_checks import find_font_outliers, check_font_consistency, apply_font_fixes
+from .results_store import ResultsStore
+from .checkpoint import Checkpoint
+from .issue_memory import IssueMemory
+from .jobs import Job, JobManager
+from .workspace import Workspace, RenderCache, QuotaExceededError
+from .executors import configure_executors, set_executor, run_io, run_cpu, shutdown_executors
+from .checkers import CheckerSpec, resolve_checker, register_local_check, LOCAL_CHECKS, DECK_CHECKS
+from .scheduler import StageGraph
+from .tracing import Tracer, span, annotate, traced, tracing, trace_path
+from .validation import validate_issue_description, validate_issue_descriptions, validate_issues_batched, IssueValidator
+from .pipeline import process_presentation, process_presentation_streaming, stream_presentation, process_file_scheduled, analyze_presentation
\ No newline at end of file
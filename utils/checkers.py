@@ -0,0 +1,130 @@
+from typing import Callable, Dict, List
+
+from .models import ExtractedIssue, SlideModel
+from .native_checks import check_native_charts_and_tables, needs_screenshot_check
+from .layout_checks import check_layout
+from .font_checks import check_font_consistency
+
+MODEL_TEXT = "mistral-large-latest"
+MODEL_SCREENSHOT = "pixtral-12b-2409"
+MODEL_NATIVE = "local"
+
+# Local check functions by the `function` name of a config entry, run on one slide model...
+LOCAL_CHECKS: Dict[str, Callable[[SlideModel], List[ExtractedIssue]]] = {}
+# ... or once on the slide models of the whole deck
+DECK_CHECKS: Dict[str, Callable] = {}
+# When a cascade hands a slide on from its local check to the model, by the `escalate` name of a config entry
+ESCALATIONS: Dict[str, Callable[[SlideModel | None], bool]] = {
+    'opaque_visuals': needs_screenshot_check,
+    'always': lambda slide_model: True,
+}
+
+# Default cost (relative to one text model call) of each kind of work, and its value: the model checkers find
+# content errors (spelling, wrong chart data) that matter more than the formatting issues of the local checks
+DEFAULT_COST = {'local': 0.0, 'text': 1.0, 'image': 3.0}
+DEFAULT_VALUE = {'local': 1.0, 'text': 2.0, 'image': 2.0}
+
+
+def register_local_check(name: str, deck: bool = False):
+    """
+    Register a local check function under a name, for config entries with `type: 'local'` or `'cascade'`.
+
+    Args:
+        name (str): The `function` name of the config entries.
+        deck (bool): Whether the function checks the whole deck (called with the slide models, the checker
+            name and the file, returning `DetectedIssue`s) instead of one slide model (returning `ExtractedIssue`s).
+    """
+    def decorator(fn):
+        (DECK_CHECKS if deck else LOCAL_CHECKS)[name] = fn
+        return fn
+    return decorator
+
+
+register_local_check('charts')(check_native_charts_and_tables)
+register_local_check('layout')(check_layout)
+register_local_check('fonts', deck=True)(check_font_consistency)
+
+
+class CheckerSpec:
+    """
+    How to run one configured checker, resolved from its config entry by `resolve_checker`.
+
+    A checker is a local function (`local`), a model prompt (`llm`) or a local function that hands slides it
+    cannot fully check on to a model prompt (`cascade`).
+
+    Attributes:
+        inputs (List[str]): What the checker reads: 'text', 'image', 'shape_model' and/or 'deck'.
+        cost (float): The expected cost per slide, relative to one text model call, 0 for local work.
+        value (float): How much its issues matter, the checkers of the highest value run first under a time budget.
+    """
+
+    def __init__(self, name: str, kind: str, inputs: List[str], cost: float, value: float,
+                 local: Callable | None = None, deck: Callable | None = None, model: str | None = None,
+                 model_input: str | None = None, escalate: Callable[[SlideModel | None], bool] | None = None):
+        self.name = name
+        self.kind = kind
+        self.inputs = inputs
+        self.cost = cost
+        self.value = value
+        self.local = local
+        self.deck = deck
+        self.model = model
+        self.model_input = model_input
+        self.escalate = escalate
+
+    @property
+    def needs_image(self) -> bool:
+        return self.model_input == 'image'
+
+
+def resolve_checker(checker: dict) -> CheckerSpec:
+    """
+    Resolve a config entry to its `CheckerSpec`.
+
+    Supported entries:
+        - `type: 'text'` or `'screenshot'`: a model prompt on the slide text or screenshot.
+        - `type: 'screenshot'` with `native: true`: a cascade of the local chart and table check, with the
+          screenshot model only for slides with picture-based visuals.
+        - `type: 'local'` with a registered `function`: a local check of the slide models (or the whole deck).
+        - `type: 'cascade'` with a registered `function`, an `input` ('text' or 'image') and optionally
+          `escalate` (see `ESCALATIONS`, 'opaque_visuals' by default).
+
+    Optional keys `model`, `cost` and `value` override the defaults.
+
+    Raises:
+        ValueError: If the type or the function is unknown.
+    """
+    kind = checker['type']
+    if kind == 'screenshot' and checker.get('native'):
+        checker = {**checker, 'type': 'cascade', 'function': 'charts', 'input': 'image'}
+        kind = 'cascade'
+
+    if kind in ('text', 'screenshot'):
+        model_input = 'text' if kind == 'text' else 'image'
+        spec = CheckerSpec(
+            checker['name'], 'llm', [model_input], DEFAULT_COST[model_input], DEFAULT_VALUE[model_input],
+            model=checker.get('model', MODEL_TEXT if model_input == 'text' else MODEL_SCREENSHOT), model_input=model_input
+        )
+    elif kind == 'local':
+        if checker['function'] in DECK_CHECKS:
+            spec = CheckerSpec(checker['name'], 'local', ['deck'], DEFAULT_COST['local'], DEFAULT_VALUE['local'], deck=DECK_CHECKS[checker['function']])
+        elif checker['function'] in LOCAL_CHECKS:
+            spec = CheckerSpec(checker['name'], 'local', ['shape_model'], DEFAULT_COST['local'], DEFAULT_VALUE['local'], local=LOCAL_CHECKS[checker['function']])
+        else:
+            raise ValueError(f"Unknown local check function '{checker['function']}' of checker {checker['name']}")
+    elif kind == 'cascade':
+        if checker['function'] not in LOCAL_CHECKS:
+            raise ValueError(f"Unknown local check function '{checker['function']}' of checker {checker['name']}")
+        model_input = checker.get('input', 'image')
+        spec = CheckerSpec(
+            checker['name'], 'cascade', ['shape_model', model_input], DEFAULT_COST[model_input], DEFAULT_VALUE[model_input],
+            local=LOCAL_CHECKS[checker['function']],
+            model=checker.get('model', MODEL_TEXT if model_input == 'text' else MODEL_SCREENSHOT), model_input=model_input,
+            escalate=ESCALATIONS[checker.get('escalate', 'opaque_visuals')]
+        )
+    else:
+        raise ValueError(f"Unknown checker type '{kind}' of checker {checker['name']}")
+
+    spec.cost = checker.get('cost', spec.cost)
+    spec.value = checker.get('value', spec.value)
+    return spec
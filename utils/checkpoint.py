@@ -0,0 +1,66 @@
+import json
+import os
+from typing import List
+
+from .models import DetectedIssue
+
+
+class Checkpoint:
+    """
+    Append-only JSONL log of finished work, to resume a batch run after a crash.
+
+    Each line is either the issues of one checker task (deck, checker, page, task ordinal) or the final
+    result of a whole deck. Lines are flushed as they are written; a line cut off by a crash is ignored
+    when the checkpoint is loaded again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tasks: dict[tuple, List[DetectedIssue]] = {}
+        self.decks: dict[str, dict] = {}
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            self._load()
+        self.file = open(path, 'a')
+
+    def _load(self) -> None:
+        with open(self.path) as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Skipping incomplete checkpoint line in {self.path}")
+                    continue
+                issues = [DetectedIssue.model_validate(issue) for issue in record['issues']]
+                if 'checker' in record:
+                    self.tasks[(record['deck'], record['checker'], record['page_id'], record['task'])] = issues
+                else:
+                    self.decks[record['deck']] = {'issues': issues, 'slides': record['slides']}
+        print(f"Loaded checkpoint {self.path}: {len(self.decks)} decks and {len(self.tasks)} checker tasks done")
+
+    def _write(self, record: dict) -> None:
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+
+    def get(self, deck_id: str, checker: str, page_id: int | None, task: int) -> List[DetectedIssue] | None:
+        """The issues of a finished checker task, None if it has not run yet."""
+        return self.tasks.get((deck_id, checker, page_id, task))
+
+    def put(self, deck_id: str, checker: str, page_id: int | None, task: int, issues: List[DetectedIssue]) -> None:
+        self.tasks[(deck_id, checker, page_id, task)] = issues
+        self._write({
+            'deck': deck_id, 'checker': checker, 'page_id': page_id, 'task': task,
+            'issues': [issue.model_dump() for issue in issues]
+        })
+
+    def get_deck(self, deck_id: str) -> dict | None:
+        """The final issues and slide count of a finished deck, None if it is not finished."""
+        return self.decks.get(deck_id)
+
+    def put_deck(self, deck_id: str, issues: List[DetectedIssue], slides: int) -> None:
+        self.decks[deck_id] = {'issues': issues, 'slides': slides}
+        self._write({'deck': deck_id, 'slides': slides, 'issues': [issue.model_dump() for issue in issues]})
+
+    def close(self) -> None:
+        self.file.close()
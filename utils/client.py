@@ -1,4 +1,6 @@
 import asyncio
+import threading
+import time
 from mistralai import Mistral
 from tenacity import retry, stop_after_attempt, wait_fixed, retry_if_exception_type, wait_exponential
 import json
@@ -6,8 +8,44 @@ import weave
 from pydantic import BaseModel
 from typing import Any, Dict, List
 from .image_utils import get_image_data_url, encode_image
+from .executors import run_cpu
+from .tracing import span, count, is_tracing
 import numpy as np
 
+# Responses longer than this are validated in the CPU pool
+LARGE_PAYLOAD_CHARS = 100_000
+
+
+def validate_json(ResponseModel: BaseModel, content: str) -> BaseModel:
+    return ResponseModel.model_validate_json(content)
+
+
+# Retry invalid responses quickly, then any error with backoff: up to 9 attempts per completion
+retry_completion = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=1, max=10),
+)
+retry_invalid_response = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_fixed(1),
+    retry=retry_if_exception_type((ValueError, json.JSONDecodeError))
+)
+
+
+retry_embeddings = retry(
+    stop=stop_after_attempt(5),
+    wait=wait_exponential(multiplier=1.5, min=1, max=10),
+)
+
+
+def api_span(model: str, messages: list, ResponseModel: BaseModel):
+    """The 'api' span of a completion, whose 'api_attempt' spans count the tries as `attempts`."""
+    api = span("api", model=model, response_model=ResponseModel.__name__)
+    if is_tracing():
+        api.set(bytes_sent=len(json.dumps(messages)))
+    return api
+
+
 class MistralClientWrapper:
     def __init__(self, api_key: str):
         self.client = Mistral(api_key=api_key)
@@ -31,36 +69,43 @@ class MistralClientWrapper:
             }
         }
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-    )
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_fixed(1),
-        retry=retry_if_exception_type((ValueError, json.JSONDecodeError))
-    )
-    @weave.op()
     async def complete_with_retry(self, model: str, messages: list, ResponseModel: BaseModel) -> BaseModel:
+        with api_span(model, messages, ResponseModel):
+            return await self._complete_with_retry(model, messages, ResponseModel)
+
+    @retry_completion
+    @retry_invalid_response
+    async def _complete_with_retry(self, model: str, messages: list, ResponseModel: BaseModel) -> BaseModel:
+        return await self.complete_once(model, messages, ResponseModel)
+
+    @weave.op()
+    async def complete_once(self, model: str, messages: list, ResponseModel: BaseModel) -> BaseModel:
+        """One completion attempt, without retries (see `complete_with_retry`)."""
         tools = self.build_tools_and_choice(ResponseModel)
-        
-        res = await self.client.chat.complete_async(
-            model=model,
-            messages=messages,
-            **tools
-        )
-        
-        try:
-            content = res.choices[0].message.tool_calls[0].function.arguments
-            # Validate the response using Pydantic
-            validated_response = ResponseModel.model_validate_json(content)
-            return validated_response
-        except Exception as e:
-            ## TODO: fix to change retry strategy for different errors
-            raise  # This will be caught by the retry decorator
+
+        with span("api_attempt", model=model, attempt=count('attempts')) as attempt_span:
+            res = await self.client.chat.complete_async(
+                model=model,
+                messages=messages,
+                **tools
+            )
+            if res.usage is not None:
+                attempt_span.set(prompt_tokens=res.usage.prompt_tokens, completion_tokens=res.usage.completion_tokens)
+
+            try:
+                content = res.choices[0].message.tool_calls[0].function.arguments
+                # Validate the response using Pydantic, large payloads off the event loop
+                if len(content) > LARGE_PAYLOAD_CHARS:
+                    validated_response = await run_cpu(validate_json, ResponseModel, content)
+                else:
+                    validated_response = ResponseModel.model_validate_json(content)
+                return validated_response
+            except Exception as e:
+                ## TODO: fix to change retry strategy for different errors
+                raise  # This will be caught by the retry decorator
 
     @staticmethod
-    def build_messages(system_prompt: str, user_prompt: str, image_path: str = None) -> list:
+    def build_messages(system_prompt: str, user_prompt: str, image_path: str = None, image_data_url: str = None) -> list:
         messages = [
             {
                 "role": "system",
@@ -79,9 +124,10 @@ class MistralClientWrapper:
         })
         
         # Add image content if provided
-        if image_path:
+        if image_path and image_data_url is None:
             encoded_image, image_format = encode_image(image_path)
             image_data_url = get_image_data_url(encoded_image, image_format)
+        if image_data_url:
             messages[1]["content"].append({
                 "type": "image_url",
                 "image_url": {
@@ -91,10 +137,17 @@ class MistralClientWrapper:
         
         return messages
 
-    @retry(
-        stop=stop_after_attempt(5),
-        wait=wait_exponential(multiplier=1.5, min=1, max=10),
-    )
+    async def build_messages_async(self, system_prompt: str, user_prompt: str, image_path: str = None) -> list:
+        """Same as `build_messages`, but the image is encoded in the CPU pool instead of on the event loop."""
+        image_data_url = None
+        if image_path:
+            with span("encode_image") as encode_span:
+                encoded_image, image_format = await run_cpu(encode_image, image_path)
+                encode_span.set(bytes=len(encoded_image))
+            image_data_url = get_image_data_url(encoded_image, image_format)
+        return self.build_messages(system_prompt, user_prompt, image_data_url=image_data_url)
+
+    @retry_embeddings
     def get_embeddings(self, model: str, texts: List[str]) -> List[np.ndarray]:
         """
         Get embeddings for a list of strings.
@@ -106,12 +159,77 @@ class MistralClientWrapper:
         Returns:
             List[np.ndarray]
         """
+        return self.embed_once(model, texts)
+
+    def embed_once(self, model: str, texts: List[str]) -> List[np.ndarray]:
+        """One embedding attempt, without retries (see `get_embeddings`)."""
         try:
-            embeddings_batch_response = self.client.embeddings.create(
-                model=model,
-                inputs=texts,
-            )
+            with span("embeddings", model=model, texts=len(texts)):
+                embeddings_batch_response = self.client.embeddings.create(
+                    model=model,
+                    inputs=texts,
+                )
             return [np.array(embedding.embedding) for embedding in embeddings_batch_response.data]
         except Exception as e:
             print(f"Error getting embeddings: {e}")
-            raise
\ No newline at end of file
+            raise
+
+
+class RateLimitedClient:
+    """
+    Share one client and one request budget between concurrent runs (eg, many decks in a batch).
+
+    At most `max_concurrency` requests are in flight and, with `requests_per_second`, requests start at
+    most that often. Retries are made here, so every attempt takes a slot and counts against the rate. It
+    has the same interface as `MistralClientWrapper`, so it can be passed wherever a client is expected.
+    """
+
+    def __init__(self, client: MistralClientWrapper, max_concurrency: int = 8, requests_per_second: float | None = None):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.interval = 1 / requests_per_second if requests_per_second else 0
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+        # Embeddings are requested from worker threads, completions from the event loop
+        self.thread_slots = threading.BoundedSemaphore(max_concurrency)
+        self.slots: asyncio.Semaphore | None = None
+
+    def _reserve(self) -> float:
+        """Reserve the next request slot and return how long to wait for it."""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+            return slot - now
+
+    def build_messages(self, system_prompt: str, user_prompt: str, image_path: str = None) -> list:
+        return self.client.build_messages(system_prompt=system_prompt, user_prompt=user_prompt, image_path=image_path)
+
+    async def build_messages_async(self, system_prompt: str, user_prompt: str, image_path: str = None) -> list:
+        return await self.client.build_messages_async(system_prompt=system_prompt, user_prompt=user_prompt, image_path=image_path)
+
+    async def complete_with_retry(self, model: str, messages: list, ResponseModel: BaseModel) -> BaseModel:
+        with api_span(model, messages, ResponseModel):
+            return await self._complete_with_retry(model, messages, ResponseModel)
+
+    @retry_completion
+    @retry_invalid_response
+    async def _complete_with_retry(self, model: str, messages: list, ResponseModel: BaseModel) -> BaseModel:
+        # Every attempt, retries (eg after a 429) included, takes a slot and counts against the request rate
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.max_concurrency)
+        with span("api_queue", model=model):
+            await self.slots.acquire()
+        try:
+            if self.interval:
+                with span("api_rate_limit", model=model):
+                    await asyncio.sleep(self._reserve())
+            return await self.client.complete_once(model=model, messages=messages, ResponseModel=ResponseModel)
+        finally:
+            self.slots.release()
+
+    @retry_embeddings
+    def get_embeddings(self, model: str, texts: List[str]) -> List[np.ndarray]:
+        with self.thread_slots:
+            time.sleep(self._reserve())
+            return self.client.embed_once(model, texts)
@@ -1,7 +1,8 @@
+import zlib
 import numpy as np
 from typing import List
 from .client import MistralClientWrapper
-from .models import DetectedIssue
+from .models import DetectedIssue, DedupEvent
 
 def cosine_similarity(a, b):
     """Calculate cosine similarity between two vectors."""
@@ -10,45 +11,575 @@ def cosine_similarity(a, b):
     norm_b = np.linalg.norm(b)
     return (dot_product / (norm_a * norm_b))
 
+# Rows per block are chosen so a block of similarities stays around this many float32 values (~16 MB)
+SIMILARITY_BLOCK_ELEMENTS = 1 << 22
+# float32 similarities this close to the threshold are recomputed with `cosine_similarity`
+BORDERLINE_TOLERANCE = 1e-4
+# From this many issues, `deduplicate_issues` compares LSH candidate pairs instead of all pairs
+ANN_MIN_ISSUES = 20000
+# Near-identical descriptions (Jaccard similarity of their character shingles from this value) are
+# deduplicated locally, before any embedding call
+LEXICAL_THRESHOLD = 0.85
+SHINGLE_SIZE = 5
+# MinHash signatures of 64 values in 16 bands of 4: pairs at the threshold share a band with probability ~1
+MINHASH_PERMUTATIONS = 64
+MINHASH_BAND_ROWS = 4
+MINHASH_PRIME = (1 << 31) - 1
+# Issues are only clustered with issues of the same location at most this many slides away, whichever
+# checker reported them (eg the same typo found by the spelling and the chart checker)
+SLIDE_WINDOW = 2
+
+
+def normalized_matrix(embeddings) -> np.ndarray:
+    """Stack the embeddings into a float32 matrix of unit rows (zero vectors become NaN rows, similar to nothing)."""
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
 def dedupe_by_similarity(embeddings, severities, similarity_threshold=0.95):
-    """Calculate pairwise cosine distances for a list of embeddings."""
+    """
+    Greedy deduplication by cosine similarity, keeping the more severe issue of each similar pair.
+
+    Issue i (if still kept) is compared with every later kept issue j: if they are more similar than the
+    threshold, j is dropped when i is at least as severe, otherwise i is dropped (and i still goes on
+    dropping later issues it is at least as severe as).
+
+    The similarities are computed as blocks of float32 matrix products, so the full pairwise matrix is
+    never held in memory; pairs close to the threshold are recomputed exactly, so the decisions match
+    pairwise `cosine_similarity` comparisons.
+
+    Args:
+        embeddings: The embedding of each issue.
+        severities: The severity of each issue, higher is more severe.
+        similarity_threshold (float): The cosine similarity above which two issues are duplicates.
+
+    Returns:
+        List[bool]: Whether to keep each issue.
+    """
     num_embeddings = len(embeddings)
+    keep_issues = np.ones(num_embeddings, dtype=bool)
+    if num_embeddings < 2:
+        return keep_issues.tolist()
+
+    matrix = normalized_matrix(embeddings)
+    severities = np.asarray(severities)
+    block_rows = max(1, min(num_embeddings, SIMILARITY_BLOCK_ELEMENTS // num_embeddings))
+
+    for start in range(0, num_embeddings, block_rows):
+        stop = min(start + block_rows, num_embeddings)
+        # Similarities of the block's rows with themselves and all later issues
+        similarities = matrix[start:stop] @ matrix[start:].T
+        for i in range(start, stop):
+            if not keep_issues[i]:
+                continue
+            row = similarities[i - start, i - start + 1:]
+            candidates = np.flatnonzero((row > similarity_threshold - BORDERLINE_TOLERANCE) & keep_issues[i + 1:])
+            if candidates.size == 0:
+                continue
+            candidates += i + 1
+            similar = candidates[is_above_threshold(embeddings, np.full(candidates.size, i), candidates, row[candidates - i - 1], similarity_threshold)]
+            drop_similar(keep_issues, severities, i, similar)
     
-    keep_issues = [True] * num_embeddings
-    
-    for i in range(num_embeddings):
-        if not keep_issues[i]:
+    return keep_issues.tolist()
+
+
+def is_above_threshold(embeddings, rows: np.ndarray, columns: np.ndarray, similarities: np.ndarray, similarity_threshold: float) -> np.ndarray:
+    """Whether each candidate pair is more similar than the threshold, recomputing the float32 similarities close to it exactly."""
+    is_similar = similarities > similarity_threshold + BORDERLINE_TOLERANCE
+    borderline = ~is_similar
+    if borderline.any():
+        is_similar[borderline] = [
+            cosine_similarity(embeddings[i], embeddings[j]) > similarity_threshold
+            for i, j in zip(rows[borderline], columns[borderline])
+        ]
+    return is_similar
+
+
+def drop_similar(keep_issues: np.ndarray, severities: np.ndarray, i: int, similar: np.ndarray) -> None:
+    # The decisions of the greedy loop for issue i do not depend on the order of its similar later issues
+    keep_issues[similar[severities[similar] <= severities[i]]] = False
+    if (severities[similar] > severities[i]).any():
+        keep_issues[i] = False
+
+
+def lsh_candidate_pairs(matrix: np.ndarray, similarity_threshold: float, recall: float = 0.99, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Find the pairs of rows more similar than the threshold (minus the borderline tolerance) with random-hyperplane LSH.
+
+    Each table hashes the rows by the signs of their projections on `bits` random hyperplanes; only rows
+    sharing a bucket in some table are compared. Two rows at exactly the threshold similarity share a bucket
+    of one table with probability (1 - arccos(threshold) / pi) ** bits, so the number of tables is chosen
+    for the requested recall at the threshold (more similar pairs are found more reliably).
+
+    Args:
+        matrix (np.ndarray): The normalized embeddings (see `normalized_matrix`).
+        recall (float): The probability of finding a pair at the threshold similarity; higher costs more tables.
+        seed (int): The seed of the hyperplanes, for reproducible results.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The (i, j) pairs with i < j, shape (m, 2), and their float32 similarities.
+    """
+    num_rows, dim = matrix.shape
+    bits = int(np.clip(np.log2(max(num_rows, 2)) - 4, 4, 20))
+    collision = (1 - np.arccos(np.clip(similarity_threshold, -1.0, 1.0)) / np.pi) ** bits
+    tables = 1 if collision >= 1 else int(np.ceil(np.log(1 - recall) / np.log(1 - collision)))
+    rng = np.random.default_rng(seed)
+    weights = 1 << np.arange(bits, dtype=np.int64)
+
+    found_pairs, found_similarities = [], []
+    for _ in range(tables):
+        planes = rng.standard_normal((dim, bits)).astype(np.float32)
+        codes = ((matrix @ planes) > 0) @ weights
+        order = np.argsort(codes, kind='stable')
+        for bucket in np.split(order, np.flatnonzero(np.diff(codes[order])) + 1):
+            if bucket.size < 2:
+                continue
+            bucket = np.sort(bucket)
+            for start in range(0, bucket.size, max(1, SIMILARITY_BLOCK_ELEMENTS // bucket.size)):
+                rows = bucket[start:start + max(1, SIMILARITY_BLOCK_ELEMENTS // bucket.size)]
+                similarities = matrix[rows] @ matrix[bucket].T
+                row_index, column_index = np.nonzero(similarities > similarity_threshold - BORDERLINE_TOLERANCE)
+                later = bucket[column_index] > rows[row_index]
+                found_pairs.append(np.stack([rows[row_index[later]], bucket[column_index[later]]], axis=1))
+                found_similarities.append(similarities[row_index[later], column_index[later]])
+
+    if not found_pairs:
+        return np.empty((0, 2), dtype=np.int64), np.empty(0, dtype=np.float32)
+    pairs, similarities = np.concatenate(found_pairs), np.concatenate(found_similarities)
+    # The same pair may share buckets in several tables
+    _, first = np.unique(pairs[:, 0] * num_rows + pairs[:, 1], return_index=True)
+    return pairs[first], similarities[first]
+
+
+def dedupe_by_similarity_ann(embeddings, severities, similarity_threshold=0.95, recall: float = 0.99, seed: int = 0):
+    """
+    Same greedy deduplication as `dedupe_by_similarity`, but only on the candidate pairs found by LSH
+    (see `lsh_candidate_pairs`), verified exactly. The result equals the exact one unless a similar
+    pair is missed, which happens with probability below 1 - `recall` per pair.
+
+    Returns:
+        List[bool]: Whether to keep each issue.
+    """
+    num_embeddings = len(embeddings)
+    if num_embeddings < 2:
+        return [True] * num_embeddings
+
+    pairs, similarities = lsh_candidate_pairs(normalized_matrix(embeddings), similarity_threshold, recall, seed)
+    pairs = pairs[is_above_threshold(embeddings, pairs[:, 0], pairs[:, 1], similarities, similarity_threshold)]
+    return dedupe_pairs(pairs, severities, num_embeddings)
+
+
+def dedupe_pairs(pairs: np.ndarray, severities, num_issues: int) -> List[bool]:
+    """
+    The greedy pass of `dedupe_by_similarity` over a known set of duplicate pairs.
+
+    Args:
+        pairs (np.ndarray): The (i, j) pairs of duplicates with i < j, shape (m, 2).
+        severities: The severity of each issue, higher is more severe.
+        num_issues (int): The number of issues.
+
+    Returns:
+        List[bool]: Whether to keep each issue.
+    """
+    keep_issues = np.ones(num_issues, dtype=bool)
+    # Neighbors of each issue, sorted by the issue (CSR layout)
+    pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+    bounds = np.searchsorted(pairs[:, 0], np.arange(num_issues + 1))
+
+    severities = np.asarray(severities)
+    for i in range(num_issues):
+        if not keep_issues[i] or bounds[i] == bounds[i + 1]:
             continue
-        for j in range(i+1, num_embeddings):
-            if not keep_issues[j]:
+        similar = pairs[bounds[i]:bounds[i + 1], 1]
+        drop_similar(keep_issues, severities, i, similar[keep_issues[similar]])
+    return keep_issues.tolist()
+
+
+def connected_components(pairs: np.ndarray, num_items: int) -> np.ndarray:
+    """The component of each item, as the smallest item in it, with the pairs as edges (union-find)."""
+    parent = np.arange(num_items)
+
+    def find(item):
+        root = item
+        while parent[root] != root:
+            root = parent[root]
+        # Path compression
+        while parent[item] != root:
+            parent[item], item = root, parent[item]
+        return root
+
+    for i, j in pairs.tolist():
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+    return np.array([find(item) for item in range(num_items)], dtype=np.int64)
+
+
+def cluster_by_similarity(embeddings, blocks: List, pages: List[int], similarity_threshold: float = 0.9, slide_window: int | None = SLIDE_WINDOW) -> np.ndarray:
+    """
+    Cluster issues that are more similar than the threshold, only comparing issues in the same block
+    (e.g. the same location) at most `slide_window` slides apart. Clusters are the connected
+    components of the similar pairs, so they do not depend on the order of the issues, and a repeated issue
+    chains across the whole deck.
+
+    Args:
+        embeddings: The embedding of each issue.
+        blocks (List): The block of each issue, any hashable value.
+        pages (List[int]): The slide of each issue.
+        similarity_threshold (float): The cosine similarity above which two issues are duplicates.
+        slide_window (int | None): The maximum slide distance of compared issues, None to compare the whole deck.
+
+    Returns:
+        np.ndarray: The cluster of each issue, as the index of its first issue.
+    """
+    num_issues = len(embeddings)
+    if num_issues < 2:
+        return np.arange(num_issues)
+
+    matrix = normalized_matrix(embeddings)
+    pages = np.asarray(pages)
+    members = {}
+    for index, block in enumerate(blocks):
+        members.setdefault(block, []).append(index)
+
+    found_pairs = []
+    for block_members in members.values():
+        # The block's issues by slide, so each one's window is a contiguous range
+        block_members = np.array(block_members)[np.argsort(pages[block_members], kind='stable')]
+        block_pages = pages[block_members]
+        block_rows = max(1, SIMILARITY_BLOCK_ELEMENTS // block_members.size)
+        for start in range(0, block_members.size, block_rows):
+            stop = min(start + block_rows, block_members.size)
+            end = block_members.size if slide_window is None else int(np.searchsorted(block_pages, block_pages[stop - 1] + slide_window, side='right'))
+            similarities = matrix[block_members[start:stop]] @ matrix[block_members[start:end]].T
+            row_index, column_index = np.nonzero(similarities > similarity_threshold - BORDERLINE_TOLERANCE)
+            is_candidate = column_index > row_index
+            if slide_window is not None:
+                is_candidate &= block_pages[start + column_index] - block_pages[start + row_index] <= slide_window
+            row_index, column_index = row_index[is_candidate], column_index[is_candidate]
+            rows, columns = block_members[start + row_index], block_members[start + column_index]
+            is_similar = is_above_threshold(embeddings, rows, columns, similarities[row_index, column_index], similarity_threshold)
+            found_pairs.append(np.stack([rows[is_similar], columns[is_similar]], axis=1))
+
+    return connected_components(np.concatenate(found_pairs), num_issues)
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """The hashed character shingles of a text, after lowercasing and collapsing whitespace."""
+    text = ' '.join(text.lower().split())
+    if len(text) <= size:
+        return {zlib.crc32(text.encode())} if text else set()
+    return {zlib.crc32(text[start:start + size].encode()) for start in range(len(text) - size + 1)}
+
+
+def jaccard_similarity(a: set, b: set) -> float:
+    """The Jaccard similarity of two shingle sets (0 if both are empty)."""
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+def minhash_signatures(shingle_sets: List[set], num_permutations: int = MINHASH_PERMUTATIONS, seed: int = 0) -> np.ndarray:
+    """
+    The MinHash signature of each shingle set: the minimum of `num_permutations` random universal hashes.
+
+    Returns:
+        np.ndarray: Shape (len(shingle_sets), num_permutations); empty sets get the maximum value everywhere.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, MINHASH_PRIME, size=num_permutations, dtype=np.uint64)
+    b = rng.integers(0, MINHASH_PRIME, size=num_permutations, dtype=np.uint64)
+    signatures = np.full((len(shingle_sets), num_permutations), MINHASH_PRIME, dtype=np.uint64)
+    for row, shingle_set in enumerate(shingle_sets):
+        if shingle_set:
+            # Shingles reduced below the prime, so the products fit in 64 bits
+            values = np.fromiter(shingle_set, dtype=np.uint64, count=len(shingle_set)) % np.uint64(MINHASH_PRIME)
+            signatures[row] = ((values[:, None] * a + b) % np.uint64(MINHASH_PRIME)).min(axis=0)
+    return signatures
+
+
+def dedupe_by_text(descriptions: List[str], severities, jaccard_threshold: float = LEXICAL_THRESHOLD, seed: int = 0) -> List[bool]:
+    """
+    Greedy deduplication of near-identical descriptions, with the same rule as `dedupe_by_similarity` but
+    the Jaccard similarity of character shingles instead of embeddings.
+
+    Candidate pairs are the descriptions whose MinHash signatures agree on a whole band of `MINHASH_BAND_ROWS`
+    values; the candidates are verified with the exact Jaccard similarity of their shingles.
+
+    Args:
+        descriptions (List[str]): The description of each issue.
+        severities: The severity of each issue, higher is more severe.
+        jaccard_threshold (float): The shingle Jaccard similarity from which two descriptions are duplicates.
+
+    Returns:
+        List[bool]: Whether to keep each issue.
+    """
+    pairs = lexical_duplicate_pairs(descriptions, jaccard_threshold, seed)
+    return dedupe_pairs(pairs, severities, len(descriptions))
+
+
+def lexical_duplicate_pairs(descriptions: List[str], jaccard_threshold: float = LEXICAL_THRESHOLD, seed: int = 0) -> np.ndarray:
+    """The (i, j) pairs of near-identical descriptions with i < j, shape (m, 2) (see `dedupe_by_text`)."""
+    if len(descriptions) < 2:
+        return np.empty((0, 2), dtype=np.int64)
+
+    shingle_sets = [shingles(description) for description in descriptions]
+    signatures = minhash_signatures(shingle_sets, seed=seed)
+    candidates = set()
+    for start in range(0, signatures.shape[1], MINHASH_BAND_ROWS):
+        _, buckets = np.unique(signatures[:, start:start + MINHASH_BAND_ROWS], axis=0, return_inverse=True)
+        buckets = buckets.ravel()
+        order = np.argsort(buckets, kind='stable')
+        for bucket in np.split(order, np.flatnonzero(np.diff(buckets[order])) + 1):
+            if bucket.size < 2:
                 continue
-            sim = cosine_similarity(embeddings[i], embeddings[j])
-            if sim > similarity_threshold: 
-                if severities[i] >= severities[j]:
-                    keep_issues[j] = False
-                else:
-                    keep_issues[i] = False
-    
-    return keep_issues
+            bucket = np.sort(bucket)
+            rows, columns = np.triu_indices(bucket.size, k=1)
+            candidates.update(zip(bucket[rows].tolist(), bucket[columns].tolist()))
+
+    pairs = [(i, j) for i, j in candidates if jaccard_similarity(shingle_sets[i], shingle_sets[j]) >= jaccard_threshold]
+    return np.array(pairs, dtype=np.int64).reshape(-1, 2)
 
 
-def deduplicate_issues(client: MistralClientWrapper, model: str, issues: List[DetectedIssue]) -> List[DetectedIssue]:
+class LexicalIndex:
+    """
+    Groups near-identical descriptions (see `dedupe_by_text`) as they are added one at a time.
+
+    Each group is indexed by the bands of its first description's MinHash signature; a new description is
+    verified with the exact shingle Jaccard similarity against the groups sharing a band only.
+
+    Example:
+        index = LexicalIndex()
+        group = index.add("There's a typo in the footer: 'Confidental' should be 'Confidential'.")
+        assert index.add("There's a typo in the footer: 'Confidental' should be 'Confidential'") == group
+    """
+
+    def __init__(self, jaccard_threshold: float = LEXICAL_THRESHOLD, seed: int = 0):
+        self.jaccard_threshold = jaccard_threshold
+        self.seed = seed
+        self.shingle_sets: List[set] = []
+        self.buckets: dict = {}
+
+    def add(self, description: str) -> int:
+        """Add a description, return its group: the index of the first description of the group."""
+        shingle_set = shingles(description)
+        signature = minhash_signatures([shingle_set], seed=self.seed)[0]
+        bands = [(start, signature[start:start + MINHASH_BAND_ROWS].tobytes()) for start in range(0, signature.size, MINHASH_BAND_ROWS)]
+        for group in sorted({group for band in bands for group in self.buckets.get(band, [])}):
+            if jaccard_similarity(self.shingle_sets[group], shingle_set) >= self.jaccard_threshold:
+                return group
+        group = len(self.shingle_sets)
+        self.shingle_sets.append(shingle_set)
+        for band in bands:
+            self.buckets.setdefault(band, []).append(group)
+        return group
+
+
+def deduplicate_issues(client: MistralClientWrapper, model: str, issues: List[DetectedIssue], embeddings: List[np.ndarray] | None = None, method: str = 'cluster', recall: float = 0.99, lexical: bool = True, slide_window: int | None = SLIDE_WINDOW, similarity_threshold: float = 0.9) -> List[DetectedIssue]:
+    """
+    Drop issues whose description is too similar to a more (or equally) severe issue.
+
+    Near-identical descriptions are dropped first (see `dedupe_by_text`), so only the remaining ones are embedded.
+
+    Args:
+        method (str): 'cluster' merges similar issues of the same location within `slide_window` slides, of any
+            checker (see `cluster_by_similarity`), and keeps the most severe issue of each cluster, with the
+            slides of the whole cluster in its `affected_pages`. The greedy methods compare issues regardless
+            of location and slide: 'exact' all pairs (see `dedupe_by_similarity`), 'ann' only the LSH candidate
+            pairs (see `dedupe_by_similarity_ann`), 'auto' switches to 'ann' from `ANN_MIN_ISSUES` issues.
+            The pipelines use the `method` of the `deduplication` config section.
+        recall (float): For 'ann', the probability of finding each duplicate pair at the threshold.
+        lexical (bool): Whether to drop near-identical descriptions before embedding.
+        slide_window (int | None): For 'cluster', the maximum slide distance of compared issues, None for the whole deck.
+        similarity_threshold (float): The similarity above which two issues are duplicates, which depends on
+            the embedding model (see `utils.embeddings`).
+
+    Returns:
+        List[DetectedIssue]: For 'cluster', one representative per cluster, sorted by slide (see `display_order`)
+            so the result does not depend on the input order. For the greedy methods, the kept issues in their
+            original order.
+    """
     # Extract issue descriptions
     descriptions = [issue.extracted_issue.issue_description for issue in issues]
     
-    # Get embeddings using the client
-    model = "mistral-embed"  # Specify the appropriate embedding model
-    embeddings = client.get_embeddings(model, descriptions)
-    
     # Extract severities
     severities = [issue.extracted_issue.severity for issue in issues]
     severities_points = {'low':1, 'medium': 2, 'high': 3}
     severities_int = [severities_points[sev] for sev in severities]
     
+    # Near-identical descriptions share one embedding: clustering still merges them by location and slide
+    if lexical and method == 'cluster' and embeddings is None:
+        groups = connected_components(lexical_duplicate_pairs(descriptions), len(descriptions))
+        firsts = np.unique(groups)
+        if firsts.size < len(descriptions):
+            print(f"Embedding {firsts.size} distinct descriptions of {len(descriptions)} issues")
+            distinct_embeddings = dict(zip(firsts.tolist(), client.get_embeddings(model, [descriptions[i] for i in firsts])))
+            embeddings = [distinct_embeddings[group] for group in groups.tolist()]
+
+    # Drop the near-identical descriptions without any embedding call
+    if lexical and method != 'cluster':
+        survivors = [i for i, keep in enumerate(dedupe_by_text(descriptions, severities_int)) if keep]
+        if len(survivors) < len(issues):
+            print(f"Dropped {len(issues) - len(survivors)} near-identical issues before embedding")
+            issues = [issues[i] for i in survivors]
+            descriptions = [descriptions[i] for i in survivors]
+            severities_int = [severities_int[i] for i in survivors]
+            if embeddings is not None:
+                embeddings = [embeddings[i] for i in survivors]
+    
+    # Get embeddings using the client, unless they were computed while the issues streamed in
+    if embeddings is None:
+        embeddings = client.get_embeddings(model, descriptions)
+    
     # Calculate cosine similarities and drop the dupes
-    keep_issues = dedupe_by_similarity(embeddings, severities_int, similarity_threshold = 0.9)
+    if method == 'cluster':
+        return representatives(issues, cluster_by_similarity(
+            embeddings, [issue.extracted_issue.element_location for issue in issues],
+            [issue.page_id for issue in issues], similarity_threshold = similarity_threshold, slide_window = slide_window
+        ))
+    if method == 'ann' or (method == 'auto' and len(issues) >= ANN_MIN_ISSUES):
+        keep_issues = dedupe_by_similarity_ann(embeddings, severities_int, similarity_threshold = similarity_threshold, recall = recall)
+    else:
+        keep_issues = dedupe_by_similarity(embeddings, severities_int, similarity_threshold = similarity_threshold)
     
     # Create a new list with deduplicated issues
     deduplicated_issues = [issue for issue, keep in zip(issues, keep_issues) if keep]
     
-    return deduplicated_issues
\ No newline at end of file
+    return deduplicated_issues
+
+
+def representatives(issues: List[DetectedIssue], clusters: np.ndarray) -> List[DetectedIssue]:
+    """
+    The most severe issue of each cluster (ties go to the earliest slide, then the description), with the
+    slides of the whole cluster in `affected_pages`. The result does not depend on the order of the issues.
+    """
+    members = {}
+    for issue, cluster in zip(issues, clusters.tolist()):
+        members.setdefault(cluster, []).append(issue)
+    return sorted((merged_issue(cluster_issues) for cluster_issues in members.values()), key=display_order)
+
+
+def representative_key(issue: DetectedIssue) -> tuple:
+    severities_points = {'low': 1, 'medium': 2, 'high': 3}
+    return (-severities_points[issue.extracted_issue.severity], issue.page_id, issue.extracted_issue.issue_description)
+
+
+def display_order(issue: DetectedIssue) -> tuple:
+    # A total order of the representatives (by slide first), so the result does not depend on the input order
+    return (issue.page_id, issue.category, issue.extracted_issue.issue_description, issue.extracted_issue.element_location.value,
+            -representative_key(issue)[0], issue.affected_pages)
+
+
+def merged_issue(cluster_issues: List[DetectedIssue]) -> DetectedIssue:
+    """The representative of a cluster (see `representatives`), with the slides of all its issues."""
+    representative = min(cluster_issues, key=representative_key)
+    affected_pages = sorted({page for issue in cluster_issues for page in (issue.affected_pages or [issue.page_id])})
+    return representative.model_copy(update={'affected_pages': affected_pages})
+
+
+class IncrementalDeduplicator:
+    """
+    The 'cluster' deduplication of `deduplicate_issues`, one issue or micro-batch at a time.
+
+    It keeps every issue seen so far with its embedding and the clusters (union-find over the similar pairs,
+    see `cluster_by_similarity`). Each new issue is compared with the issues of its block within the slide
+    window, and joins (and possibly connects) their clusters. Because clusters are connected components and
+    representatives are chosen by a fixed key, the final `issues()` equal the batch result on the same
+    issues and embeddings, whatever order they arrived in.
+
+    Example:
+        dedup = IncrementalDeduplicator(client, "mistral-embed")
+        for event in dedup.add(slide_issues):
+            for cluster_id in event.removed_clusters:
+                shown.pop(cluster_id)
+            shown[event.cluster_id] = event.issue
+        final_issues = dedup.issues()
+    """
+
+    def __init__(self, client, model: str, similarity_threshold: float = 0.9, slide_window: int | None = SLIDE_WINDOW):
+        self.client = client
+        self.model = model
+        self.similarity_threshold = similarity_threshold
+        self.slide_window = slide_window
+        self.seen: List[DetectedIssue] = []
+        self.embeddings: list = []
+        self.parent: List[int] = []
+        self.members: dict = {}
+        # Per block: the indices of its issues, their pages and their normalized embeddings
+        self.blocks: dict = {}
+        self.lexical = LexicalIndex()
+        self.group_embeddings: dict = {}
+
+    def find(self, item: int) -> int:
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def add(self, issues: List[DetectedIssue], embeddings: list | None = None) -> List[DedupEvent]:
+        """
+        Add issues, embedding them with the client unless their embeddings are given.
+
+        Returns:
+            List[DedupEvent]: The changes to the deduplicated view, in order.
+        """
+        if not issues:
+            return []
+        if embeddings is None:
+            embeddings = self.embed([issue.extracted_issue.issue_description for issue in issues])
+        return [event for issue, embedding in zip(issues, embeddings) for event in self._add(issue, embedding)]
+
+    def embed(self, descriptions: List[str]) -> list:
+        # Near-identical descriptions (eg the same footer typo on every slide) share the embedding of their group
+        groups = [self.lexical.add(description) for description in descriptions]
+        new_groups = {}
+        for group, description in zip(groups, descriptions):
+            if group not in self.group_embeddings:
+                new_groups.setdefault(group, description)
+        if new_groups:
+            self.group_embeddings.update(zip(new_groups, self.client.get_embeddings(self.model, list(new_groups.values()))))
+        return [self.group_embeddings[group] for group in groups]
+
+    def _add(self, issue: DetectedIssue, embedding) -> List[DedupEvent]:
+        index = len(self.seen)
+        self.seen.append(issue)
+        self.embeddings.append(embedding)
+        self.parent.append(index)
+        vector = normalized_matrix([embedding])[0]
+
+        block = self.blocks.setdefault(issue.extracted_issue.element_location, {'indices': [], 'pages': [], 'vectors': []})
+        similar = np.empty(0, dtype=np.int64)
+        if block['indices']:
+            indices, pages = np.array(block['indices']), np.array(block['pages'])
+            in_window = np.ones(indices.size, dtype=bool) if self.slide_window is None else np.abs(pages - issue.page_id) <= self.slide_window
+            similarities = np.stack(block['vectors'])[in_window] @ vector
+            candidates = similarities > self.similarity_threshold - BORDERLINE_TOLERANCE
+            indices = indices[in_window][candidates]
+            similar = indices[is_above_threshold(self.embeddings, indices, np.full(indices.size, index), similarities[candidates], self.similarity_threshold)]
+        block['indices'].append(index)
+        block['pages'].append(issue.page_id)
+        block['vectors'].append(vector)
+
+        roots = sorted({self.find(int(item)) for item in similar})
+        if not roots:
+            self.members[index] = [index]
+            return [DedupEvent(kind='add', cluster_id=index, issue=merged_issue([issue]))]
+
+        # The cluster keeps the smallest index as its id, like `connected_components`, and its members stay
+        # in arrival order, so representative ties resolve as in the batch
+        cluster_id = roots[0]
+        shown_before = merged_issue([self.seen[item] for item in self.members[cluster_id]])
+        for root in roots[1:]:
+            self.parent[root] = cluster_id
+        self.parent[index] = cluster_id
+        self.members[cluster_id] = sorted(item for root in roots for item in self.members.pop(root)) + [index]
+
+        representative = merged_issue([self.seen[item] for item in self.members[cluster_id]])
+        kind = 'merge' if representative.model_dump(exclude={'affected_pages'}) == shown_before.model_dump(exclude={'affected_pages'}) else 'replace'
+        return [DedupEvent(kind=kind, cluster_id=cluster_id, issue=representative, removed_clusters=roots[1:])]
+
+    def issues(self) -> List[DetectedIssue]:
+        """The deduplicated issues so far, as `deduplicate_issues` would return them."""
+        return sorted((merged_issue([self.seen[item] for item in members]) for members in self.members.values()), key=display_order)
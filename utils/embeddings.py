@@ -0,0 +1,122 @@
+import zlib
+import numpy as np
+from typing import Any, Dict, List
+
+from .tracing import span
+
+# The mistral-embed similarity above which two issues are duplicates
+MISTRAL_SIMILARITY_THRESHOLD = 0.9
+# The hashed n-gram similarity above which two issues are duplicates: paraphrased issue descriptions score
+# about 0.5-0.75, unrelated ones below 0.45. Recalibrate against mistral-embed on your own issues with
+# scripts/calibrate_embeddings.py (see `calibrate_threshold`).
+LOCAL_SIMILARITY_THRESHOLD = 0.5
+
+
+class HashedNgramEmbedder:
+    """
+    Local embeddings of issue descriptions: hashed character n-grams and words, with sublinear term frequency.
+
+    It needs no network, no model files and no fitting, so dedup works offline and in milliseconds. There is
+    no IDF weighting, so that issues embedded in separate micro-batches (see `IssueValidator`) stay comparable.
+    It has the `get_embeddings` interface of `MistralClientWrapper` and can be used wherever an embedding
+    client is expected.
+    """
+
+    def __init__(self, dim: int = 4096, ngram_range: tuple[int, int] = (3, 5)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def features(self, text: str) -> List[str]:
+        text = f" {' '.join(text.lower().split())} "
+        grams = text.split()
+        for size in range(self.ngram_range[0], self.ngram_range[1] + 1):
+            grams += [text[start:start + size] for start in range(len(text) - size + 1)]
+        return grams
+
+    def embed(self, text: str) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(gram.encode()) for gram in self.features(text)), dtype=np.uint32)
+        # The low bits pick the bucket, the top bit the sign, so colliding features tend to cancel out
+        signs = np.where(hashes >> 31, -1.0, 1.0)
+        indices, inverse = np.unique(hashes % self.dim, return_inverse=True)
+        counts = np.bincount(inverse, weights=signs)
+        vector = np.zeros(self.dim, dtype=np.float32)
+        vector[indices] = np.sign(counts) * np.log1p(np.abs(counts))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get_embeddings(self, model: str, texts: List[str]) -> List[np.ndarray]:
+        """
+        Embed a list of strings locally.
+
+        Args:
+            model (str): Ignored, for the interface of `MistralClientWrapper.get_embeddings`.
+            texts (List[str]): A list of strings to embed.
+
+        Returns:
+            List[np.ndarray]
+        """
+        with span("embeddings", model='local', texts=len(texts)):
+            return [self.embed(text) for text in texts]
+
+
+class EmbeddingBackend:
+    """What deduplication embeds with: the embedding client, its model and its duplicate similarity threshold."""
+
+    def __init__(self, embedder: Any, model: str, similarity_threshold: float):
+        self.embedder = embedder
+        self.model = model
+        self.similarity_threshold = similarity_threshold
+
+
+def local_backend(similarity_threshold: float = LOCAL_SIMILARITY_THRESHOLD) -> EmbeddingBackend:
+    return EmbeddingBackend(HashedNgramEmbedder(), 'local', similarity_threshold)
+
+
+def resolve_embedding_backend(config: Dict, client: Any, model: str = "mistral-embed") -> EmbeddingBackend:
+    """
+    The embedding backend of the `deduplication` config section.
+
+    Supported `backend` values: 'mistral' (the default, `model` through the client) and 'local'
+    (`HashedNgramEmbedder`). An optional `similarity_threshold` overrides the backend's default.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    settings = (config or {}).get('deduplication', {})
+    backend = settings.get('backend', 'mistral')
+    if backend == 'mistral':
+        resolved = EmbeddingBackend(client, model, MISTRAL_SIMILARITY_THRESHOLD)
+    elif backend == 'local':
+        resolved = local_backend()
+    else:
+        raise ValueError(f"Unknown deduplication backend '{backend}'")
+    resolved.similarity_threshold = settings.get('similarity_threshold', resolved.similarity_threshold)
+    return resolved
+
+
+def pairwise_similarities(embeddings) -> np.ndarray:
+    """The cosine similarities of all pairs (i < j) of the embeddings, as a flat array."""
+    matrix = np.asarray(embeddings, dtype=np.float64)
+    matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    rows, columns = np.triu_indices(len(matrix), k=1)
+    return np.einsum('ij,ij->i', matrix[rows], matrix[columns])
+
+
+def calibrate_threshold(reference_similarities: np.ndarray, local_similarities: np.ndarray, reference_threshold: float = MISTRAL_SIMILARITY_THRESHOLD) -> float:
+    """
+    Map a similarity threshold of a reference embedding model to another one by quantile matching: the
+    returned threshold flags the same share of pairs as duplicates as `reference_threshold` does.
+
+    Args:
+        reference_similarities (np.ndarray): The similarities of a set of issue pairs with the reference model.
+        local_similarities (np.ndarray): The similarities of the same pairs with the other model.
+        reference_threshold (float): The duplicate threshold of the reference model.
+
+    Returns:
+        float: The duplicate threshold of the other model.
+    """
+    duplicate_share = np.mean(np.asarray(reference_similarities) > reference_threshold)
+    if duplicate_share == 0:
+        # No duplicates to match: just above the most similar pair
+        return float(np.max(local_similarities)) + 1e-6
+    return float(np.quantile(local_similarities, 1 - duplicate_share))
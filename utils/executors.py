@@ -0,0 +1,79 @@
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+# Blocking I/O (HTTP calls, LibreOffice, file reads) waits in threads, CPU-heavy work (image encoding,
+# .pptx parsing, large pydantic payloads) runs in processes so it does not hold the event loop's GIL
+_executors: dict[str, Executor | None] = {'io': None, 'cpu': None}
+_settings = {'io_workers': None, 'cpu_workers': None, 'cpu': 'auto'}
+
+
+def configure_executors(io_workers: int | None = None, cpu_workers: int | None = None, cpu: str = 'auto') -> None:
+    """
+    Configure the worker pools used by `run_io` and `run_cpu`. Running pools are shut down and recreated on next use.
+
+    Args:
+        io_workers (int | None): The number of threads for blocking I/O, None for the Python default.
+        cpu_workers (int | None): The number of workers for CPU-heavy work, None for the number of CPUs.
+        cpu (str): 'process' to run CPU-heavy work in a process pool, 'thread' to keep it in threads
+            (eg, where processes cannot be spawned), 'auto' for processes only on machines with several CPUs
+            (on one CPU, the pickling costs more than it frees).
+    """
+    shutdown_executors()
+    _settings.update(io_workers=io_workers, cpu_workers=cpu_workers, cpu=cpu)
+
+
+def set_executor(kind: str, executor: Executor) -> None:
+    """Plug in an executor of your own for 'io' or 'cpu' work."""
+    _executors[kind] = executor
+
+
+def get_executor(kind: str) -> Executor:
+    if _executors[kind] is None:
+        use_processes = _settings['cpu'] == 'process' or (_settings['cpu'] == 'auto' and (os.cpu_count() or 1) > 1)
+        if kind == 'cpu' and use_processes:
+            # Spawned workers do not inherit the threads (and their locks) of the server process
+            _executors[kind] = ProcessPoolExecutor(
+                max_workers=_settings['cpu_workers'] or os.cpu_count(),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        else:
+            workers = _settings['cpu_workers'] if kind == 'cpu' else _settings['io_workers']
+            _executors[kind] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{kind}-worker")
+    return _executors[kind]
+
+
+async def run_io(fn: Callable, *args, **kwargs) -> Any:
+    """Run a blocking call (eg, a sync HTTP request) in the I/O thread pool, in a copy of the caller's context (eg its trace span)."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_executor('io'), functools.partial(context.run, fn, *args, **kwargs))
+
+
+async def run_cpu(fn: Callable, *args, **kwargs) -> Any:
+    """
+    Run CPU-heavy work in the CPU pool. For a process pool, `fn` must be a module-level function and its
+    arguments and result picklable; if they are not, or the pool broke, the call runs in the I/O thread pool.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(fn, *args, **kwargs)
+    try:
+        return await loop.run_in_executor(get_executor('cpu'), call)
+    except (BrokenProcessPool, pickle.PicklingError) as e:
+        print(f"Running {getattr(fn, '__name__', fn)} in a thread instead of the process pool: {e}")
+        if isinstance(e, BrokenProcessPool):
+            _executors['cpu'] = None
+        return await loop.run_in_executor(get_executor('io'), call)
+
+
+def shutdown_executors() -> None:
+    for kind, executor in _executors.items():
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+            _executors[kind] = None
@@ -0,0 +1,218 @@
+import numpy as np
+from typing import List
+from .models import DetectedIssue, ExtractedIssue, FontOutlier, IssueLocation, SlideModel
+
+FONT_ATTRIBUTES = ('font_name', 'size_pt', 'color', 'bold')
+
+# Placeholder types grouped into the roles whose runs should share one style
+PLACEHOLDER_ROLES = {
+    'TITLE': 'title',
+    'CENTER_TITLE': 'title',
+    'VERTICAL_TITLE': 'title',
+    'SUBTITLE': 'subtitle',
+    'BODY': 'body',
+    'OBJECT': 'body',
+    'VERTICAL_BODY': 'body',
+    'VERTICAL_OBJECT': 'body',
+    'FOOTER': 'footer',
+    'DATE': 'footer',
+    'SLIDE_NUMBER': 'footer',
+}
+ROLE_LOCATIONS = {
+    'title': IssueLocation.TITLE,
+    'subtitle': IssueLocation.TITLE,
+    'footer': IssueLocation.FOOTER,
+}
+
+# A role's style is only dominant if it covers this share of the role's characters
+MIN_DOMINANT_SHARE = 0.6
+# Roles with fewer characters than this are too small to have a dominant style
+MIN_ROLE_CHARACTERS = 20
+
+
+def _dominant_codes(groups: np.ndarray, codes: np.ndarray, weights: np.ndarray, n_groups: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Weighted mode of `codes` within each group, in one vectorized pass.
+
+    Args:
+    groups (np.ndarray): The group of each item (0..n_groups-1).
+    codes (np.ndarray): The value code of each item, -1 for unknown values which are ignored.
+    weights (np.ndarray): The weight of each item (eg, number of characters).
+    n_groups (int): The number of groups.
+
+    Returns:
+    tuple[np.ndarray, np.ndarray]: The dominant code of each group (-1 if none) and its share of the group's known weight.
+    """
+    known = codes >= 0
+    n_codes = int(codes.max()) + 1 if known.any() else 1
+    keys, key_index = np.unique(groups[known] * n_codes + codes[known], return_inverse=True)
+    key_weights = np.bincount(key_index, weights=weights[known], minlength=len(keys))
+    key_groups, key_codes = keys // n_codes, keys % n_codes
+
+    # Heaviest key first within each group, ties broken by the smaller code
+    order = np.lexsort((key_codes, -key_weights, key_groups))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = key_groups[order][1:] != key_groups[order][:-1]
+    winners = order[first]
+
+    dominant = np.full(n_groups, -1)
+    dominant[key_groups[winners]] = key_codes[winners]
+    totals = np.bincount(groups[known], weights=weights[known], minlength=n_groups)
+    share = np.zeros(n_groups)
+    share[key_groups[winners]] = key_weights[winners] / totals[key_groups[winners]]
+    return dominant, share
+
+
+def find_font_outliers(slide_models: dict[str, SlideModel], min_share: float = MIN_DOMINANT_SHARE) -> List[FontOutlier]:
+    """
+    Find text runs whose font deviates from the deck's dominant style for their placeholder role.
+
+    Every run's font name, size, color and bold state is gathered into NumPy arrays. The dominant value of each
+    attribute per role is the character-weighted mode; runs that differ from it are outliers if the mode is clear
+    enough (covers at least `min_share` of the role's characters). Inherited (unset) values are not compared.
+
+    Args:
+    slide_models (dict[str, SlideModel]): The slide models of the whole deck.
+    min_share (float): The minimum share of characters the dominant value must cover.
+
+    Returns:
+    List[FontOutlier]: One entry per deviating run and attribute, with the dominant value as the targeted fix.
+    """
+    rows = [
+        (slide.slide_index, shape.shape_id, PLACEHOLDER_ROLES.get(shape.placeholder_type, 'text_box'), run)
+        for slide in slide_models.values()
+        for shape in slide.shapes
+        for run in shape.runs
+        if run.text.strip()  # the style of whitespace is not visible
+    ]
+    if not rows:
+        return []
+
+    role_names, roles = np.unique([role for _, _, role, _ in rows], return_inverse=True)
+    weights = np.array([len(run.text.strip()) for _, _, _, run in rows], dtype=float)
+    role_characters = np.bincount(roles, weights=weights, minlength=len(role_names))
+    # The shape of each run, for the mixed values within a shape
+    shape_names, shapes = np.unique([f"{slide_index}:{shape_id}" for slide_index, shape_id, _, _ in rows], return_inverse=True)
+
+    outliers = []
+    for attribute in FONT_ATTRIBUTES:
+        values = [getattr(run, attribute) for _, _, _, run in rows]
+        labels = np.array(["" if value is None else str(value) for value in values])
+        value_names, codes = np.unique(labels, return_inverse=True)
+        # Unknown (inherited) values get code -1
+        codes = np.where(labels == "", -1, codes)
+
+        dominant, share = _dominant_codes(roles, codes, weights, len(role_names))
+        clear = (share >= min_share) & (role_characters >= MIN_ROLE_CHARACTERS)
+        deviating = (codes >= 0) & clear[roles] & (codes != dominant[roles])
+
+        for index in np.flatnonzero(deviating):
+            slide_index, shape_id, role, run = rows[index]
+            outliers.append(FontOutlier(
+                slide_index=slide_index,
+                shape_id=shape_id,
+                paragraph_index=run.paragraph_index,
+                run_index=run.run_index,
+                role=role,
+                attribute=attribute,
+                value=value_names[codes[index]],
+                dominant_value=value_names[dominant[roles[index]]]
+            ))
+
+        # Within a single shape, mixed explicit values are inconsistent regardless of the deck
+        shape_dominant, shape_share = _dominant_codes(shapes, codes, weights, len(shape_names))
+        mixed = (codes >= 0) & (shape_share[shapes] < 1.0) & (codes != shape_dominant[shapes]) & ~deviating
+        for index in np.flatnonzero(mixed):
+            slide_index, shape_id, role, run = rows[index]
+            outliers.append(FontOutlier(
+                slide_index=slide_index,
+                shape_id=shape_id,
+                paragraph_index=run.paragraph_index,
+                run_index=run.run_index,
+                role=role,
+                attribute=attribute,
+                value=value_names[codes[index]],
+                dominant_value=value_names[shape_dominant[shapes[index]]]
+            ))
+
+    return outliers
+
+
+def check_font_consistency(slide_models: dict[str, SlideModel], category: str, pptx_file: str) -> List[DetectedIssue]:
+    """
+    Deck-wide font consistency check, one issue per shape with deviating runs.
+
+    Args:
+    slide_models (dict[str, SlideModel]): The slide models of the whole deck.
+    category (str): The checker name recorded on the issues.
+    pptx_file (str): The file recorded on the issues.
+
+    Returns:
+    List[DetectedIssue]: The issues found, no API calls.
+    """
+    shapes = {
+        (slide.slide_index, shape.shape_id): shape
+        for slide in slide_models.values() for shape in slide.shapes
+    }
+
+    by_shape = {}
+    for outlier in find_font_outliers(slide_models):
+        by_shape.setdefault((outlier.slide_index, outlier.shape_id), []).append(outlier)
+
+    issues = []
+    for (slide_index, shape_id), outliers in by_shape.items():
+        shape = shapes[(slide_index, shape_id)]
+        changes = sorted({f"{o.attribute.replace('_pt', '').replace('_', ' ')} {o.value} instead of {o.dominant_value}" for o in outliers})
+        text = (shape.text or "").strip()
+        issues.append(DetectedIssue(
+            extracted_issue=ExtractedIssue(
+                issue_description=f"Inconsistent font: runs in '{shape.name}' ({outliers[0].role.replace('_', ' ')} text) deviate from the dominant style: {', '.join(changes)}. Apply the same font style throughout.",
+                element_location=ROLE_LOCATIONS.get(outliers[0].role, IssueLocation.BODY_TEXT),
+                element_identification_contains_text=text.splitlines()[0][:60] if text else None,
+                element_identification_verbatim=None if text else f"Shape '{shape.name}' (id {shape_id})",
+                severity='medium'
+            ),
+            category=category,
+            page_id=slide_index,
+            file=pptx_file
+        ))
+    return issues
+
+
+def apply_font_fixes(prs, outliers: List[FontOutlier]) -> int:
+    """
+    Restyle only the deviating runs to the dominant style of their role.
+
+    Args:
+    prs (Presentation): The open presentation the outliers were computed from.
+    outliers (List[FontOutlier]): The outliers from `find_font_outliers`.
+
+    Returns:
+    int: The number of run attributes changed.
+    """
+    from pptx.dml.color import RGBColor
+    from pptx.enum.dml import MSO_THEME_COLOR
+    from pptx.util import Pt
+    from .pptx_utils import iter_shapes
+
+    changed = 0
+    for outlier in outliers:
+        slide = prs.slides[outlier.slide_index]
+        shape = next((s for s in iter_shapes(slide.shapes) if s.shape_id == outlier.shape_id), None)
+        if shape is None or not shape.has_text_frame:
+            continue
+        font = shape.text_frame.paragraphs[outlier.paragraph_index].runs[outlier.run_index].font
+
+        if outlier.attribute == 'font_name':
+            font.name = outlier.dominant_value
+        elif outlier.attribute == 'size_pt':
+            font.size = Pt(float(outlier.dominant_value))
+        elif outlier.attribute == 'bold':
+            font.bold = outlier.dominant_value == 'True'
+        elif outlier.attribute == 'color':
+            if outlier.dominant_value.startswith('theme:'):
+                font.color.theme_color = MSO_THEME_COLOR[outlier.dominant_value.removeprefix('theme:')]
+            else:
+                font.color.rgb = RGBColor.from_string(outlier.dominant_value)
+        changed += 1
+    return changed
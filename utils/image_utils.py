@@ -42,3 +42,21 @@ def get_image_data_url(encoded_image: str, image_format: str) -> str:
         str: A data URL for the image.
     """
     return f"data:image/{image_format.lower()};base64,{encoded_image}"
+
+
+def get_thumbnail_data_url(image_path: str, max_width: int = 400) -> str:
+    """
+    Create a small JPEG data URL of an image for previews.
+
+    Args:
+        image_path (str): The path to the image file.
+        max_width (int): The maximum width of the thumbnail in pixels.
+
+    Returns:
+        str: A data URL for the thumbnail.
+    """
+    with Image.open(image_path) as img:
+        img.thumbnail((max_width, max_width * 4))
+        buffer = io.BytesIO()
+        img.convert("RGB").save(buffer, format="JPEG", quality=80)
+    return get_image_data_url(base64.b64encode(buffer.getvalue()).decode('utf-8'), "JPEG")
@@ -0,0 +1,152 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import List
+
+import numpy as np
+
+from .models import DetectedIssue
+from .embeddings import HashedNgramEmbedder, LOCAL_SIMILARITY_THRESHOLD
+
+VERDICTS = ('accepted', 'dismissed')
+
+
+class IssueMemory:
+    """
+    Persistent memory of the issues reviewers accepted or dismissed, to suppress dismissed findings on re-runs.
+
+    Each remembered issue has a float16 vector (local embedding of its description, see `HashedNgramEmbedder`)
+    in a memory-mapped file, and a row in an SQLite index with its organization, deck, category, location and
+    verdict. A new issue matches a remembered one of the same organization, category and location when their
+    descriptions are more similar than the threshold; decks are identified by file name, so dismissals survive
+    edits of the deck. Issues recorded without a deck apply to every deck of the organization.
+
+    Several instances (eg the Gradio app and the batch command) can share a root: vector rows are assigned
+    by SQLite in a write transaction, and the vector file is remapped when another instance has grown it.
+
+    Example:
+        memory = IssueMemory('data_cache/issue_memory', org='acme')
+        memory.record(dismissed_issues, 'dismissed')
+        kept_issues = memory.suppress(new_issues)
+    """
+
+    def __init__(self, root: str = 'data_cache/issue_memory', org: str = 'default', similarity_threshold: float = LOCAL_SIMILARITY_THRESHOLD,
+                 embedder: HashedNgramEmbedder | None = None):
+        os.makedirs(root, exist_ok=True)
+        self.org = org
+        self.similarity_threshold = similarity_threshold
+        self.embedder = embedder or HashedNgramEmbedder()
+        self.vectors_path = os.path.join(root, 'vectors.f16')
+        self.lock = threading.Lock()
+        # Autocommit, with explicit transactions where rows are assigned
+        self.conn = sqlite3.connect(os.path.join(root, 'index.sqlite'), check_same_thread=False, isolation_level=None)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS issues (
+                row INTEGER PRIMARY KEY,
+                org TEXT NOT NULL,
+                deck TEXT,
+                category TEXT NOT NULL,
+                element_location TEXT NOT NULL,
+                verdict TEXT NOT NULL,
+                issue TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS issues_scope ON issues (org, category, element_location)")
+        self.vectors = self._open(max(self._next_row(), 1))
+
+    def _next_row(self) -> int:
+        return self.conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM issues").fetchone()[0]
+
+    def _ensure_rows(self, rows: int) -> None:
+        """Make the first `rows` vector rows addressable, remapping the file if it grew (or must grow)."""
+        if rows > len(self.vectors):
+            self.vectors.flush()
+            # Grow geometrically, so appends stay amortized O(1)
+            self.vectors = self._open(max(2 * len(self.vectors), rows))
+
+    def _open(self, capacity: int) -> np.memmap:
+        """Map the vector file, growing it to at least `capacity` rows."""
+        size = capacity * self.embedder.dim * np.dtype(np.float16).itemsize
+        with open(self.vectors_path, 'ab') as f:
+            if f.tell() < size:
+                f.truncate(size)
+        rows = os.path.getsize(self.vectors_path) // (self.embedder.dim * np.dtype(np.float16).itemsize)
+        return np.memmap(self.vectors_path, dtype=np.float16, mode='r+', shape=(rows, self.embedder.dim))
+
+    def record(self, issues: List[DetectedIssue], verdict: str, deck: str | None = '') -> None:
+        """
+        Remember the reviewer's verdict on some issues.
+
+        Args:
+            issues (List[DetectedIssue]): The reviewed issues.
+            verdict (str): 'accepted' or 'dismissed'.
+            deck (str | None): The deck the verdict applies to, '' for the file name of each issue,
+                None for every deck of the organization.
+
+        Raises:
+            ValueError: If the verdict is unknown.
+        """
+        if verdict not in VERDICTS:
+            raise ValueError(f"Unknown verdict '{verdict}', expected one of {VERDICTS}")
+        if not issues:
+            return
+        embeddings = self.embedder.get_embeddings('local', [issue.extracted_issue.issue_description for issue in issues])
+        with self.lock:
+            # The write lock keeps other instances from taking the same rows until the rows are committed
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                first = self._next_row()
+                self._ensure_rows(first + len(issues))
+                self.vectors[first:first + len(issues)] = np.asarray(embeddings, dtype=np.float16)
+                self.vectors.flush()
+                self.conn.executemany(
+                    "INSERT INTO issues (row, org, deck, category, element_location, verdict, issue) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (first + offset, self.org, os.path.basename(issue.file) if deck == '' else deck, issue.category,
+                         issue.extracted_issue.element_location.value, verdict, json.dumps(issue.model_dump(mode='json')))
+                        for offset, issue in enumerate(issues)
+                    ]
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def match(self, issues: List[DetectedIssue]) -> List[str | None]:
+        """
+        The verdict on the most similar remembered issue of each issue, None if there is none above the threshold.
+        """
+        verdicts = [None] * len(issues)
+        if not issues:
+            return verdicts
+        embeddings = np.asarray(self.embedder.get_embeddings('local', [issue.extracted_issue.issue_description for issue in issues]), dtype=np.float32)
+        for index, issue in enumerate(issues):
+            with self.lock:
+                candidates = self.conn.execute(
+                    "SELECT row, verdict FROM issues WHERE org=? AND category=? AND element_location=? AND (deck IS NULL OR deck=?)",
+                    (self.org, issue.category, issue.extracted_issue.element_location.value, os.path.basename(issue.file))
+                ).fetchall()
+                if not candidates:
+                    continue
+                rows = np.array([row for row, _ in candidates])
+                # Rows recorded by another instance may lie beyond our mapping
+                self._ensure_rows(int(rows.max()) + 1)
+                similarities = self.vectors[rows].astype(np.float32) @ embeddings[index]
+            best = int(np.argmax(similarities))
+            if similarities[best] > self.similarity_threshold:
+                verdicts[index] = candidates[best][1]
+        return verdicts
+
+    def suppress(self, issues: List[DetectedIssue]) -> List[DetectedIssue]:
+        """The issues that do not match a dismissed issue."""
+        verdicts = self.match(issues)
+        kept = [issue for issue, verdict in zip(issues, verdicts) if verdict != 'dismissed']
+        if len(kept) < len(issues):
+            print(f"Suppressed {len(issues) - len(kept)} previously dismissed issues")
+        return kept
+
+    def close(self) -> None:
+        self.vectors.flush()
+        self.conn.close()
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict
+
+
+class Job:
+    """
+    The state of one background analysis, updated on the job loop and read by the UI while it runs.
+
+    `partial` holds incremental results (eg, the issues of the slides checked so far), `result` the final
+    result once `status` is 'done'.
+    """
+
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.status = 'queued'  # running, done, failed or cancelled
+        self.done = 0
+        self.total = 0
+        self.message = "Queued"
+        self.partial: Dict[str, Any] = {}
+        self.result: Any = None
+        self.error: str | None = None
+        self.created = time.time()
+        self.finished: float | None = None
+        self.future = None
+
+    def update(self, done: int, total: int, message: str | None = None) -> None:
+        self.done, self.total = done, total
+        if message is not None:
+            self.message = message
+
+    @property
+    def progress(self) -> float:
+        return self.done / self.total if self.total else 0.0
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ('done', 'failed', 'cancelled')
+
+
+class JobManager:
+    """
+    Run analyses as background jobs on one shared, long-lived event loop.
+
+    The loop runs in a daemon thread, so request handlers only submit a job and return its id; the UI then
+    polls the job for progress and incremental results. At most `max_concurrent` jobs run at the same time,
+    the others wait in order.
+
+    Example:
+        jobs = JobManager(max_concurrent=4)
+        job_id = jobs.submit(lambda job: analyse(job, path))
+        jobs.get(job_id).progress
+    """
+
+    def __init__(self, max_concurrent: int = 4, keep_finished: float = 3600):
+        self.keep_finished = keep_finished
+        self.jobs: Dict[str, Job] = {}
+        self.loop = asyncio.new_event_loop()
+        self.slots = asyncio.Semaphore(max_concurrent)
+        self.thread = threading.Thread(target=self.loop.run_forever, name="job-loop", daemon=True)
+        self.thread.start()
+
+    def submit(self, run: Callable[[Job], Awaitable[Any]]) -> str:
+        """
+        Start a job in the background.
+
+        Args:
+            run (Callable[[Job], Awaitable[Any]]): Called with the job, returns the coroutine to run. It reports
+                progress with `job.update` and incremental results in `job.partial`.
+
+        Returns:
+            str: The job id.
+        """
+        self._prune()
+        job = Job(uuid.uuid4().hex)
+        self.jobs[job.id] = job
+        job.future = asyncio.run_coroutine_threadsafe(self._run(job, run), self.loop)
+        return job.id
+
+    async def _run(self, job: Job, run: Callable[[Job], Awaitable[Any]]) -> None:
+        async with self.slots:
+            job.status, job.message = 'running', "Running"
+            try:
+                job.result = await run(job)
+                job.status, job.message = 'done', "Done"
+            except asyncio.CancelledError:
+                job.status, job.message = 'cancelled', "Cancelled"
+                raise
+            except Exception as e:
+                print(f"Job {job.id} failed: {e}")
+                job.status, job.message, job.error = 'failed', "Failed", str(e)
+            finally:
+                job.finished = time.time()
+
+    def get(self, job_id: str | None) -> Job | None:
+        return self.jobs.get(job_id) if job_id else None
+
+    def cancel(self, job_id: str) -> None:
+        job = self.jobs.get(job_id)
+        if job is not None and not job.is_finished:
+            job.future.cancel()
+
+    def _prune(self) -> None:
+        # Forget jobs whose results were not collected for a while
+        now = time.time()
+        for job_id, job in list(self.jobs.items()):
+            if job.finished is not None and now - job.finished > self.keep_finished:
+                del self.jobs[job_id]
+
+    def shutdown(self) -> None:
+        for job in self.jobs.values():
+            if not job.is_finished:
+                job.future.cancel()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
@@ -0,0 +1,188 @@
+import heapq
+import re
+from collections import Counter
+from typing import List
+from .models import ExtractedIssue, IssueLocation, ShapeData, SlideModel, TableData
+
+EMU_PER_INCH = 914400
+# Edges closer than this, but not equal, look like a failed attempt to align
+ALIGNMENT_TOLERANCE = EMU_PER_INCH // 16
+# Overlaps smaller than this share of the smaller shape are ignored (eg, touching borders)
+MIN_OVERLAP_SHARE = 0.02
+# Shapes covering this share of the slide are backgrounds, not items that can overlap
+BACKGROUND_SHARE = 0.9
+
+PROMPT_TEXT_PATTERN = re.compile(
+    r'^(click|type|insert|add|enter)\b.*\b(here|text|title|subtitle|caption|picture)\b|^lorem ipsum',
+    re.IGNORECASE
+)
+
+
+def _shape_reference(shape: ShapeData) -> str:
+    return f"Shape '{shape.name}' (id {shape.shape_id})"
+
+
+def _location(shape: ShapeData) -> IssueLocation:
+    if shape.placeholder_type in ('TITLE', 'CENTER_TITLE', 'SUBTITLE'):
+        return IssueLocation.TITLE
+    if shape.placeholder_type in ('FOOTER', 'DATE', 'SLIDE_NUMBER'):
+        return IssueLocation.FOOTER
+    return IssueLocation.BODY_TEXT if shape.text else IssueLocation.BODY_VISUAL
+
+
+def _contains_text(shape: ShapeData) -> str | None:
+    # A short phrase from the first non-empty line identifies the shape for fixing
+    if shape.text and shape.text.strip():
+        return shape.text.strip().splitlines()[0][:60]
+    return None
+
+
+def find_overlaps(shapes: List[ShapeData]) -> List[tuple[ShapeData, ShapeData]]:
+    """
+    Find all pairs of overlapping bounding boxes with a sweep line over the left edges.
+
+    Boxes are visited by their left edge; a heap keyed by the right edge holds the boxes the sweep line
+    still crosses, so each box is only compared against boxes it overlaps horizontally.
+    Runs in O(n log n + k) for k horizontally overlapping pairs.
+
+    Args:
+    shapes (List[ShapeData]): The shapes to check.
+
+    Returns:
+    List[tuple[ShapeData, ShapeData]]: The overlapping pairs, in order of the sweep.
+    """
+    overlaps = []
+    active = []  # heap of (right edge, index)
+    order = sorted(range(len(shapes)), key=lambda i: shapes[i].left)
+    for i in order:
+        shape = shapes[i]
+        while active and active[0][0] <= shape.left:
+            heapq.heappop(active)
+        for _, j in active:
+            other = shapes[j]
+            if other.top < shape.top + shape.height and shape.top < other.top + other.height:
+                overlaps.append((other, shape))
+        heapq.heappush(active, (shape.left + shape.width, i))
+    return overlaps
+
+
+def _overlap_share(a: ShapeData, b: ShapeData) -> float:
+    width = min(a.left + a.width, b.left + b.width) - max(a.left, b.left)
+    height = min(a.top + a.height, b.top + b.height) - max(a.top, b.top)
+    smaller_area = min(a.width * a.height, b.width * b.height)
+    return (width * height) / smaller_area if smaller_area > 0 else 0.0
+
+
+def find_near_misses(shapes: List[ShapeData], edge: str, tolerance: int = ALIGNMENT_TOLERANCE) -> List[tuple[ShapeData, ShapeData]]:
+    """
+    Find pairs of shapes whose edges are almost, but not exactly, aligned.
+
+    Sorting the edge positions puts near misses next to each other, so only neighbours are compared: O(n log n).
+
+    Args:
+    shapes (List[ShapeData]): The shapes to check.
+    edge (str): 'left' or 'top'.
+    tolerance (int): The maximum distance in EMU that still counts as a near miss.
+
+    Returns:
+    List[tuple[ShapeData, ShapeData]]: The pairs of neighbouring shapes with near-miss edges.
+    """
+    ordered = sorted(shapes, key=lambda shape: getattr(shape, edge))
+    return [
+        (a, b) for a, b in zip(ordered, ordered[1:])
+        if 0 < getattr(b, edge) - getattr(a, edge) <= tolerance
+    ]
+
+
+def check_table_alignment(table: TableData) -> List[ExtractedIssue]:
+    issues = []
+    if not table.alignments:
+        return issues
+
+    header = table.cells[0] if table.cells else []
+    # Header cells of the data columns should share one alignment
+    header_alignments = table.alignments[0][1:]
+    misaligned = []
+    if len(header_alignments) > 1:
+        dominant, _ = Counter(header_alignments).most_common(1)[0]
+        misaligned.extend(
+            f"'{header[index + 1]}'" for index, alignment in enumerate(header_alignments) if alignment != dominant
+        )
+
+    # Body cells should share one alignment per column
+    body = table.alignments[1:]
+    for column_index in range(len(table.alignments[0])):
+        column = [row[column_index] for row in body if column_index < len(row)]
+        if len(set(column)) > 1:
+            label = header[column_index] if column_index < len(header) else f"#{column_index + 1}"
+            misaligned.append(f"'{label}' (body)")
+
+    if misaligned:
+        issues.append(ExtractedIssue(
+            issue_description=f"Alignment: table cells {', '.join(misaligned)} are aligned differently from the rest of their row or column. Use one alignment for all headers and one per column.",
+            element_location=IssueLocation.BODY_VISUAL,
+            element_identification_verbatim=f"Table '{table.shape_name}'",
+            severity='medium'
+        ))
+    return issues
+
+
+def check_layout(slide: SlideModel) -> List[ExtractedIssue]:
+    """
+    Check the geometry and structure of a slide: overlapping items, near-miss alignments,
+    unused placeholders and table cell alignment. No API calls.
+
+    Args:
+    slide (SlideModel): The slide model extracted from the .pptx file.
+
+    Returns:
+    List[ExtractedIssue]: The issues found, each referencing the exact shapes involved.
+    """
+    issues = []
+    slide_area = slide.slide_width * slide.slide_height
+    items = [
+        shape for shape in slide.shapes
+        if shape.has_content and shape.width > 0 and shape.height > 0
+        and not (slide_area and shape.width * shape.height >= BACKGROUND_SHARE * slide_area)
+    ]
+
+    # Overlapping items
+    for a, b in find_overlaps(items):
+        if _overlap_share(a, b) >= MIN_OVERLAP_SHARE:
+            issues.append(ExtractedIssue(
+                issue_description=f"Position: {_shape_reference(a)} and {_shape_reference(b)} overlap. Move or resize one of them so they do not cover each other.",
+                element_location=_location(b),
+                element_identification_contains_text=_contains_text(b),
+                element_identification_verbatim=None if _contains_text(b) else _shape_reference(b),
+                severity='high'
+            ))
+
+    # Near-miss alignments
+    for edge in ('left', 'top'):
+        for a, b in find_near_misses(items, edge):
+            issues.append(ExtractedIssue(
+                issue_description=f"Alignment: the {edge} edges of {_shape_reference(a)} and {_shape_reference(b)} are {abs(getattr(b, edge) - getattr(a, edge)) / EMU_PER_INCH:.2f} in apart. Align them exactly.",
+                element_location=_location(b),
+                element_identification_contains_text=_contains_text(b),
+                element_identification_verbatim=None if _contains_text(b) else _shape_reference(b),
+                severity='low'
+            ))
+
+    # Unused placeholders: empty or still showing prompt text
+    for shape in slide.shapes:
+        if shape.placeholder_type is None or shape.placeholder_type in ('SLIDE_NUMBER', 'DATE', 'FOOTER'):
+            continue
+        text = (shape.text or "").strip()
+        if not shape.has_content or (text and (text == shape.layout_prompt_text or PROMPT_TEXT_PATTERN.match(text))):
+            issues.append(ExtractedIssue(
+                issue_description=f"Unused placeholder: {_shape_reference(shape)} " + (f"still shows the prompt text ('{text}')." if text else "is empty.") + " Fill it with real content or delete it.",
+                element_location=_location(shape),
+                element_identification_contains_text=text or None,
+                element_identification_verbatim=None if text else _shape_reference(shape),
+                severity='medium'
+            ))
+
+    for table in slide.tables:
+        issues.extend(check_table_alignment(table))
+
+    return issues
@@ -1,5 +1,19 @@
+import re
+import json
+import time
+import zlib
+import asyncio
+import threading
+from collections import Counter
 from typing import List
-from .models import ExtractedIssue, DetectedIssue, IssueLocation
+
+import numpy as np
+from pydantic import BaseModel
+
+from .models import ExtractedIssue, DetectedIssue, IssueLocation, ExtractedIssueList, IsValidIssue, IssueVerdict, IssueVerdictList
+from .client import MistralClientWrapper
+from .embeddings import HashedNgramEmbedder
+from .tracing import span
 
 
 def generate_mock_detected_issues() -> List[DetectedIssue]:
@@ -67,3 +81,93 @@ def generate_mock_detected_issues() -> List[DetectedIssue]:
     ]
     
     return mock_issues
+
+
+# Seconds per request of the mock backend, roughly what the hosted models take for one slide
+MOCK_LATENCY = {
+    'mistral-large-latest': 2.0,
+    'pixtral-12b-2409': 3.5,
+    'mistral-small-latest': 0.8,
+    'mistral-embed': 0.3,
+}
+# Issue descriptions the mock checkers draw from: '{word}' is a word of the slide, so issues differ between
+# slides, while the footer typo repeats across the deck like real boilerplate findings
+MOCK_ISSUES = [
+    ("There's a spelling error in the title: '{word}' looks misspelled.", IssueLocation.TITLE),
+    ("The text mentioning '{word}' is not aligned with the other bullet points.", IssueLocation.BODY_TEXT),
+    ("The chart near '{word}' lacks axis labels, making the data difficult to interpret.", IssueLocation.BODY_VISUAL),
+    ("There's a typo in the footer: 'Confidental' should be 'Confidential'.", IssueLocation.FOOTER),
+]
+
+
+class MockLLMClient:
+    """
+    A local stand-in for `MistralClientWrapper` with realistic latency and deterministic answers, for benchmarks.
+
+    Checker calls return 0-2 issues derived from the slide text, validation calls accept most issues and
+    embeddings are local (see `HashedNgramEmbedder`). Every request is counted in `stats`, with the bytes
+    of the messages sent.
+
+    Args:
+        latency_scale (float): Multiplies the latencies of `MOCK_LATENCY`, eg 0.1 for quick runs.
+        seed (int): The seed of the latency jitter.
+    """
+
+    build_messages = staticmethod(MistralClientWrapper.build_messages)
+    build_messages_async = MistralClientWrapper.build_messages_async
+
+    def __init__(self, latency_scale: float = 1.0, seed: int = 0):
+        self.latency_scale = latency_scale
+        self.rng = np.random.default_rng(seed)
+        self.embedder = HashedNgramEmbedder(dim=1024)
+        self.lock = threading.Lock()
+        self.stats = Counter()
+
+    def _latency(self, model: str) -> float:
+        with self.lock:
+            # Log-normal jitter around the typical latency, like real API response times
+            return MOCK_LATENCY.get(model, 1.0) * self.latency_scale * float(self.rng.lognormal(0.0, 0.3))
+
+    def _count(self, model: str, payload) -> int:
+        """Count a request and return its size in bytes."""
+        size = len(json.dumps(payload))
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats[f"requests:{model}"] += 1
+            self.stats['bytes_sent'] += size
+        return size
+
+    async def complete_with_retry(self, model: str, messages: list, ResponseModel: BaseModel) -> BaseModel:
+        size = self._count(model, messages)
+        with span("api", model=model, response_model=ResponseModel.__name__, bytes_sent=size, attempts=1):
+            await asyncio.sleep(self._latency(model))
+        text = messages[1]['content'][0]['text']
+
+        if ResponseModel is ExtractedIssueList:
+            words = re.findall(r"[A-Za-z]{5,}", text) or ["slide"]
+            digest = zlib.crc32(text.encode())
+            issues = []
+            for k in range(digest % 3):
+                description, location = MOCK_ISSUES[(digest >> (4 * k + 2)) % len(MOCK_ISSUES)]
+                issues.append(ExtractedIssue(
+                    issue_description=description.format(word=words[(digest >> 8) % len(words)]),
+                    element_location=location,
+                    severity=('low', 'medium', 'high')[(digest >> (4 * k + 12)) % 3]
+                ))
+            return ExtractedIssueList(issues=issues)
+        if ResponseModel is IssueVerdictList:
+            issue_ids = [int(issue_id) for issue_id in re.findall(r"^(\d+)\. '", text, re.M)]
+            return IssueVerdictList(verdicts=[IssueVerdict(issue_id=issue_id, is_valid=zlib.crc32(f"{issue_id}{text}".encode()) % 10 != 0) for issue_id in issue_ids])
+        if ResponseModel is IsValidIssue:
+            return IsValidIssue(is_valid=zlib.crc32(text.encode()) % 10 != 0)
+        raise ValueError(f"The mock backend has no answers for {ResponseModel.__name__}")
+
+    def get_embeddings(self, model: str, texts: List[str]) -> List[np.ndarray]:
+        size = self._count(model, texts)
+        with span("embeddings", model=model, texts=len(texts), bytes_sent=size):
+            time.sleep(self._latency(model))
+            return [self.embedder.embed(text) for text in texts]
+
+    # The mock never fails, so an attempt is a whole call (eg for `RateLimitedClient`)
+    complete_once = complete_with_retry
+    embed_once = get_embeddings
@@ -45,6 +45,12 @@ class DetectedIssue(BaseModel):
     file: str = Field(
         description="The name or path of the file where the issue was found."
     )
+    affected_pages: list[int] = Field(default_factory=list,
+        description="All the pages with this issue when duplicates on several pages were merged into it, otherwise empty."
+    )
+    local: bool = Field(default=False,
+        description="Whether a local check of the slide data (no model) found the issue, so it needs no validation."
+    )
     
     
 class ExtractedIssueList(BaseModel):
@@ -52,3 +58,296 @@ class ExtractedIssueList(BaseModel):
         description="A list of issues found in the provided inputs.",
         default_factory=list
     )
+
+
+class ChartAxisData(BaseModel):
+    kind: str = Field(
+        description="The axis kind: 'category' or 'value'."
+    )
+    title: Optional[str] = Field(default=None,
+        description="The axis title text, if the axis has one."
+    )
+    number_format: Optional[str] = Field(default=None,
+        description="The number format code of the tick labels (eg, '$#,##0.0')."
+    )
+
+
+class ChartSeriesData(BaseModel):
+    name: str = Field(
+        description="The series name as shown in the legend."
+    )
+    values: list[Optional[float]] = Field(
+        description="The series values, None for empty points.",
+        default_factory=list
+    )
+    number_format: Optional[str] = Field(default=None,
+        description="The number format code of the cached series values."
+    )
+
+
+class ChartData(BaseModel):
+    shape_name: str = Field(
+        description="The name of the shape holding the chart."
+    )
+    chart_type: str = Field(
+        description="The chart type (eg, 'COLUMN_STACKED')."
+    )
+    title: Optional[str] = Field(default=None,
+        description="The chart title text, if the chart has one."
+    )
+    categories: list[str] = Field(
+        description="The category labels of the first plot.",
+        default_factory=list
+    )
+    series: list[ChartSeriesData] = Field(
+        description="All series across all plots of the chart.",
+        default_factory=list
+    )
+    axes: list[ChartAxisData] = Field(
+        description="The category and value axes, empty for charts without axes (eg, pie).",
+        default_factory=list
+    )
+
+
+class TableData(BaseModel):
+    shape_name: str = Field(
+        description="The name of the shape holding the table."
+    )
+    cells: list[list[str]] = Field(
+        description="The cell texts, row by row. The first row is assumed to be the header.",
+        default_factory=list
+    )
+    alignments: list[list[Optional[str]]] = Field(
+        description="The paragraph alignment of each cell (eg, 'LEFT', 'CENTER'), None if inherited.",
+        default_factory=list
+    )
+
+
+class TextRunData(BaseModel):
+    text: str = Field(
+        description="The text of the run."
+    )
+    paragraph_index: int = Field(
+        description="The index of the paragraph within the shape's text frame."
+    )
+    run_index: int = Field(
+        description="The index of the run within its paragraph."
+    )
+    font_name: Optional[str] = Field(default=None,
+        description="The typeface, None if inherited."
+    )
+    size_pt: Optional[float] = Field(default=None,
+        description="The font size in points, None if inherited."
+    )
+    color: Optional[str] = Field(default=None,
+        description="The font color as RGB hex (eg, 'FF0000') or theme color (eg, 'theme:ACCENT_1'), None if inherited."
+    )
+    bold: Optional[bool] = Field(default=None,
+        description="Whether the run is bold, None if inherited."
+    )
+
+
+class ShapeData(BaseModel):
+    shape_id: int = Field(
+        description="The id of the shape, unique within the slide."
+    )
+    name: str = Field(
+        description="The name of the shape (eg, 'Title 1')."
+    )
+    kind: str = Field(
+        description="The shape type (eg, 'PLACEHOLDER', 'PICTURE', 'TEXT_BOX')."
+    )
+    placeholder_type: Optional[str] = Field(default=None,
+        description="The placeholder type (eg, 'TITLE', 'BODY'), None if the shape is not a placeholder."
+    )
+    left: int = Field(default=0, description="Left edge of the shape, in EMU.")
+    top: int = Field(default=0, description="Top edge of the shape, in EMU.")
+    width: int = Field(default=0, description="Width of the shape, in EMU.")
+    height: int = Field(default=0, description="Height of the shape, in EMU.")
+    text: Optional[str] = Field(default=None,
+        description="The text of the shape, None if it has no text frame."
+    )
+    has_content: bool = Field(default=True,
+        description="Whether the shape shows anything: text, a picture, a chart or a table."
+    )
+    layout_prompt_text: Optional[str] = Field(default=None,
+        description="The prompt text of the matching layout placeholder (eg, 'Click to add title')."
+    )
+    runs: list[TextRunData] = Field(
+        description="The formatted text runs of the shape, empty if it has no text frame.",
+        default_factory=list
+    )
+
+
+class SlideModel(BaseModel):
+    slide_index: int = Field(
+        description="The slide index (0-based)."
+    )
+    text: str = Field(
+        description="All text on the slide, one shape per line."
+    )
+    charts: list[ChartData] = Field(
+        description="The native charts on the slide.",
+        default_factory=list
+    )
+    tables: list[TableData] = Field(
+        description="The native tables on the slide.",
+        default_factory=list
+    )
+    opaque_visual_count: int = Field(default=0,
+        description="Number of pictures and embedded objects that can only be checked from a screenshot."
+    )
+    shapes: list[ShapeData] = Field(
+        description="All shapes on the slide with their bounding boxes, group shapes flattened.",
+        default_factory=list
+    )
+    slide_width: int = Field(default=0, description="Width of the slide, in EMU.")
+    slide_height: int = Field(default=0, description="Height of the slide, in EMU.")
+
+
+class CheckerError(BaseModel):
+    checker: str = Field(
+        description="The name of the checker that failed, or the pipeline step (eg, 'render')."
+    )
+    page_id: Optional[int] = Field(default=None,
+        description="The page number of the slide, None for deck-level checks."
+    )
+    error_type: str = Field(
+        description="'timeout' or the exception class name."
+    )
+    message: str = Field(
+        description="The error message."
+    )
+
+
+class SlideResult(BaseModel):
+    page_id: int = Field(
+        description="The page number of the slide."
+    )
+    issues: list[DetectedIssue] = Field(
+        description="The validated issues of the slide, not yet deduplicated across slides.",
+        default_factory=list
+    )
+    raw_issue_count: int = Field(default=0,
+        description="The number of issues the checkers returned before validation."
+    )
+    thumbnail_url: Optional[str] = Field(default=None,
+        description="A small data URL preview of the slide, if it was rendered."
+    )
+    errors: list[CheckerError] = Field(
+        description="The checkers that failed or timed out on this slide.",
+        default_factory=list
+    )
+
+
+class DedupEvent(BaseModel):
+    kind: str = Field(
+        description="'add' (a new cluster), 'merge' (an issue joined a cluster, its representative stays) or 'replace' (the representative of a cluster changed)."
+    )
+    cluster_id: int = Field(
+        description="The cluster to show `issue` for, replacing what was shown for it before."
+    )
+    issue: DetectedIssue = Field(
+        description="The representative of the cluster, with the slides of the whole cluster in `affected_pages`."
+    )
+    removed_clusters: list[int] = Field(
+        description="Clusters merged into this one, to stop showing.",
+        default_factory=list
+    )
+
+
+class FontOutlier(BaseModel):
+    slide_index: int = Field(
+        description="The slide index (0-based)."
+    )
+    shape_id: int = Field(
+        description="The id of the shape holding the run."
+    )
+    paragraph_index: int = Field(
+        description="The index of the paragraph within the shape's text frame."
+    )
+    run_index: int = Field(
+        description="The index of the run within its paragraph."
+    )
+    role: str = Field(
+        description="The placeholder role the run was compared within (eg, 'title', 'body')."
+    )
+    attribute: str = Field(
+        description="The deviating attribute: 'font_name', 'size_pt', 'color' or 'bold'."
+    )
+    value: str = Field(
+        description="The value of the run."
+    )
+    dominant_value: str = Field(
+        description="The dominant value for the role, the targeted fix."
+    )
+
+
+class IssueVerdict(BaseModel):
+    issue_id: int = Field(
+        description="The id of the issue description, as given in the request."
+    )
+    is_valid: bool = Field(
+        description="Indicates whether the issue description is valid and useful."
+    )
+
+
+class IssueVerdictList(BaseModel):
+    verdicts: list[IssueVerdict] = Field(
+        description="One verdict for each issue description in the request.",
+        default_factory=list
+    )
+
+
+class CoverageReport(BaseModel):
+    total_tasks: int = Field(
+        description="The number of checker×slide tasks of the run."
+    )
+    completed_tasks: int = Field(
+        description="The number of tasks that finished."
+    )
+    cancelled_tasks: int = Field(default=0,
+        description="The number of tasks that were running when the deadline hit."
+    )
+    skipped_tasks: int = Field(default=0,
+        description="The number of tasks that never started before the deadline."
+    )
+    failed_tasks: int = Field(default=0,
+        description="The number of tasks that raised or timed out."
+    )
+    slides_covered: list[int] = Field(
+        description="Slides whose checkers all finished successfully.",
+        default_factory=list
+    )
+    slides_partial: list[int] = Field(
+        description="Slides where only some checkers finished.",
+        default_factory=list
+    )
+    slides_uncovered: list[int] = Field(
+        description="Slides where no checker finished.",
+        default_factory=list
+    )
+    checkers_completed: dict[str, int] = Field(
+        description="The number of successfully finished tasks per checker.",
+        default_factory=dict
+    )
+    deadline_hit: bool = Field(default=False,
+        description="Whether the time budget ran out before all work was done."
+    )
+    elapsed_seconds: float = Field(default=0.0,
+        description="The wall time of the run."
+    )
+
+
+class PresentationReport(BaseModel):
+    issues: list[DetectedIssue] = Field(
+        description="The validated, deduplicated issues sorted by severity.",
+        default_factory=list
+    )
+    coverage: CoverageReport = Field(
+        description="Which checkers and slides the issues cover."
+    )
+    errors: list[CheckerError] = Field(
+        description="The checker tasks that failed or timed out.",
+        default_factory=list
+    )
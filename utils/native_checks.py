@@ -0,0 +1,148 @@
+import re
+from typing import List
+from .models import ExtractedIssue, IssueLocation, SlideModel, ChartData, TableData
+
+# Charts without axes cannot miss an axis title
+CHART_TYPES_WITHOUT_AXES = ('PIE', 'DOUGHNUT')
+
+SOURCE_PATTERN = re.compile(r'\bsources?\b', re.IGNORECASE)
+NUMBER_CELL_PATTERN = re.compile(
+    r'^\s*(?P<prefix>[$€£¥])?\s*-?(?:\d{1,3}(?:,\d{3})+|\d*)(?:\.(?P<decimals>\d+))?\s*(?P<suffix>%|bn|[kmb])?\s*$',
+    re.IGNORECASE
+)
+
+
+def format_code_units(format_code: str) -> tuple[str | None, bool, int]:
+    """
+    Describe the units a number format code displays.
+
+    Args:
+    format_code (str): An Excel number format code (eg, '\\$#,##0.0_);\\(\\$#,##0.0\\)').
+
+    Returns:
+    tuple[str | None, bool, int]: The currency symbol (if any), whether it is a percentage and the number of decimals.
+    """
+    # Only the positive section matters, and quoted literals are not number placeholders
+    section = re.sub(r'"[^"]*"', '', format_code.split(';')[0])
+    currency = next((symbol for symbol in '$€£¥' if symbol in section), None)
+    decimals = re.search(r'\.(0+)', section)
+    return currency, '%' in section, len(decimals.group(1)) if decimals else 0
+
+
+def _chart_label(chart: ChartData) -> str:
+    return f"chart '{chart.title}'" if chart.title else f"chart '{chart.shape_name}'"
+
+
+def check_chart(chart: ChartData) -> List[ExtractedIssue]:
+    issues = []
+
+    # Axis labels
+    if not chart.chart_type.startswith(CHART_TYPES_WITHOUT_AXES):
+        missing = [axis.kind for axis in chart.axes if axis.title is None]
+        if missing:
+            issues.append(ExtractedIssue(
+                issue_description=f"Axis labels: the {' and '.join(missing)} {'axes' if len(missing) > 1 else 'axis'} of the {_chart_label(chart)} {'have' if len(missing) > 1 else 'has'} no title, so the audience cannot tell what is measured and in which units. Add an axis title that states the metric and its unit.",
+                element_location=IssueLocation.BODY_VISUAL,
+                element_identification_verbatim=f"Chart '{chart.shape_name}'",
+                severity='medium' if 'value' in missing else 'low'
+            ))
+
+    # Units and number formats: an explicit value axis format overrides the series formats
+    value_axis = next((axis for axis in chart.axes if axis.kind == 'value'), None)
+    if value_axis is None or value_axis.number_format is None:
+        formats = {ser.name: format_code_units(ser.number_format) for ser in chart.series
+                   if ser.number_format and ser.number_format != 'General'}
+        units = {fmt[:2] for fmt in formats.values()}
+        decimals = {fmt[2] for fmt in formats.values()}
+        if len(units) > 1:
+            issues.append(ExtractedIssue(
+                issue_description=f"Units: the series of the {_chart_label(chart)} use different units ({', '.join(sorted(formats))}). Use one unit for all series or split them into separate charts.",
+                element_location=IssueLocation.BODY_VISUAL,
+                element_identification_verbatim=f"Chart '{chart.shape_name}'",
+                severity='high'
+            ))
+        elif len(decimals) > 1:
+            issues.append(ExtractedIssue(
+                issue_description=f"Units: the series of the {_chart_label(chart)} are shown with different numbers of decimal places. Use the same number format for all series.",
+                element_location=IssueLocation.BODY_VISUAL,
+                element_identification_verbatim=f"Chart '{chart.shape_name}'",
+                severity='low'
+            ))
+
+    return issues
+
+
+def check_table(table: TableData) -> List[ExtractedIssue]:
+    issues = []
+    if len(table.cells) < 2:
+        return issues
+
+    header, rows = table.cells[0], table.cells[1:]
+    mixed_units, mixed_decimals = [], []
+    for column_index, column_name in enumerate(header):
+        matches = [NUMBER_CELL_PATTERN.match(row[column_index]) for row in rows
+                   if column_index < len(row) and row[column_index].strip()]
+        matches = [match for match in matches if match is not None]
+        if len(matches) < 2:
+            continue
+
+        units = {(match.group('prefix'), (match.group('suffix') or '').lower()) for match in matches}
+        decimals = {len(match.group('decimals') or '') for match in matches}
+        column_label = f"'{column_name.strip()}'" if column_name.strip() else f"#{column_index + 1}"
+        if len(units) > 1:
+            mixed_units.append(column_label)
+        elif len(decimals) > 1:
+            mixed_decimals.append(column_label)
+
+    # One issue per problem type, listing the affected columns
+    if mixed_units:
+        issues.append(ExtractedIssue(
+            issue_description=f"Units: table column(s) {', '.join(mixed_units)} mix different units or currencies. Use one unit per column and state it in the header.",
+            element_location=IssueLocation.BODY_VISUAL,
+            element_identification_verbatim=f"Table '{table.shape_name}'",
+            severity='high'
+        ))
+    if mixed_decimals:
+        issues.append(ExtractedIssue(
+            issue_description=f"Units: table column(s) {', '.join(mixed_decimals)} show numbers with different decimal places (eg, '0' next to '0.5'). Use the same number format for all values in a column.",
+            element_location=IssueLocation.BODY_VISUAL,
+            element_identification_verbatim=f"Table '{table.shape_name}'",
+            severity='low'
+        ))
+
+    return issues
+
+
+def check_native_charts_and_tables(slide: SlideModel) -> List[ExtractedIssue]:
+    """
+    Check the native charts and tables of a slide for missing axis titles, inconsistent units and missing sources.
+
+    Args:
+    slide (SlideModel): The slide model extracted from the .pptx file.
+
+    Returns:
+    List[ExtractedIssue]: The issues found, empty if the slide has no native charts or tables.
+    """
+    issues = []
+    for chart in slide.charts:
+        issues.extend(check_chart(chart))
+    for table in slide.tables:
+        issues.extend(check_table(table))
+
+    # Sources
+    if slide.charts or slide.tables:
+        texts = [slide.text] + [chart.title or "" for chart in slide.charts]
+        if not any(SOURCE_PATTERN.search(text) for text in texts):
+            issues.append(ExtractedIssue(
+                issue_description="Sources: the data shown on this slide has no source. Add a source line (eg, 'Source: company data, 2024') below the chart or table.",
+                element_location=IssueLocation.FOOTER,
+                element_identification_verbatim="Missing source line",
+                severity='medium'
+            ))
+
+    return issues
+
+
+def needs_screenshot_check(slide: SlideModel | None) -> bool:
+    """Whether a slide has visuals (eg, pictures of charts) that cannot be checked from its native content."""
+    return slide is None or slide.opaque_visual_count > 0
@@ -0,0 +1,34 @@
+import fitz  # PyMuPDF
+
+
+def extract_page_texts(doc) -> dict[str, str]:
+    """
+    Extract the text of each page, its text blocks in reading order.
+
+    Args:
+    doc (fitz.Document): An open PDF document.
+
+    Returns:
+    dict[str, str]: The text of each page keyed by the page index (0-based).
+    """
+    texts = {}
+    for page_num in range(doc.page_count):
+        page = doc.load_page(page_num)
+        # Block tuples are (x0, y0, x1, y1, text, block_no, block_type), block_type 1 is an image
+        blocks = [text.strip() for _, _, _, _, text, _, block_type in page.get_text("blocks", sort=True) if block_type == 0 and text.strip()]
+        texts[str(page_num)] = "\n".join(blocks)
+    return texts
+
+
+def extract_text_from_pdf(pdf_path: str) -> dict[str, str]:
+    """
+    Extract the text of each page of a PDF, without rendering any images.
+
+    Args:
+    pdf_path (str): The path to the .pdf file.
+
+    Returns:
+    dict[str, str]: The text of each page keyed by the page index (0-based).
+    """
+    with fitz.open(pdf_path) as doc:
+        return extract_page_texts(doc)
@@ -0,0 +1,865 @@
+import os
+import time
+import asyncio
+import fitz  # PyMuPDF
+from collections import Counter
+from tqdm.asyncio import tqdm
+from typing import AsyncIterator, Callable, List, Dict
+
+from .client import MistralClientWrapper
+from .models import ExtractedIssue, ExtractedIssueList, DetectedIssue, SlideModel, SlideResult, CoverageReport, PresentationReport, CheckerError, DedupEvent
+from .checkers import resolve_checker, MODEL_NATIVE
+from .native_checks import check_native_charts_and_tables
+from .prompts import build_system_prompt, build_user_prompt
+from .deduplication import deduplicate_issues, IncrementalDeduplicator
+from .embeddings import EmbeddingBackend, resolve_embedding_backend, local_backend, MISTRAL_SIMILARITY_THRESHOLD
+from .results_store import ResultsStore, hash_text, hash_file, hash_config
+from .screenshots import render_page, convert_pptx_to_pdf
+from .pptx_utils import extract_text_from_pptx, extract_slide_models_from_pptx
+from .pdf_utils import extract_page_texts
+from .scheduler import StageGraph
+from .checkpoint import Checkpoint
+from .issue_memory import IssueMemory
+from .validation import validate_issues_batched, IssueValidator
+from .image_utils import get_thumbnail_data_url
+from .executors import run_io, run_cpu
+from .tracing import span, annotate, traced
+
+MODEL_VALIDATE = "mistral-small-latest"
+MODEL_EMBED = "mistral-embed"
+
+SEVERITY_ORDER = {'high': 0, 'medium': 1, 'low': 2}
+
+# Share of a time budget kept for validation and deduplication
+VALIDATION_RESERVE = 0.2
+# Seconds a single checker×slide task may take (including its retries), unless the checker sets `timeout`
+TASK_TIMEOUT = 180
+# Checker jobs running at the same time by default: bounded, so that the priority order decides what runs first
+DEFAULT_MAX_CONCURRENCY = 8
+
+async def run_checker(client: MistralClientWrapper, model: str, checker: dict, user_context: str, slide_content:str|None, image_path: str|None, slide_number: int, pptx_file: str) -> List[DetectedIssue]:
+    system_prompt=build_system_prompt(checker['task'], user_context, checker['criteria'])
+    user_prompt=build_user_prompt(slide_content)
+
+    # Screenshots are encoded in the CPU pool, not on the event loop
+    messages = await client.build_messages_async(
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        image_path=image_path
+    )
+    
+    result = await client.complete_with_retry(
+        model=model,
+        messages=messages,
+        ResponseModel=ExtractedIssueList
+    )
+    
+    issues=[
+        DetectedIssue(
+            extracted_issue=issue,
+            category=checker['name'],
+            page_id=slide_number,
+            file=pptx_file
+        ) for issue in result.issues
+    ]
+    return issues
+
+async def run_native_checker(checker: dict, slide_model: SlideModel, slide_number: int, pptx_file: str, check: Callable[[SlideModel], List[ExtractedIssue]] = check_native_charts_and_tables) -> List[DetectedIssue]:
+    # Local check of the native slide data, no API call
+    return [
+        DetectedIssue(
+            extracted_issue=issue,
+            category=checker['name'],
+            page_id=slide_number,
+            file=pptx_file,
+            local=True
+        ) for issue in check(slide_model)
+    ]
+
+def run_with_store(store: ResultsStore | None, deck_id: str, slide_hash: str, checker: dict, user_context: str, model: str, slide_number: int | None, pptx_file: str, run):
+    """
+    Build the coroutine of a checker×slide pair: its stored result if its inputs did not change since the
+    last run (see `replayed`, looked up now so schedulers know the job is instant), else the checker.
+
+    Args:
+        store (ResultsStore | None): The results store, None to always run.
+        slide_hash (str): The content hash of the checker's input for this slide (text, screenshot or slide model).
+        run: A callable returning the checker coroutine, only called when there is no stored result.
+
+    Returns:
+        The coroutine, returning the list of DetectedIssue.
+    """
+    if store is None:
+        return run()
+    key = (deck_id, slide_hash, checker['name'], hash_config(checker, user_context), model)
+    issues = store.get(*key, page_id=slide_number, file=pptx_file)
+    if issues is not None:
+        return replayed(issues)
+    return run_and_store(store, key, run)
+
+
+async def run_and_store(store: ResultsStore, key: tuple, run) -> List[DetectedIssue]:
+    annotate(cache_hit=False)
+    issues = await run()
+    store.put(*key, issues)
+    return issues
+
+
+async def replayed(issues: List[DetectedIssue]) -> List[DetectedIssue]:
+    annotate(cache_hit=True)
+    return issues
+
+
+def is_replay(task) -> bool:
+    """Whether a job coroutine returns stored or checkpointed issues without running its checker."""
+    return getattr(task, 'cr_code', None) is replayed.__code__
+
+
+def build_checker_tasks(client: MistralClientWrapper, checker: dict, user_context: str, slide_key: str, slide_content: str | None, image_path: str | None, slide_models: Dict[str, SlideModel] | None, store: ResultsStore | None, deck_id: str, pptx_path: str) -> list:
+    """
+    Build the checker coroutines of one checker for one slide (see `resolve_checker`).
+
+    The local part of a checker runs when the slide model exists. The model part runs for model checkers,
+    and for cascades only on slides the local part cannot fully check; it is skipped when its input is
+    missing or empty, as it would add nothing.
+
+    Args:
+        slide_content (str | None): The slide text, used by text checkers.
+        image_path (str | None): The slide screenshot, used by screenshot checkers.
+        slide_models (Dict[str, SlideModel] | None): The native slide models, None if the input has no .pptx data.
+
+    Returns:
+        list: The checker coroutines, each returning a list of DetectedIssue.
+    """
+    spec = resolve_checker(checker)
+    slide_model = slide_models.get(str(slide_key)) if slide_models is not None else None
+    tasks = []
+    if spec.local is not None and slide_model is not None:
+        tasks.append(run_with_store(
+            store, deck_id, hash_text(slide_model.model_dump_json(exclude={'slide_index'})), checker, user_context, MODEL_NATIVE, int(slide_key), pptx_path,
+            lambda: run_native_checker(checker, slide_model, int(slide_key), pptx_path, spec.local)
+        ))
+        if spec.escalate is None or not spec.escalate(slide_model):
+            return tasks
+    if spec.model is None:
+        return tasks
+
+    if spec.model_input == 'text' and slide_content and slide_content.strip():
+        tasks.append(run_with_store(
+            store, deck_id, hash_text(slide_content), checker, user_context, spec.model, int(slide_key), pptx_path,
+            lambda: run_checker(
+                client, spec.model,
+                checker, user_context, slide_content,
+                None, # no image_path
+                int(slide_key),
+                pptx_path
+            )
+        ))
+    elif spec.model_input == 'image' and image_path is not None:
+        tasks.append(run_with_store(
+            store, deck_id, hash_file(image_path), checker, user_context, spec.model, int(slide_key), pptx_path,
+            lambda: run_checker(
+                client, spec.model,
+                checker, user_context, 
+                None, # no slide content
+                image_path,
+                int(slide_key),
+                pptx_path
+            )
+        ))
+    return tasks
+
+
+def build_deck_checker_tasks(checker: dict, user_context: str, slide_models: Dict[str, SlideModel] | None, store: ResultsStore | None, deck_id: str, pptx_path: str) -> list:
+    """Build the coroutine of a deck-level local checker (see `DECK_CHECKS`), empty if it does not apply."""
+    spec = resolve_checker(checker)
+    if spec.deck is None or not slide_models:
+        return []
+    deck_hash = hash_text("".join(slide_models[key].model_dump_json() for key in sorted(slide_models, key=int)))
+
+    async def run_deck_check():
+        return [issue.model_copy(update={'local': True}) for issue in spec.deck(slide_models, checker['name'], pptx_path)]
+
+    return [run_with_store(store, deck_id, deck_hash, checker, user_context, MODEL_NATIVE, None, pptx_path, run_deck_check)]
+
+
+async def run_isolated(task, checker: dict, page_id: int | None, errors: List[CheckerError]) -> List[DetectedIssue] | None:
+    """
+    Run one checker task with its own timeout, recording a failure instead of raising it.
+
+    Args:
+        task: The checker coroutine.
+        page_id (int | None): The slide the task checks, None for deck-level checks.
+        errors (List[CheckerError]): The list the failure is appended to.
+
+    Returns:
+        List[DetectedIssue] | None: The issues of the task, None if it failed or timed out.
+    """
+    timeout = checker.get('timeout', TASK_TIMEOUT)
+    with span("checker", checker=checker['name'], page_id=page_id) as checker_span:
+        try:
+            return await asyncio.wait_for(task, timeout)
+        except asyncio.TimeoutError:
+            error = CheckerError(checker=checker['name'], page_id=page_id, error_type='timeout', message=f"No result after {timeout}s")
+        except Exception as e:
+            error = CheckerError(checker=checker['name'], page_id=page_id, error_type=type(e).__name__, message=str(e))
+        checker_span.set(error=error.error_type)
+    print(f"Checker {error.checker} failed on slide {page_id} ({error.error_type}): {error.message}")
+    errors.append(error)
+    return None
+
+
+async def run_in_slot(task, checker: dict, page_id: int | None, errors: List[CheckerError], slots: asyncio.Semaphore | None) -> List[DetectedIssue] | None:
+    # Only jobs that call a model wait for a slot, local checks and stored results are instant
+    if slots is None or resolve_checker(checker).cost == 0 or is_replay(task):
+        return await run_isolated(task, checker, page_id, errors)
+    async with slots:
+        return await run_isolated(task, checker, page_id, errors)
+
+
+async def gather_isolated(jobs: list, errors: List[CheckerError], slots: asyncio.Semaphore | None = None) -> List[DetectedIssue]:
+    """
+    Run (checker, page id, coroutine) jobs concurrently with `run_isolated` and return the issues of those that succeeded.
+    With `slots`, each job that calls a model holds one of them while it runs (see `DEFAULT_MAX_CONCURRENCY`).
+    """
+    results = await asyncio.gather(*(run_in_slot(task, checker, page_id, errors, slots) for checker, page_id, task in jobs))
+    return [issue for result in results if result is not None for issue in result]
+
+
+async def filter_valid_issues(client: MistralClientWrapper, issues: List[DetectedIssue], desc: str | None = "Validating issues", memory: IssueMemory | None = None) -> List[DetectedIssue]:
+    # Issues reviewers dismissed before are not validated again
+    if memory is not None:
+        issues = memory.suppress(issues)
+
+    # Validate in batched requests, issues of local checks are deterministic and kept as they are
+    to_validate = [issue for issue in issues if not issue.local]
+    if desc is not None and to_validate:
+        print(f"{desc}: {len(to_validate)} issues")
+    verdicts = iter(await validate_issues_batched(client, MODEL_VALIDATE, to_validate))
+
+    # Filter out invalid issues
+    return [issue for issue in issues if issue.local or next(verdicts)]
+
+
+def finalize_issues(client: MistralClientWrapper, raw_issue_count: int, valid_issues: List[DetectedIssue], embeddings: list | None = None, backend: EmbeddingBackend | None = None, method: str = 'cluster') -> List[DetectedIssue]:
+    # Deduplicate
+    print("Deduplicating issues")
+    backend = backend or EmbeddingBackend(client, MODEL_EMBED, MISTRAL_SIMILARITY_THRESHOLD)
+    try:
+        with span("dedup", model=backend.model, issues=len(valid_issues), embedded=embeddings is not None):
+            deduplicated_issues = deduplicate_issues(backend.embedder, backend.model, valid_issues, embeddings, method=method, similarity_threshold=backend.similarity_threshold)
+    except Exception as e:
+        if backend.model == 'local':
+            # Keep the validated issues rather than losing the whole run
+            print(f"Error deduplicating issues, returning them as they are: {e}")
+            deduplicated_issues = list(valid_issues)
+        else:
+            print(f"Error deduplicating issues, retrying with local embeddings: {e}")
+            return finalize_issues(client, raw_issue_count, valid_issues, backend=local_backend(), method=method)
+    
+    print(f"Original issues: {raw_issue_count}")
+    print(f"Valid issues: {len(valid_issues)}")
+    print(f"Deduplicated issues: {len(deduplicated_issues)}")
+
+    # Sort issues by severity (high, medium, low)
+    deduplicated_issues.sort(key=lambda x: SEVERITY_ORDER.get(x.extracted_issue.severity.lower(), 3))
+    return deduplicated_issues
+
+
+def dedup_method(config: Dict) -> str:
+    """The deduplication method of the `deduplication` config section (see `deduplicate_issues`), 'cluster' by default."""
+    return (config or {}).get('deduplication', {}).get('method', 'cluster')
+
+
+def deduplicate_as_validated(backend: EmbeddingBackend, on_dedup: Callable[[List[DedupEvent]], None] | None) -> Callable[[List[DetectedIssue], list], None] | None:
+    """
+    An `on_embedded` callback of `IssueValidator` that clusters the validated issues with their embeddings as they
+    arrive and calls `on_dedup` with the changes (see `IncrementalDeduplicator`), None without `on_dedup`.
+    """
+    if on_dedup is None:
+        return None
+    dedup = IncrementalDeduplicator(backend.embedder, backend.model, backend.similarity_threshold)
+
+    def on_embedded(issues, embeddings):
+        nonlocal dedup
+        if dedup is None:
+            return
+        try:
+            events = dedup.add(issues, embeddings)
+        except Exception as e:
+            print(f"Error deduplicating issues as they arrive, deduplicating at the end only: {e}")
+            dedup = None
+            return
+        on_dedup(events)
+    return on_embedded
+
+
+def checker_priority(checker: dict) -> float:
+    """The priority of a checker: the `priority` of its config entry, by default its value (see `CheckerSpec`)."""
+    return checker.get('priority', resolve_checker(checker).value)
+
+
+def slide_priority(slide_key: str | None, slide_models: Dict[str, SlideModel] | None) -> int:
+    """The priority of a slide: the title slide and slides with charts or tables first."""
+    if slide_key is None:
+        return 2  # deck-level checks cover every slide
+    slide_model = (slide_models or {}).get(str(slide_key))
+    if int(slide_key) == 0 or (slide_model is not None and (slide_model.charts or slide_model.tables)):
+        return 1
+    return 0
+
+
+async def run_by_priority(jobs: list, slide_models: Dict[str, SlideModel] | None, max_concurrency: int, deadline: float | None, on_result: Callable[[int, List[DetectedIssue]], None], errors: List[CheckerError], on_progress: Callable[[int, int], None] | None = None) -> List[str]:
+    """
+    Run checker jobs in priority order with bounded concurrency until they are done or the deadline hits.
+
+    The next job is always the one with the highest checker priority, then on the slide with the fewest
+    started jobs (so uncovered slides come first), then on the most important slide. Jobs keep starting
+    until the deadline, which cancels those still running. Jobs without a model call (local checks and
+    stored results) start at once and do not take one of the `max_concurrency` slots.
+
+    Args:
+        jobs (list): (checker, slide key or None, coroutine) tuples.
+        max_concurrency (int): The maximum number of model checker jobs running at the same time.
+        deadline (float | None): The event loop time to stop at, None to run everything.
+        on_result (Callable[[int, List[DetectedIssue]], None]): Called with the job index and its issues when a job finishes.
+        errors (List[CheckerError]): The list failed and timed out jobs are recorded in (see `run_isolated`).
+        on_progress (Callable[[int, int], None] | None): Called with the number of finished jobs and the total after each job.
+
+    Returns:
+        List[str]: The status of each job: 'completed', 'failed', 'cancelled' (running at the deadline) or 'skipped' (never started).
+    """
+    loop = asyncio.get_running_loop()
+    static = [(-checker_priority(checker), -slide_priority(slide_key, slide_models)) for checker, slide_key, _ in jobs]
+    is_free = [resolve_checker(checker).cost == 0 or is_replay(task) for checker, _, task in jobs]
+    status = ['skipped'] * len(jobs)
+    pending = list(range(len(jobs)))
+    started_per_slide = Counter()
+    running = {}
+    progress = tqdm(total=len(jobs), desc="Processing all checkers")
+    try:
+        while pending or running:
+            while pending and (deadline is None or loop.time() < deadline):
+                candidates = [i for i in pending if is_free[i]]
+                if not candidates and sum(not is_free[i] for i in running.values()) < max_concurrency:
+                    candidates = pending
+                if not candidates:
+                    break
+                index = min(candidates, key=lambda i: (static[i][0], started_per_slide[jobs[i][1]], static[i][1], i))
+                pending.remove(index)
+                started_per_slide[jobs[index][1]] += 1
+                checker, slide_key, task = jobs[index]
+                page_id = None if slide_key is None else int(slide_key)
+                running[asyncio.ensure_future(run_isolated(task, checker, page_id, errors))] = index
+
+            timeout = None if deadline is None else deadline - loop.time()
+            if not running or (timeout is not None and timeout <= 0):
+                break
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break  # deadline
+            for task in done:
+                index = running.pop(task)
+                issues = task.result()
+                status[index] = 'failed' if issues is None else 'completed'
+                progress.update()
+                if on_progress is not None:
+                    on_progress(progress.n, len(jobs))
+                if issues is not None:
+                    on_result(index, issues)
+    finally:
+        for task, index in running.items():
+            task.cancel()
+            status[index] = 'cancelled'
+        await asyncio.gather(*running, return_exceptions=True)
+        # Never started coroutines must be closed to release them
+        for index in pending:
+            jobs[index][2].close()
+        progress.close()
+    return status
+
+
+async def checkpointed(task, checkpoint: Checkpoint, key: tuple) -> List[DetectedIssue]:
+    # Record the issues as soon as the task finishes
+    issues = await task
+    checkpoint.put(*key, issues)
+    return issues
+
+
+def use_checkpoint(jobs: list, checkpoint: Checkpoint, deck_id: str) -> list:
+    """
+    Replace the jobs finished in an earlier run by their checkpointed issues and record the others when they finish.
+
+    A job is identified by its deck, checker, page and its ordinal among the jobs of the same checker and page.
+    """
+    ordinals = Counter()
+    resumed_jobs = []
+    for checker, slide_key, task in jobs:
+        page_id = None if slide_key is None else int(slide_key)
+        key = (deck_id, checker['name'], page_id, ordinals[(checker['name'], page_id)])
+        ordinals[(checker['name'], page_id)] += 1
+        issues = checkpoint.get(*key)
+        if issues is not None:
+            task.close()
+            task = replayed(issues)
+        else:
+            task = checkpointed(task, checkpoint, key)
+        resumed_jobs.append((checker, slide_key, task))
+    return resumed_jobs
+
+
+def build_coverage_report(jobs: list, status: List[str], slide_keys, elapsed_seconds: float) -> CoverageReport:
+    slides_done, slides_total = Counter(), Counter()
+    checkers_completed = Counter()
+    for (checker, slide_key, _), job_status in zip(jobs, status):
+        # Deck-level jobs count for every slide
+        for key in ([slide_key] if slide_key is not None else slide_keys):
+            slides_total[int(key)] += 1
+            slides_done[int(key)] += job_status == 'completed'
+        checkers_completed[checker['name']] += job_status == 'completed'
+
+    return CoverageReport(
+        total_tasks=len(jobs),
+        completed_tasks=status.count('completed'),
+        cancelled_tasks=status.count('cancelled'),
+        skipped_tasks=status.count('skipped'),
+        failed_tasks=status.count('failed'),
+        slides_covered=sorted(slide for slide in slides_total if slides_done[slide] == slides_total[slide]),
+        slides_partial=sorted(slide for slide in slides_total if 0 < slides_done[slide] < slides_total[slide]),
+        slides_uncovered=sorted(slide for slide in slides_total if slides_done[slide] == 0),
+        checkers_completed=dict(checkers_completed),
+        deadline_hit=status.count('cancelled') + status.count('skipped') > 0,
+        elapsed_seconds=elapsed_seconds
+    )
+
+
+@traced("deck")
+async def analyze_presentation(pptx_path: str, config: Dict, user_context: str, slides_content: dict, screenshots: dict, slide_models: Dict[str, SlideModel] | None = None, store: ResultsStore | None = None, deck_id: str | None = None, time_budget: float | None = None, max_concurrency: int | None = None, client: MistralClientWrapper | None = None, checkpoint: Checkpoint | None = None, on_progress: Callable[[int, int], None] | None = None, memory: IssueMemory | None = None, on_dedup: Callable[[List[DedupEvent]], None] | None = None) -> PresentationReport:
+    """
+    Check a presentation and report the issues together with the coverage of the run.
+
+    With a `time_budget`, work is scheduled by priority (see `run_by_priority`): high-value checkers, the
+    title and chart slides, and slides not yet covered first. When the budget runs out, outstanding checkers
+    are cancelled and the issues found so far are validated, deduplicated and returned.
+
+    Args:
+        time_budget (float | None): The time in seconds to return within, None to run everything.
+        max_concurrency (int | None): The maximum number of checker jobs in flight, None for `DEFAULT_MAX_CONCURRENCY`
+            (see the `scheduling` config section).
+        client (MistralClientWrapper | None): The client to use, eg a `RateLimitedClient` shared between decks.
+        checkpoint (Checkpoint | None): Record each finished checker task, and skip those finished in an earlier run.
+        on_progress (Callable[[int, int], None] | None): Called with the number of finished checker tasks and the total.
+        memory (IssueMemory | None): Drop issues matching ones reviewers dismissed before, ahead of validation.
+        on_dedup (Callable[[List[DedupEvent]], None] | None): Called with the changes to the deduplicated issues as
+            checkers return and their issues are validated (see `IncrementalDeduplicator`).
+
+    Returns:
+        PresentationReport: The deduplicated issues sorted by severity and the coverage report.
+    """
+    # Initialize the client
+    client = client or MistralClientWrapper(api_key=os.getenv("MISTRAL_API_KEY"))
+    deck_id = deck_id or os.path.basename(pptx_path)
+    annotate(file=os.path.basename(pptx_path), slides=len(slides_content), time_budget=time_budget)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    jobs = []
+    slide_keys = sorted(set(slides_content) | set(screenshots) | set(slide_models or {}), key=int)
+
+    # Prepare the tasks of each checker for each slide, each checker only takes the inputs it declares
+    for checker in config['checkers']:
+        if 'deck' in resolve_checker(checker).inputs:
+            jobs.extend((checker, None, task) for task in build_deck_checker_tasks(checker, user_context, slide_models, store, deck_id, pptx_path))
+            continue
+        for slide_key in slide_keys:
+            jobs.extend((checker, slide_key, task) for task in build_checker_tasks(
+                client, checker, user_context, slide_key, slides_content.get(slide_key), screenshots.get(slide_key),
+                slide_models, store, deck_id, pptx_path
+            ))
+
+    if checkpoint is not None:
+        jobs = use_checkpoint(jobs, checkpoint, deck_id)
+    
+    # Validate (and embed) each checker's issues as soon as it returns
+    backend = resolve_embedding_backend(config, client, MODEL_EMBED)
+    validator = IssueValidator(client, MODEL_VALIDATE, backend.model, embedder=backend.embedder, memory=memory,
+                               on_embedded=deduplicate_as_validated(backend, on_dedup))
+    validator.start()
+
+    # Keep part of the budget for validation and deduplication
+    checker_deadline = None if time_budget is None else started + time_budget * (1 - VALIDATION_RESERVE)
+    final_deadline = None if time_budget is None else started + time_budget
+
+    # Run all checkers, a failing checker×slide task is recorded and does not stop the others
+    embeddings = None
+    errors = []
+    try:
+        status = await run_by_priority(jobs, slide_models, max_concurrency or DEFAULT_MAX_CONCURRENCY, checker_deadline, validator.submit, errors, on_progress)
+        try:
+            valid_issues, embeddings = await asyncio.wait_for(
+                validator.finish(), None if final_deadline is None else max(final_deadline - loop.time(), 0)
+            )
+        except asyncio.TimeoutError:
+            print("Time budget exhausted during validation, keeping the issues validated so far")
+            validator.cancel()
+            valid_issues = validator.partial()
+    except BaseException:
+        validator.cancel()
+        raise
+
+    # Deduplication may request embeddings, a blocking HTTP call
+    issues = await run_io(finalize_issues, client, validator.raw_issue_count, valid_issues, embeddings, backend, dedup_method(config))
+    coverage = build_coverage_report(jobs, status, list(slides_content), loop.time() - started)
+    if coverage.deadline_hit:
+        print(f"Time budget hit: {coverage.completed_tasks}/{coverage.total_tasks} checker tasks done, {len(coverage.slides_covered)} slides fully covered")
+    if errors:
+        print(f"Failed checker tasks: {len(errors)}")
+    return PresentationReport(issues=issues, coverage=coverage, errors=errors)
+
+
+async def process_presentation(pptx_path: str, config: Dict, user_context: str, slides_content: dict, screenshots: dict, slide_models: Dict[str, SlideModel] | None = None, store: ResultsStore | None = None, deck_id: str | None = None, time_budget: float | None = None, memory: IssueMemory | None = None) -> List[DetectedIssue]:
+    report = await analyze_presentation(pptx_path, config, user_context, slides_content, screenshots, slide_models, store, deck_id, time_budget, memory=memory)
+    return report.issues
+
+
+async def stream_presentation(pdf_path: str | None, pptx_path: str, config: Dict, user_context: str, slides_content: dict, output_folder: str, slide_models: Dict[str, SlideModel] | None = None, store: ResultsStore | None = None, deck_id: str | None = None, max_in_flight: int = 4, keep_images: bool = False, client: MistralClientWrapper | None = None, memory: IssueMemory | None = None, screenshots: Dict[str, str] | None = None, max_concurrency: int | None = None) -> AsyncIterator[SlideResult]:
+    """
+    Check a presentation slide by slide as a bounded pipeline: render → check → validate.
+
+    At most `max_in_flight` slides are rendered and checked at the same time. A slide's screenshot is
+    rendered only when the slide enters the window and deleted once its checkers finish, so peak memory
+    stays flat regardless of the deck size.
+
+    Args:
+        pdf_path (str | None): The PDF to render the screenshots from (converted from the .pptx or uploaded directly),
+            None to check without screenshots.
+        pptx_path (str): The original file, recorded on the issues.
+        slides_content (dict): The slide texts keyed by the slide index (0-based).
+        output_folder (str): The folder for the temporary screenshots.
+        max_in_flight (int): The maximum number of slides rendered and checked at the same time.
+        keep_images (bool): Keep the screenshots on disk after the slide is checked.
+        memory (IssueMemory | None): Drop issues matching ones reviewers dismissed before, ahead of validation.
+        screenshots (Dict[str, str] | None): Screenshots rendered before (eg from a `RenderCache`) keyed by the slide
+            index, used instead of rendering the PDF.
+        max_concurrency (int | None): The maximum number of model checker jobs in flight across the slides, None for
+            `DEFAULT_MAX_CONCURRENCY` (see the `scheduling` config section).
+
+    Yields:
+        SlideResult: The validated (not yet deduplicated) issues of each slide, in completion order.
+    """
+    client = client or MistralClientWrapper(api_key=os.getenv("MISTRAL_API_KEY"))
+    deck_id = deck_id or os.path.basename(pptx_path)
+    os.makedirs(output_folder, exist_ok=True)
+
+    doc = fitz.open(pdf_path) if screenshots is None and pdf_path is not None else None
+    # PyMuPDF documents must not be used from several threads at once
+    render_lock = asyncio.Lock()
+    window = asyncio.Semaphore(max_in_flight)
+    slots = asyncio.Semaphore(max_concurrency or DEFAULT_MAX_CONCURRENCY)
+    results = asyncio.Queue()
+
+    async def process_slide(slide_key: str):
+        with span("slide", page_id=int(slide_key)):
+            await check_slide(slide_key)
+
+    async def check_slide(slide_key: str):
+        image_path = None
+        errors = []
+        try:
+            if screenshots is not None:
+                image_path = screenshots.get(slide_key)
+            elif doc is not None and int(slide_key) < doc.page_count:
+                try:
+                    async with render_lock:
+                        image_path = await run_io(render_page, doc, int(slide_key), output_folder)
+                except Exception as e:
+                    # The text and local checkers still run without the screenshot
+                    print(f"Error rendering slide {slide_key}: {e}")
+                    errors.append(CheckerError(checker='render', page_id=int(slide_key), error_type=type(e).__name__, message=str(e)))
+
+            jobs = []
+            for checker in config['checkers']:
+                jobs.extend((checker, int(slide_key), task) for task in build_checker_tasks(
+                    client, checker, user_context, slide_key, slides_content[slide_key], image_path,
+                    slide_models, store, deck_id, pptx_path
+                ))
+            issues = await gather_isolated(jobs, errors, slots)
+            valid_issues = await filter_valid_issues(client, issues, desc=None, memory=memory)
+
+            thumbnail_url = await run_cpu(get_thumbnail_data_url, image_path) if image_path else None
+            await results.put(SlideResult(
+                page_id=int(slide_key),
+                issues=valid_issues,
+                raw_issue_count=len(issues),
+                thumbnail_url=thumbnail_url,
+                errors=errors
+            ))
+        except Exception as e:
+            print(f"Error processing slide {slide_key}: {e}")
+            errors.append(CheckerError(checker='pipeline', page_id=int(slide_key), error_type=type(e).__name__, message=str(e)))
+            await results.put(SlideResult(page_id=int(slide_key), errors=errors))
+        finally:
+            # Release the screenshot as soon as the slide is done
+            if image_path is not None and not keep_images and os.path.exists(image_path):
+                os.remove(image_path)
+            window.release()
+
+    async def schedule_slides():
+        for slide_key in slides_content:
+            await window.acquire()
+            slide_tasks.append(asyncio.create_task(process_slide(slide_key)))
+
+    slide_tasks = []
+    scheduler = asyncio.create_task(schedule_slides())
+    try:
+        for _ in tqdm(range(len(slides_content)), desc="Processing slides"):
+            yield await results.get()
+    finally:
+        scheduler.cancel()
+        for task in slide_tasks:
+            task.cancel()
+        await asyncio.gather(scheduler, *slide_tasks, return_exceptions=True)
+        if doc is not None:
+            doc.close()
+
+
+@traced("deck")
+async def process_presentation_streaming(pdf_path: str | None, pptx_path: str, config: Dict, user_context: str, slides_content: dict, output_folder: str, slide_models: Dict[str, SlideModel] | None = None, store: ResultsStore | None = None, deck_id: str | None = None, max_in_flight: int = 4, on_slide: Callable[[SlideResult], None] | None = None, memory: IssueMemory | None = None, on_dedup: Callable[[List[DedupEvent]], None] | None = None, client: MistralClientWrapper | None = None, screenshots: Dict[str, str] | None = None, max_concurrency: int | None = None) -> List[DetectedIssue]:
+    """
+    Same as `process_presentation`, but with bounded memory: slides flow through `stream_presentation`
+    and only their (small) issues are kept until the final deduplication.
+
+    Args:
+        on_slide (Callable[[SlideResult], None] | None): Called with each slide's result as soon as it is ready.
+        on_dedup (Callable[[List[DedupEvent]], None] | None): Called with the changes to the deduplicated issues as
+            each slide's issues arrive (see `IncrementalDeduplicator`). The final deduplication reuses their
+            embeddings, so its result is the view built from the events.
+        client (MistralClientWrapper | None): The client to use, eg a `MockLLMClient` for benchmarks.
+        screenshots (Dict[str, str] | None): Screenshots rendered before, see `stream_presentation`.
+        max_concurrency (int | None): The maximum number of model checker jobs in flight, see `stream_presentation`.
+
+    Returns:
+        List[DetectedIssue]: The deduplicated issues sorted by severity.
+    """
+    client = client or MistralClientWrapper(api_key=os.getenv("MISTRAL_API_KEY"))
+    deck_id = deck_id or os.path.basename(pptx_path)
+    annotate(file=os.path.basename(pptx_path), slides=len(slides_content), mode='streaming')
+
+    # Deck-level checkers need all slide models, which are small and available upfront
+    errors = []
+    deck_jobs = [
+        (checker, None, task) for checker in config['checkers']
+        for task in build_deck_checker_tasks(checker, user_context, slide_models, store, deck_id, pptx_path)
+    ]
+    deck_issues = await gather_isolated(deck_jobs, errors)
+    raw_issue_count = len(deck_issues)
+    valid_issues = await filter_valid_issues(client, deck_issues, desc=None, memory=memory)
+
+    # With a consumer of the deduplicated view, issues are embedded and clustered as they arrive
+    backend = resolve_embedding_backend(config, client, MODEL_EMBED)
+    dedup = IncrementalDeduplicator(backend.embedder, backend.model, backend.similarity_threshold) if on_dedup is not None else None
+    async def deduplicate(issues):
+        nonlocal dedup
+        if dedup is None:
+            return
+        try:
+            events = await run_io(dedup.add, issues)
+        except Exception as e:
+            print(f"Error deduplicating issues as they arrive, deduplicating at the end: {e}")
+            dedup = None
+            return
+        on_dedup(events)
+
+    await deduplicate(valid_issues)
+    async for slide_result in stream_presentation(
+        pdf_path, pptx_path, config, user_context, slides_content, output_folder,
+        slide_models=slide_models, store=store, deck_id=deck_id, max_in_flight=max_in_flight, client=client, memory=memory,
+        screenshots=screenshots, max_concurrency=max_concurrency
+    ):
+        raw_issue_count += slide_result.raw_issue_count
+        valid_issues.extend(slide_result.issues)
+        errors.extend(slide_result.errors)
+        if on_slide is not None:
+            on_slide(slide_result)
+        await deduplicate(slide_result.issues)
+
+    if errors:
+        print(f"Failed checker tasks: {len(errors)}")
+    embeddings = dedup.embeddings if dedup is not None else None
+    return await run_io(finalize_issues, client, raw_issue_count, valid_issues, embeddings, backend, dedup_method(config))
+
+
+@traced("deck")
+async def process_file_scheduled(file_path: str, config: Dict, user_context: str, output_folder: str, store: ResultsStore | None = None, deck_id: str | None = None, on_progress: Callable[[int, int], None] | None = None, memory: IssueMemory | None = None, client: MistralClientWrapper | None = None, stage_times: Dict[str, float] | None = None, screenshots: Dict[str, str] | None = None, max_concurrency: int | None = None, on_dedup: Callable[[List[DedupEvent]], None] | None = None) -> tuple[List[DetectedIssue], Dict[str, str], List[CheckerError]]:
+    """
+    Run the whole pipeline for a .pptx or .pdf file as a stage graph (see `StageGraph`).
+
+    Each checker×slide task starts as soon as its inputs exist: text and local checkers start right after
+    the (fast) text extraction, while LibreOffice converts and renders the slides; each screenshot checker
+    starts as soon as its page is rendered. The critical path is printed at the end. A checker task or page
+    render that fails is recorded as an error, the rest of the run goes on.
+
+    Args:
+        file_path (str): The .pptx or .pdf file to check.
+        output_folder (str): The folder for the converted PDF and the screenshots.
+        on_progress (Callable[[int, int], None] | None): Called with the number of finished check stages and the total.
+        memory (IssueMemory | None): Drop issues matching ones reviewers dismissed before, ahead of validation.
+        client (MistralClientWrapper | None): The client to use, eg a `MockLLMClient` for benchmarks.
+        stage_times (Dict[str, float] | None): Filled with the seconds spent per stage kind (see `StageGraph.stage_times`),
+            including the text extraction as 'extract'.
+        screenshots (Dict[str, str] | None): Screenshots rendered before (eg from a `RenderCache`) keyed by the slide
+            index, to skip the conversion and rendering.
+        max_concurrency (int | None): The maximum number of model checker jobs in flight, None for `DEFAULT_MAX_CONCURRENCY`
+            (see the `scheduling` config section).
+        on_dedup (Callable[[List[DedupEvent]], None] | None): Called with the changes to the deduplicated issues as
+            checkers return and their issues are validated (see `IncrementalDeduplicator`).
+
+    Returns:
+        tuple[List[DetectedIssue], Dict[str, str], List[CheckerError]]: The deduplicated issues sorted by severity,
+            the screenshot path of each slide and the failed checker tasks.
+    """
+    client = client or MistralClientWrapper(api_key=os.getenv("MISTRAL_API_KEY"))
+    deck_id = deck_id or os.path.basename(file_path)
+    os.makedirs(output_folder, exist_ok=True)
+
+    # Parsing runs in the CPU pool
+    extract_started = time.perf_counter()
+    is_pdf = file_path.lower().endswith('.pdf')
+    with span("stage:extract", stage="extract"):
+        if is_pdf:
+            # The text and the screenshots come from one document handle
+            pdf_doc = await run_io(fitz.open, file_path)
+            try:
+                slides_content, slide_models = await run_io(extract_page_texts, pdf_doc), None
+            except BaseException:
+                pdf_doc.close()
+                raise
+        else:
+            slides_content, slide_models = await asyncio.gather(
+                run_cpu(extract_text_from_pptx, file_path), run_cpu(extract_slide_models_from_pptx, file_path)
+            )
+    extract_seconds = time.perf_counter() - extract_started
+    annotate(file=os.path.basename(file_path), slides=len(slides_content), mode='scheduled')
+
+    graph = StageGraph()
+    errors = []
+    slots = asyncio.Semaphore(max_concurrency or DEFAULT_MAX_CONCURRENCY)
+
+    async def convert():
+        if screenshots is not None:
+            return None
+        if is_pdf:
+            return file_path
+        try:
+            pdf_path = await run_io(convert_pptx_to_pdf, file_path, output_folder)
+        except Exception as e:
+            # Without screenshots the text and local checkers still run
+            print(f"Error converting {file_path} to PDF: {e}")
+            errors.append(CheckerError(checker='convert', error_type=type(e).__name__, message=str(e)))
+            return None
+        if not os.path.exists(pdf_path):
+            # LibreOffice failed (the error is printed by `convert_pptx_to_pdf`)
+            errors.append(CheckerError(checker='convert', error_type='FileNotFoundError', message=f"{pdf_path} was not written"))
+            return None
+        return pdf_path
+
+    opened_docs = [pdf_doc] if is_pdf else []
+    async def open_pdf(pdf_path):
+        if pdf_path is None:
+            return None
+        if is_pdf:
+            return pdf_doc
+        try:
+            opened_docs.append(await run_io(fitz.open, pdf_path))
+        except Exception as e:
+            # A missing or unreadable PDF only means no screenshots
+            print(f"Error opening {pdf_path}: {e}")
+            errors.append(CheckerError(checker='convert', error_type=type(e).__name__, message=str(e)))
+            return None
+        return opened_docs[-1]
+
+    def render(page_num):
+        async def render_stage(doc, *previous_page):
+            if screenshots is not None:
+                return screenshots.get(str(page_num))
+            if doc is None or page_num >= doc.page_count:
+                return None
+            try:
+                return await run_io(render_page, doc, page_num, output_folder)
+            except Exception as e:
+                # Only this slide's screenshot checkers are skipped
+                print(f"Error rendering slide {page_num}: {e}")
+                errors.append(CheckerError(checker='render', page_id=page_num, error_type=type(e).__name__, message=str(e)))
+                return None
+        return render_stage
+
+    # Issues are validated (and embedded) as soon as their checker stage returns
+    backend = resolve_embedding_backend(config, client, MODEL_EMBED)
+    validator = IssueValidator(client, MODEL_VALIDATE, backend.model, embedder=backend.embedder, memory=memory,
+                               on_embedded=deduplicate_as_validated(backend, on_dedup))
+    checks_done = []
+
+    def check(checker, page_id, tasks_for):
+        index = len(check_stages)
+        async def check_stage(*inputs):
+            issues = await gather_isolated([(checker, page_id, task) for task in tasks_for(*inputs)], errors, slots)
+            validator.submit(index, issues)
+            checks_done.append(index)
+            if on_progress is not None:
+                on_progress(len(checks_done), len(check_stages))
+            return issues
+        return check_stage
+
+    graph.add("convert", convert)
+    graph.add("open_pdf", open_pdf, deps=["convert"])
+    check_stages = []
+    previous_render = []
+    for slide_key in slides_content:
+        # PyMuPDF documents must not be used from several threads at once, so pages render one after another
+        previous_render = [graph.add(f"render:{slide_key}", render(int(slide_key)), deps=["open_pdf"] + previous_render)]
+        for checker in config['checkers']:
+            name = f"check:{checker['name']}:{slide_key}"
+            if resolve_checker(checker).needs_image:
+                deps = [f"render:{slide_key}"]
+                tasks_for = lambda image_path, checker=checker, slide_key=slide_key: build_checker_tasks(
+                    client, checker, user_context, slide_key, None, image_path, slide_models, store, deck_id, file_path)
+            else:
+                deps = []
+                tasks_for = lambda checker=checker, slide_key=slide_key: build_checker_tasks(
+                    client, checker, user_context, slide_key, slides_content[slide_key], None, slide_models, store, deck_id, file_path)
+            check_stages.append(graph.add(name, check(checker, int(slide_key), tasks_for), deps=deps))
+    for checker in config['checkers']:
+        if 'deck' in resolve_checker(checker).inputs and slide_models:
+            tasks_for = lambda checker=checker: build_deck_checker_tasks(checker, user_context, slide_models, store, deck_id, file_path)
+            check_stages.append(graph.add(f"check:{checker['name']}:deck", check(checker, None, tasks_for)))
+
+    async def validate(*results):
+        return await validator.finish()
+
+    async def deduplicate(validated):
+        valid_issues, embeddings = validated
+        return await run_io(finalize_issues, client, validator.raw_issue_count, valid_issues, embeddings, backend, dedup_method(config))
+
+    graph.add("validate", validate, deps=check_stages)
+    graph.add("dedup", deduplicate, deps=["validate"])
+
+    validator.start()
+    try:
+        results = await graph.run()
+    except BaseException:
+        validator.cancel()
+        raise
+    finally:
+        for doc in opened_docs:
+            doc.close()
+    print(graph.report())
+    if errors:
+        print(f"Failed checker tasks: {len(errors)}")
+    if stage_times is not None:
+        stage_times.update(extract=extract_seconds, **graph.stage_times())
+
+    screenshots = {
+        slide_key: results[f"render:{slide_key}"] for slide_key in slides_content
+        if results[f"render:{slide_key}"] is not None
+    }
+    return results["dedup"], screenshots, errors
@@ -1,4 +1,7 @@
 from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+from pptx.enum.dml import MSO_COLOR_TYPE
+from .models import ChartAxisData, ChartSeriesData, ChartData, TableData, TextRunData, ShapeData, SlideModel
 
 def extract_text_from_pptx(file: str, include_title_prefix: bool = False) -> dict[str, str]:
     prs = Presentation(file)
@@ -23,3 +26,176 @@ def extract_text_from_pptx(file: str, include_title_prefix: bool = False) -> dic
         slides_content[str(slide_index)] = content  # Slide index as key (0-based)
     
     return slides_content
+
+
+def iter_shapes(shapes):
+    """Iterate over shapes, descending into group shapes."""
+    for shape in shapes:
+        if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+            yield from iter_shapes(shape.shapes)
+        else:
+            yield shape
+
+
+def _text_of(title) -> str | None:
+    # Chart and axis titles only carry text when they have a rich text frame
+    if title.has_text_frame and title.text_frame.text.strip():
+        return title.text_frame.text.strip()
+    return None
+
+
+def _extract_chart(shape) -> ChartData:
+    chart = shape.chart
+
+    series = []
+    for plot in chart.plots:
+        for ser in plot.series:
+            format_code = ser._element.xpath('./c:val/c:numRef/c:numCache/c:formatCode')
+            series.append(ChartSeriesData(
+                name=ser.name or "",
+                values=list(ser.values),
+                number_format=format_code[0].text if format_code else None
+            ))
+
+    axes = []
+    for kind in ('category', 'value'):
+        try:
+            axis = getattr(chart, f"{kind}_axis")
+        except ValueError:
+            # Charts like pie and doughnut have no axes
+            continue
+        axes.append(ChartAxisData(
+            kind=kind,
+            title=_text_of(axis.axis_title) if axis.has_title else None,
+            number_format=None if axis.tick_labels.number_format_is_linked else axis.tick_labels.number_format
+        ))
+
+    return ChartData(
+        shape_name=shape.name,
+        chart_type=chart.chart_type.name if chart.chart_type is not None else "UNKNOWN",
+        title=_text_of(chart.chart_title) if chart.has_title else None,
+        categories=[str(c) for c in chart.plots[0].categories] if len(chart.plots) else [],
+        series=series,
+        axes=axes
+    )
+
+
+def _extract_table(shape) -> TableData:
+    return TableData(
+        shape_name=shape.name,
+        cells=[[cell.text for cell in row.cells] for row in shape.table.rows],
+        alignments=[
+            [cell.text_frame.paragraphs[0].alignment.name if cell.text_frame.paragraphs[0].alignment is not None else None
+             for cell in row.cells]
+            for row in shape.table.rows
+        ]
+    )
+
+
+def _font_color(font) -> str | None:
+    color = font.color
+    if color.type is None:
+        return None
+    if color.type == MSO_COLOR_TYPE.RGB:
+        return str(color.rgb)
+    if color.type == MSO_COLOR_TYPE.SCHEME:
+        return f"theme:{color.theme_color.name}"
+    return None
+
+
+def _extract_runs(text_frame) -> list[TextRunData]:
+    return [
+        TextRunData(
+            text=run.text,
+            paragraph_index=paragraph_index,
+            run_index=run_index,
+            font_name=run.font.name,
+            size_pt=run.font.size.pt if run.font.size is not None else None,
+            color=_font_color(run.font),
+            bold=run.font.bold
+        )
+        for paragraph_index, paragraph in enumerate(text_frame.paragraphs)
+        for run_index, run in enumerate(paragraph.runs)
+    ]
+
+
+def _extract_shape(shape, slide) -> ShapeData:
+    placeholder_type, layout_prompt_text = None, None
+    if shape.is_placeholder:
+        placeholder_type = shape.placeholder_format.type.name if shape.placeholder_format.type is not None else None
+        layout_placeholder = slide.slide_layout.placeholders.get(idx=shape.placeholder_format.idx)
+        if layout_placeholder is not None and layout_placeholder.has_text_frame:
+            layout_prompt_text = layout_placeholder.text_frame.text.strip() or None
+
+    text = shape.text_frame.text if shape.has_text_frame else None
+    # Unfilled placeholders (eg, an empty picture placeholder) are plain SlidePlaceholder objects
+    has_visual = (getattr(shape, 'has_chart', False) and shape.has_chart) \
+        or (getattr(shape, 'has_table', False) and shape.has_table) \
+        or shape.shape_type in (MSO_SHAPE_TYPE.PICTURE, MSO_SHAPE_TYPE.LINKED_PICTURE, MSO_SHAPE_TYPE.EMBEDDED_OLE_OBJECT,
+                                MSO_SHAPE_TYPE.LINKED_OLE_OBJECT, MSO_SHAPE_TYPE.MEDIA, MSO_SHAPE_TYPE.DIAGRAM) \
+        or type(shape).__name__ == 'PlaceholderPicture'
+
+    return ShapeData(
+        shape_id=shape.shape_id,
+        name=shape.name,
+        kind=shape.shape_type.name if shape.shape_type is not None else "UNKNOWN",
+        placeholder_type=placeholder_type,
+        left=shape.left or 0,
+        top=shape.top or 0,
+        width=shape.width or 0,
+        height=shape.height or 0,
+        text=text,
+        has_content=bool(has_visual or (text and text.strip())),
+        layout_prompt_text=layout_prompt_text,
+        runs=_extract_runs(shape.text_frame) if shape.has_text_frame else []
+    )
+
+
+def extract_slide_models_from_pptx(file: str) -> dict[str, SlideModel]:
+    """
+    Extract the native content of each slide: text, chart data and table cells.
+
+    Args:
+    file (str): The path to the .pptx file.
+
+    Returns:
+    dict[str, SlideModel]: Slide models keyed by the slide index (0-based), same keys as `extract_text_from_pptx`.
+    """
+    return slide_models_from_presentation(Presentation(file))
+
+
+def slide_models_from_presentation(prs) -> dict[str, SlideModel]:
+    """Same as `extract_slide_models_from_pptx`, for an already opened (and possibly edited) Presentation."""
+    slide_models = {}
+    for slide_index, slide in enumerate(prs.slides):
+        texts, charts, tables, shapes = [], [], [], []
+        opaque_visual_count = 0
+        for shape in iter_shapes(slide.shapes):
+            shapes.append(_extract_shape(shape, slide))
+            if shape.has_text_frame:
+                texts.append(shape.text)
+            if getattr(shape, 'has_chart', False) and shape.has_chart:
+                charts.append(_extract_chart(shape))
+            elif getattr(shape, 'has_table', False) and shape.has_table:
+                tables.append(_extract_table(shape))
+            elif shape.shape_type in (MSO_SHAPE_TYPE.PICTURE, MSO_SHAPE_TYPE.EMBEDDED_OLE_OBJECT,
+                                      MSO_SHAPE_TYPE.LINKED_OLE_OBJECT, MSO_SHAPE_TYPE.LINKED_PICTURE,
+                                      MSO_SHAPE_TYPE.MEDIA, MSO_SHAPE_TYPE.DIAGRAM):
+                opaque_visual_count += 1
+            elif shape.is_placeholder and shape.placeholder_format.type is not None \
+                    and shape.placeholder_format.type.name == 'PICTURE' and not shape.has_text_frame:
+                # Filled picture placeholders report PLACEHOLDER as their shape type
+                opaque_visual_count += 1
+
+        slide_models[str(slide_index)] = SlideModel(
+            slide_index=slide_index,
+            text="\n".join(texts),
+            charts=charts,
+            tables=tables,
+            opaque_visual_count=opaque_visual_count,
+            shapes=shapes,
+            slide_width=prs.slide_width,
+            slide_height=prs.slide_height
+        )
+
+    return slide_models
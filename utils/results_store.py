@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import sqlite3
+from typing import List
+from .models import DetectedIssue
+
+
+def hash_text(text: str) -> str:
+    """Content hash of a text (eg, slide text or a serialized slide model)."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def hash_file(path: str) -> str:
+    """Content hash of a file (eg, a slide screenshot)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_config(checker: dict, user_context: str) -> str:
+    """Hash of everything besides the slide that changes a checker's output: its config and the user context."""
+    return hash_text(json.dumps({"checker": checker, "user_context": user_context}, sort_keys=True, default=str))
+
+
+class ResultsStore:
+    """
+    SQLite-backed store of checker results, keyed by deck, slide content, checker, checker config and model.
+
+    A checker×slide pair whose inputs did not change since the last run can be answered from the store
+    instead of calling the model again.
+    """
+
+    def __init__(self, path: str = 'data_cache/results.sqlite'):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                deck_id TEXT NOT NULL,
+                slide_hash TEXT NOT NULL,
+                checker_name TEXT NOT NULL,
+                config_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                issues TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (deck_id, slide_hash, checker_name, config_hash, model)
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, deck_id: str, slide_hash: str, checker_name: str, config_hash: str, model: str,
+            page_id: int | None, file: str) -> List[DetectedIssue] | None:
+        """
+        Look up the stored issues of a checker×slide pair.
+
+        Args:
+            page_id (int | None): The current page number of the slide, stored issues are moved to it if the slide moved.
+                None for deck-level checkers, whose issues keep their own page numbers.
+            file (str): The current file path, stored issues are updated to it.
+
+        Returns:
+            List[DetectedIssue] | None: The stored issues, or None if the pair has not been checked yet.
+        """
+        row = self.conn.execute(
+            "SELECT issues FROM results WHERE deck_id=? AND slide_hash=? AND checker_name=? AND config_hash=? AND model=?",
+            (deck_id, slide_hash, checker_name, config_hash, model)
+        ).fetchone()
+        if row is None:
+            return None
+        return [
+            DetectedIssue.model_validate({**issue, "file": file, **({"page_id": page_id} if page_id is not None else {})})
+            for issue in json.loads(row[0])
+        ]
+
+    def put(self, deck_id: str, slide_hash: str, checker_name: str, config_hash: str, model: str,
+            issues: List[DetectedIssue]) -> None:
+        """Store the issues of a checker×slide pair, replacing any previous result."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results (deck_id, slide_hash, checker_name, config_hash, model, issues) VALUES (?, ?, ?, ?, ?, ?)",
+            (deck_id, slide_hash, checker_name, config_hash, model,
+             json.dumps([issue.model_dump(mode='json') for issue in issues]))
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
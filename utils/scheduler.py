@@ -0,0 +1,119 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from .tracing import span
+
+
+class StageGraph:
+    """
+    A small dependency graph of async stages.
+
+    Every stage starts as soon as all of its dependencies have finished, so independent branches
+    (eg, text checkers and rendering) overlap and the end-to-end time is the slowest branch, not the
+    sum of all phases. Start and end times are recorded to report the critical path.
+
+    Example:
+        graph = StageGraph()
+        graph.add("convert", convert_pdf)
+        graph.add("render:0", lambda pdf: render(pdf, 0), deps=["convert"])
+        results = await graph.run()
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Tuple[Callable[..., Awaitable[Any]], List[str]]] = {}
+        self.started: Dict[str, float] = {}
+        self.finished: Dict[str, float] = {}
+        self.origin: float | None = None
+
+    def add(self, name: str, fn: Callable[..., Awaitable[Any]], deps: List[str] | None = None) -> str:
+        """
+        Add a stage.
+
+        Args:
+            name (str): The unique name of the stage.
+            fn (Callable[..., Awaitable[Any]]): An async function called with the results of `deps`, in order.
+            deps (List[str] | None): The stages that must finish first. They must be added before `run`.
+
+        Returns:
+            str: The stage name, for use in other stages' `deps`.
+        """
+        if name in self.stages:
+            raise ValueError(f"Stage {name} already exists")
+        self.stages[name] = (fn, list(deps or []))
+        return name
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Run all stages, each as soon as its dependencies finish.
+
+        Returns:
+            Dict[str, Any]: The result of each stage. If a stage fails, the remaining stages are cancelled and the error is raised.
+        """
+        for name, (_, deps) in self.stages.items():
+            missing = [dep for dep in deps if dep not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {name} depends on unknown stages: {missing}")
+
+        self.origin = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(name: str):
+            fn, deps = self.stages[name]
+            inputs = [await tasks[dep] for dep in deps]
+            self.started[name] = time.perf_counter() - self.origin
+            try:
+                with span(f"stage:{name.split(':')[0]}", stage=name):
+                    return await fn(*inputs)
+            finally:
+                self.finished[name] = time.perf_counter() - self.origin
+
+        # Create all tasks first so every stage can await its dependencies
+        for name in self.stages:
+            tasks[name] = asyncio.ensure_future(run_stage(name))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return {name: task.result() for name, task in tasks.items()}
+
+    def critical_path(self) -> List[str]:
+        """
+        The chain of stages that determined the end-to-end time: starting from the stage that finished last,
+        repeatedly step to the dependency that finished last.
+
+        Returns:
+            List[str]: The stage names from the first to the last stage of the path.
+        """
+        if not self.finished:
+            return []
+        path = [max(self.finished, key=self.finished.get)]
+        while True:
+            deps = [dep for dep in self.stages[path[-1]][1] if dep in self.finished]
+            if not deps:
+                break
+            path.append(max(deps, key=self.finished.get))
+        return path[::-1]
+
+    def report(self) -> str:
+        """A printable summary: the total time, the critical path and the busiest stage kinds."""
+        if not self.finished:
+            return "No stages have run"
+        lines = [f"Total time: {max(self.finished.values()):.2f}s over {len(self.finished)} stages", "Critical path:"]
+        for name in self.critical_path():
+            lines.append(f"  {name}: {self.started[name]:.2f}s → {self.finished[name]:.2f}s ({self.finished[name] - self.started[name]:.2f}s)")
+
+        kinds = self.stage_times()
+        lines.append("Time per stage kind: " + ", ".join(f"{kind} {seconds:.2f}s" for kind, seconds in sorted(kinds.items(), key=lambda item: -item[1])))
+        return "\n".join(lines)
+
+    def stage_times(self) -> Dict[str, float]:
+        """The seconds spent per stage kind (stage names are 'kind:detail'), summed over concurrent stages."""
+        kinds: Dict[str, float] = {}
+        for name in self.finished:
+            kind = name.split(':')[0]
+            kinds[kind] = kinds.get(kind, 0.0) + self.finished[name] - self.started[name]
+        return kinds
@@ -1,8 +1,16 @@
 import os
 import subprocess
+import threading
 import fitz  # PyMuPDF
 import json
 
+from .tracing import traced
+
+# soffice instances sharing the default user profile fail when they run at the same time, so the
+# conversions of concurrent jobs in this process run one after another
+SOFFICE_LOCK = threading.Lock()
+
+@traced("libreoffice_convert")
 def convert_pptx_to_pdf(pptx_path, output_folder):
     # Check if LibreOffice is installed
     libreoffice_path = '/Applications/LibreOffice.app/Contents/MacOS/soffice'
@@ -23,46 +31,52 @@ def convert_pptx_to_pdf(pptx_path, output_folder):
     ]
 
     try:
-        subprocess.run(command, check=True)
+        with SOFFICE_LOCK:
+            subprocess.run(command, check=True)
         print(f"Converted {pptx_path} to PDF successfully.")
     except subprocess.CalledProcessError as e:
         print(f"An error occurred while converting the file: {e}")
 
-def pdf_to_images(pdf_path, output_folder):
+    # Path of the converted PDF
+    return os.path.join(output_folder, os.path.splitext(os.path.basename(pptx_path))[0] + '.pdf')
+
+@traced("render_page")
+def render_page(doc, page_num, output_folder):
+    page = doc.load_page(page_num)  # Load the page
+    pix = page.get_pixmap()         # Render page to an image
+
+    # Define output path for the image
+    img_path = os.path.join(output_folder, f"page_{page_num + 1}.png")
+    pix.save(img_path)  # Save the image as PNG
+    print(f"Saved: {img_path}")
+    return img_path
+
+def save_page_images(doc, output_folder):
     # Ensure the output folder exists
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
-    # Open the PDF
-    doc = fitz.open(pdf_path)
-
     # Dictionary to store slide ID and image paths
     slide_images = {}
 
     # Iterate through each page
     for page_num in range(doc.page_count):
-        page = doc.load_page(page_num)  # Load the page
-        pix = page.get_pixmap()         # Render page to an image
-
-        # Define output path for the image
-        img_path = os.path.join(output_folder, f"page_{page_num + 1}.png")
-        pix.save(img_path)  # Save the image as PNG
-        print(f"Saved: {img_path}")
-
         # Store in the dictionary with slide ID as key
-        slide_images[page_num] = img_path
+        slide_images[page_num] = render_page(doc, page_num, output_folder)
 
     print(f"All pages saved as images in {output_folder}")
     
     return slide_images
 
+def pdf_to_images(pdf_path, output_folder):
+    # Open the PDF
+    with fitz.open(pdf_path) as doc:
+        return save_page_images(doc, output_folder)
+
 # Combined function to handle both conversions
 def convert_pptx_to_images(pptx_file, output_folder):
     # Convert PPTX to PDF
-    convert_pptx_to_pdf(pptx_file, output_folder)
-    
-    # Get the name of the converted PDF
-    pdf_path = os.path.join(output_folder, os.path.splitext(os.path.basename(pptx_file))[0] + '.pdf')
+    pdf_path = convert_pptx_to_pdf(pptx_file, output_folder)
     
     # Convert PDF to images and return slide images as a dictionary
     slide_images = pdf_to_images(pdf_path, output_folder)
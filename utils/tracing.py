@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import asyncio
+import functools
+import threading
+import contextvars
+from datetime import datetime
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List
+
+# The tracer of the current run (None: tracing is off) and the innermost open span. Context variables follow
+# asyncio tasks (and `run_io` threads), so concurrent runs trace into their own files and spans nest per task.
+_tracer: contextvars.ContextVar = contextvars.ContextVar('tracer', default=None)
+_current_span: contextvars.ContextVar = contextvars.ContextVar('current_span', default=None)
+
+
+class Span:
+    """A timed, named piece of work with attributes (eg model, bytes, cache hit), nested in the span open when it started."""
+
+    __slots__ = ('tracer', 'name', 'attributes', 'span_id', 'parent', 'lane', 'start', 'end', 'token')
+
+    def __init__(self, tracer: 'Tracer', name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> 'Span':
+        self.parent = _current_span.get()
+        self.span_id, self.lane = self.tracer.register()
+        self.token = _current_span.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.attributes['error'] = exc_type.__name__
+        _current_span.reset(self.token)
+        self.tracer.finish(self)
+        return False
+
+
+class NoopSpan:
+    """What `span` returns when tracing is off: does nothing, so instrumented code costs a context variable lookup."""
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def __enter__(self) -> 'NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class Tracer:
+    """Collects the finished spans of a run and exports them as a Chrome trace (chrome://tracing, Perfetto)."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans: List[Span] = []
+        self.lanes: Dict[Any, int] = {}
+        self.next_id = 0
+        self.lock = threading.Lock()
+
+    def register(self) -> tuple[int, int]:
+        """A new span id, and the lane (trace row) of the calling asyncio task or thread."""
+        try:
+            owner = ('task', id(asyncio.current_task()))
+        except RuntimeError:
+            owner = ('thread', threading.get_ident())
+        with self.lock:
+            self.next_id += 1
+            lane = self.lanes.setdefault(owner, len(self.lanes) + 1)
+            return self.next_id, lane
+
+    def finish(self, span: Span) -> None:
+        with self.lock:
+            self.spans.append(span)
+
+    def totals(self) -> Dict[str, tuple[int, float]]:
+        """The number of spans and their summed seconds, per span name."""
+        totals: Dict[str, tuple[int, float]] = {}
+        for span in self.spans:
+            count, seconds = totals.get(span.name, (0, 0.0))
+            totals[span.name] = (count + 1, seconds + span.end - span.start)
+        return totals
+
+    def export(self, path: str) -> None:
+        """Write the spans as Chrome trace events, with their attributes, ids and parent ids as args."""
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        pid = os.getpid()
+        events = [
+            {
+                'name': span.name, 'cat': span.name.split(':')[0], 'ph': 'X', 'pid': pid, 'tid': span.lane,
+                'ts': round((span.start - self.origin) * 1e6, 1), 'dur': round((span.end - span.start) * 1e6, 1),
+                'args': {**span.attributes, 'span_id': span.span_id, 'parent_id': span.parent.span_id if span.parent is not None else None},
+            }
+            for span in self.spans
+        ]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, default=str)
+
+
+def span(name: str, **attributes) -> Span | NoopSpan:
+    """
+    Open a span (as a context manager) in the current trace, a no-op when tracing is off.
+
+    Example:
+        with span("api", model=model) as api_span:
+            response = await call()
+            api_span.set(completion_tokens=response.usage.completion_tokens)
+    """
+    tracer = _tracer.get()
+    if tracer is None:
+        return NOOP_SPAN
+    return Span(tracer, name, attributes)
+
+
+def is_tracing() -> bool:
+    """Whether the current run is traced, to skip computing costly attributes otherwise."""
+    return _tracer.get() is not None
+
+
+def annotate(**attributes) -> None:
+    """Set attributes on the innermost open span, if any."""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+def count(attribute: str) -> int:
+    """Increment a counter attribute of the innermost open span (eg API attempts) and return it, 0 when tracing is off."""
+    current = _current_span.get()
+    if current is None:
+        return 0
+    current.attributes[attribute] = current.attributes.get(attribute, 0) + 1
+    return current.attributes[attribute]
+
+
+def traced(name: str) -> Callable:
+    """Decorate a function (sync or async) to run in a span of that name."""
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_path(config: Dict, name: str) -> str | None:
+    """
+    Where to export the trace of a run named `name` (eg the deck) per the `tracing` config section, None if tracing is off.
+    """
+    settings = (config or {}).get('tracing', {})
+    if not settings.get('enabled'):
+        return None
+    name = os.path.splitext(os.path.basename(name))[0]
+    return os.path.join(settings.get('folder', 'data_traces'), f"{datetime.now():%Y%m%d-%H%M%S}-{name}.json")
+
+
+@contextmanager
+def tracing(path: str | None):
+    """
+    Trace everything run inside the block (including tasks and `run_io` threads started from it) and export
+    it to `path` as a Chrome trace at the end. With `path` None, tracing stays off.
+
+    Yields:
+        Tracer | None: The tracer, eg to read `totals()`.
+    """
+    if path is None:
+        yield None
+        return
+    tracer = Tracer()
+    token = _tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _tracer.reset(token)
+        tracer.export(path)
+        slowest = sorted(tracer.totals().items(), key=lambda item: -item[1][1])[:8]
+        print(f"Trace saved to {path}: " + ", ".join(f"{name} {seconds:.2f}s ({count}x)" for name, (count, seconds) in slowest))
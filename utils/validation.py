@@ -0,0 +1,344 @@
+import asyncio
+from typing import Any, Callable, List, Tuple
+from .client import MistralClientWrapper
+from .models import DetectedIssue, IsValidIssue, IssueVerdictList
+from .executors import run_io
+from .deduplication import LexicalIndex
+from .tracing import annotate, traced
+
+# Rough token estimate for batching: ~4 characters per token plus the id and quoting around each description
+CHARS_PER_TOKEN = 4
+TOKENS_PER_ITEM = 10
+DEFAULT_TOKEN_BUDGET = 3000
+MAX_BATCH_SIZE = 50
+
+
+async def validate_issue_description(client: MistralClientWrapper, model:str, issue_description: str) -> bool:
+    """
+    Validate that the issue description is not useless using Mistral small model.
+
+    Args:
+        client (MistralClientWrapper): The Mistral client wrapper.
+        issue_description (str): The issue description to validate.
+
+    Returns:
+        bool: True if the description is valid, False otherwise.
+    """
+    
+    system_prompt = """
+    Your task is to determine if an issue description for a presentation slide is useful or not.
+    A useful description should be specific, actionable, and provide clear information about what needs to be fixed.
+    Example of invalid description 
+    Respond with only 'true' if the description is useful, or 'false' if it's not.
+    """
+    
+    user_prompt = f"Is this  description useful? '{issue_description}'"
+    
+    messages = client.build_messages(system_prompt=system_prompt, user_prompt=user_prompt)
+    
+    try:
+        result = await client.complete_with_retry(
+            model=model,
+            messages=messages,
+            ResponseModel=IsValidIssue
+        )
+        return result.is_valid
+    except Exception as e:
+        print(f"Error validating issue description: {e}")
+        return False  # Assume invalid if there's an error
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + TOKENS_PER_ITEM
+
+
+def batch_by_token_budget(descriptions: List[str], token_budget: int = DEFAULT_TOKEN_BUDGET, max_batch_size: int = MAX_BATCH_SIZE) -> List[List[int]]:
+    """
+    Split descriptions into batches whose estimated size fits the token budget.
+
+    Args:
+        descriptions (List[str]): The issue descriptions.
+        token_budget (int): The maximum estimated tokens of the descriptions in one request.
+        max_batch_size (int): The maximum number of descriptions in one request.
+
+    Returns:
+        List[List[int]]: The indices of the descriptions in each batch, in order. A description larger
+            than the budget gets a batch of its own.
+    """
+    batches, batch, batch_tokens = [], [], 0
+    for index, description in enumerate(descriptions):
+        tokens = estimate_tokens(description)
+        if batch and (batch_tokens + tokens > token_budget or len(batch) >= max_batch_size):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(index)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+@traced("validate_batch")
+async def validate_issue_descriptions(client: MistralClientWrapper, model: str, issue_descriptions: List[str]) -> List[bool]:
+    """
+    Validate several issue descriptions in one structured request.
+
+    Each description is sent with an id and the verdicts are mapped back by id. Descriptions the model
+    skipped are validated one by one with `validate_issue_description`.
+
+    Args:
+        client (MistralClientWrapper): The Mistral client wrapper.
+        issue_descriptions (List[str]): The issue descriptions to validate, one batch.
+
+    Returns:
+        List[bool]: The verdict for each description, in order. All False if the request fails.
+    """
+    annotate(issues=len(issue_descriptions))
+    if len(issue_descriptions) == 1:
+        return [await validate_issue_description(client, model, issue_descriptions[0])]
+
+    system_prompt = """
+    Your task is to determine for each issue description for a presentation slide if it is useful or not.
+    A useful description should be specific, actionable, and provide clear information about what needs to be fixed.
+    Return exactly one verdict for each issue id.
+    """
+
+    numbered = "\n".join(f"{issue_id}. '{description}'" for issue_id, description in enumerate(issue_descriptions))
+    user_prompt = f"Are these descriptions useful?\n{numbered}"
+
+    messages = client.build_messages(system_prompt=system_prompt, user_prompt=user_prompt)
+
+    try:
+        result = await client.complete_with_retry(
+            model=model,
+            messages=messages,
+            ResponseModel=IssueVerdictList
+        )
+    except Exception as e:
+        print(f"Error validating issue descriptions: {e}")
+        return [False] * len(issue_descriptions)  # Assume invalid if there's an error
+
+    verdicts = {verdict.issue_id: verdict.is_valid for verdict in result.verdicts if 0 <= verdict.issue_id < len(issue_descriptions)}
+    missing = [issue_id for issue_id in range(len(issue_descriptions)) if issue_id not in verdicts]
+    if missing:
+        retried = await asyncio.gather(*[validate_issue_description(client, model, issue_descriptions[issue_id]) for issue_id in missing])
+        verdicts.update(zip(missing, retried))
+    return [verdicts[issue_id] for issue_id in range(len(issue_descriptions))]
+
+
+async def validate_issues_batched(client: MistralClientWrapper, model: str, issues: List[DetectedIssue], token_budget: int = DEFAULT_TOKEN_BUDGET) -> List[bool]:
+    """Validate issues in as few requests as the token budget allows, see `validate_issue_descriptions`."""
+    descriptions = [issue.extracted_issue.issue_description for issue in issues]
+    batches = batch_by_token_budget(descriptions, token_budget)
+    results = await asyncio.gather(*[
+        validate_issue_descriptions(client, model, [descriptions[index] for index in batch]) for batch in batches
+    ])
+    is_valid = [False] * len(issues)
+    for batch, verdicts in zip(batches, results):
+        for index, verdict in zip(batch, verdicts):
+            is_valid[index] = verdict
+    return is_valid
+
+
+class IssueValidator:
+    """
+    Validates issues as soon as their checker returns, instead of waiting for all checkers.
+
+    Issues of local checks (see `DetectedIssue.local`) are deterministic: they skip validation and are only
+    embedded. The other issues are pushed onto an async queue. A single dispatcher collects them into a batch until the token
+    budget is full or `linger` seconds have passed since the batch's first issue, waits for one of the
+    `concurrency` request slots, adds whatever arrived meanwhile and validates the batch in one request.
+    Once `finish` is called no more issues can arrive, so the last batch is sent without lingering.
+    Valid issues are embedded in micro-batches while the rest of the run continues, so that deduplication
+    at the end only has to compare the ready embeddings. Near-identical descriptions (see `LexicalIndex`)
+    are embedded once and share that embedding. `on_embedded` is called with each embedded micro-batch, eg to
+    show the deduplicated issues while the run goes on.
+
+    Example:
+        validator = IssueValidator(client, "mistral-small-latest", "mistral-embed")
+        validator.start()
+        validator.submit(0, issues_from_first_checker)
+        valid_issues, embeddings = await validator.finish()
+    """
+
+    def __init__(self, client: MistralClientWrapper, model: str, embed_model: str, concurrency: int = 8, embed_batch_size: int = 16,
+                 token_budget: int = DEFAULT_TOKEN_BUDGET, linger: float = 0.5, embedder: Any = None, memory: Any = None, lexical: bool = True,
+                 on_embedded: Callable[[List[DetectedIssue], list], None] | None = None):
+        self.client = client
+        # Anything with `get_embeddings`, the client by default (see `utils.embeddings`)
+        self.embedder = embedder or client
+        # An `IssueMemory`: issues matching a dismissed one are dropped before validation
+        self.memory = memory
+        self.model = model
+        self.embed_model = embed_model
+        self.concurrency = concurrency
+        self.embed_batch_size = embed_batch_size
+        self.token_budget = token_budget
+        self.linger = linger
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.raw_issue_count = 0
+        self.workers: List[asyncio.Task] = []
+        self.slots: asyncio.Semaphore | None = None
+        self.flushing: asyncio.Event | None = None
+        self.requests: set[asyncio.Task] = set()
+        self.embed_tasks: List[asyncio.Task] = []
+        self.pending: List[Tuple[Any, DetectedIssue]] = []
+        self.embedding: List[List[Tuple[Any, DetectedIssue]]] = []
+        self.embedding_failed = False
+        self.lexical = LexicalIndex() if lexical else None
+        self.on_embedded = on_embedded
+        # The embedding of each lexical group, a future while its first description is being embedded
+        self.group_embeddings: dict = {}
+        self.validated: List[Tuple[Any, DetectedIssue, Any]] = []
+
+    def start(self) -> None:
+        self.slots = asyncio.Semaphore(self.concurrency)
+        self.flushing = asyncio.Event()
+        self.workers = [asyncio.create_task(self._dispatch())]
+
+    def submit(self, key: Any, issues: List[DetectedIssue]) -> None:
+        """
+        Queue the issues of one checker task for validation.
+
+        Args:
+            key (Any): A sortable key of the checker task (eg, its index), the final order follows it so the
+                results do not depend on which checker finished first.
+            issues (List[DetectedIssue]): The issues returned by the checker.
+        """
+        self.raw_issue_count += len(issues)
+        if self.memory is not None:
+            issues = self.memory.suppress(issues)
+        for position, issue in enumerate(issues):
+            if issue.local:
+                self.pending.append(((key, position), issue))
+            else:
+                self.queue.put_nowait(((key, position), issue))
+        if len(self.pending) >= self.embed_batch_size:
+            self._flush()
+
+    def _take(self, batch: list, batch_tokens: int) -> int:
+        """Move queued issues into the batch while it fits into one request, return its tokens."""
+        while not self.queue.empty() and len(batch) < MAX_BATCH_SIZE and batch_tokens < self.token_budget:
+            key, issue = self.queue.get_nowait()
+            batch.append((key, issue))
+            batch_tokens += estimate_tokens(issue.extracted_issue.issue_description)
+        return batch_tokens
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            batch_tokens = estimate_tokens(batch[0][1].extracted_issue.issue_description)
+            # Give the other checkers until the linger time runs out to add to the batch
+            deadline = loop.time() + self.linger
+            batch_tokens = self._take(batch, batch_tokens)
+            while len(batch) < MAX_BATCH_SIZE and batch_tokens < self.token_budget and loop.time() < deadline:
+                item = await self._next(deadline - loop.time())
+                if item is None:
+                    break
+                batch.append(item)
+                batch_tokens = self._take(batch, batch_tokens + estimate_tokens(item[1].extracted_issue.issue_description))
+            # While all request slots are busy, issues keep arriving: send them along
+            await self.slots.acquire()
+            self._take(batch, batch_tokens)
+            request = asyncio.create_task(self._validate(batch))
+            self.requests.add(request)
+            request.add_done_callback(self.requests.discard)
+
+    async def _next(self, timeout: float) -> Tuple[Any, DetectedIssue] | None:
+        """The next queued issue, None if none arrives within the timeout or `finish` was called."""
+        if self.flushing.is_set():
+            return None
+        get = asyncio.ensure_future(self.queue.get())
+        flush = asyncio.ensure_future(self.flushing.wait())
+        try:
+            await asyncio.wait([get, flush], timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            flush.cancel()
+            if not get.done():
+                get.cancel()
+        return get.result() if get.done() and not get.cancelled() else None
+
+    async def _validate(self, batch: List[Tuple[Any, DetectedIssue]]) -> None:
+        try:
+            verdicts = await validate_issue_descriptions(
+                self.client, self.model, [issue.extracted_issue.issue_description for _, issue in batch]
+            )
+            self.pending.extend(item for item, is_valid in zip(batch, verdicts) if is_valid)
+            if len(self.pending) >= self.embed_batch_size:
+                self._flush()
+        finally:
+            self.slots.release()
+            for _ in batch:
+                self.queue.task_done()
+
+    def _flush(self) -> None:
+        batch, self.pending = self.pending, []
+        if batch:
+            self.embedding.append(batch)
+            self.embed_tasks.append(asyncio.create_task(self._embed(batch)))
+
+    async def _embed(self, batch: List[Tuple[Any, DetectedIssue]]) -> None:
+        descriptions = [issue.extracted_issue.issue_description for _, issue in batch]
+        if self.lexical is None:
+            groups = [None] * len(batch)
+            to_embed = list(range(len(batch)))
+        else:
+            # Only the first description of each group is embedded, eg the same footer typo on every slide once
+            groups = [self.lexical.add(description) for description in descriptions]
+            to_embed = []
+            for position, group in enumerate(groups):
+                if group not in self.group_embeddings:
+                    self.group_embeddings[group] = asyncio.get_running_loop().create_future()
+                    to_embed.append(position)
+        try:
+            # get_embeddings is a blocking HTTP call, keep it off the event loop
+            embedded = await run_io(self.embedder.get_embeddings, self.embed_model, [descriptions[position] for position in to_embed]) if to_embed else []
+        except Exception as e:
+            # Keep the issues, the deduplication embeds them again
+            print(f"Error embedding issues: {e}")
+            embedded = [None] * len(to_embed)
+            self.embedding_failed = True
+        if self.lexical is None:
+            embeddings = embedded
+        else:
+            for position, embedding in zip(to_embed, embedded):
+                self.group_embeddings[groups[position]].set_result(embedding)
+            # Groups first seen in another micro-batch may still be embedding
+            embeddings = [await self.group_embeddings[group] for group in groups]
+        self.validated.extend((key, issue, embedding) for (key, issue), embedding in zip(batch, embeddings))
+        self.embedding.remove(batch)
+        if self.on_embedded is not None and all(embedding is not None for embedding in embeddings):
+            self.on_embedded([issue for _, issue in batch], embeddings)
+
+    def cancel(self) -> None:
+        """Stop the dispatcher, the validation requests and the embedding batches, eg when the run failed."""
+        for task in self.workers + list(self.requests) + self.embed_tasks:
+            task.cancel()
+
+    def partial(self) -> List[DetectedIssue]:
+        """The issues validated so far (embedded or not), in submission-key order, eg when a deadline hit."""
+        validated = [(key, issue) for key, issue, _ in self.validated] + self.pending
+        validated += [item for batch in self.embedding for item in batch]
+        return [issue for _, issue in sorted(validated, key=lambda item: item[0])]
+
+    async def finish(self) -> Tuple[List[DetectedIssue], list]:
+        """
+        Wait for all queued issues to be validated and embedded.
+
+        Returns:
+            Tuple[List[DetectedIssue], list]: The valid issues in submission-key order and their embeddings
+                (None if some embedding request failed).
+        """
+        # Send the pending batch now instead of after its linger time
+        self.flushing.set()
+        await self.queue.join()
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self._flush()
+        await asyncio.gather(*self.embed_tasks)
+
+        self.validated.sort(key=lambda item: item[0])
+        embeddings = None if self.embedding_failed else [embedding for _, _, embedding in self.validated]
+        return [issue for _, issue, _ in self.validated], embeddings
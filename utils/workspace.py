@@ -0,0 +1,120 @@
+import os
+import shutil
+import tempfile
+from typing import Dict
+
+
+class QuotaExceededError(RuntimeError):
+    """A job wrote more to its workspace than its disk quota allows."""
+
+
+def folder_size(path: str) -> int:
+    """The total size of the files below a folder, in bytes."""
+    total = 0
+    for folder, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(folder, name))
+            except OSError:
+                pass  # removed meanwhile
+    return total
+
+
+class Workspace:
+    """
+    A temporary folder of its own for one analysis job, removed when the job ends.
+
+    Concurrent jobs never share files, so one job cannot delete another's screenshots. Use it as a
+    context manager; the folder is removed on exit, whether the job succeeded or not.
+
+    Example:
+        with Workspace('data_temp', quota_mb=500) as workspace:
+            pdf_path = convert_pptx_to_pdf(pptx_path, workspace.path)
+            workspace.check_quota()
+    """
+
+    def __init__(self, root: str = 'data_temp', quota_mb: float | None = None):
+        self.root = root
+        self.quota_bytes = int(quota_mb * 1024 * 1024) if quota_mb else None
+        self.path: str | None = None
+
+    def __enter__(self) -> "Workspace":
+        os.makedirs(self.root, exist_ok=True)
+        self.path = tempfile.mkdtemp(prefix='job-', dir=self.root)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.cleanup()
+
+    def cleanup(self) -> None:
+        if self.path is not None:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self.path = None
+
+    def check_quota(self) -> None:
+        """Raise `QuotaExceededError` if the workspace holds more than its quota."""
+        if self.quota_bytes is None or self.path is None:
+            return
+        used = folder_size(self.path)
+        if used > self.quota_bytes:
+            raise QuotaExceededError(
+                f"Workspace {self.path} uses {used / 1024 / 1024:.1f} MB, over its quota of {self.quota_bytes / 1024 / 1024:.1f} MB"
+            )
+
+
+class RenderCache:
+    """
+    Slide screenshots kept across jobs, keyed by the content hash of the deck.
+
+    Re-checking an unchanged deck (eg, with another context) skips the LibreOffice conversion and the
+    rendering. Entries are written to a temporary folder and renamed into place, so a reader never sees a
+    half-written entry; the least recently used decks beyond `max_decks` are removed. Readers get copies in
+    their own folder, so an entry removed meanwhile does not pull screenshots from under a running job.
+    """
+
+    def __init__(self, root: str = 'data_cache/renders', max_decks: int = 50):
+        self.root = root
+        self.max_decks = max_decks
+        os.makedirs(root, exist_ok=True)
+
+    def get(self, deck_hash: str, destination: str) -> Dict[str, str] | None:
+        """
+        Copy the cached screenshots of a deck into `destination` (eg the job workspace).
+
+        Returns:
+            Dict[str, str] | None: The copied screenshot of each slide keyed by the slide index, None if the
+                deck is not cached (or its entry was removed while copying).
+        """
+        folder = os.path.join(self.root, deck_hash)
+        try:
+            os.utime(folder)  # mark as recently used
+            img_paths = {}
+            for name in sorted(os.listdir(folder), key=lambda name: int(os.path.splitext(name)[0])):
+                img_paths[os.path.splitext(name)[0]] = shutil.copy(os.path.join(folder, name), os.path.join(destination, f"cached-{name}"))
+            return img_paths
+        except FileNotFoundError:
+            return None
+
+    def put(self, deck_hash: str, img_paths: Dict[str, str]) -> None:
+        """Copy the screenshots of a deck (keyed by the slide index) into the cache."""
+        folder = os.path.join(self.root, deck_hash)
+        if os.path.isdir(folder) or not img_paths:
+            return
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=self.root)
+        for key, path in img_paths.items():
+            shutil.copyfile(path, os.path.join(staging, f"{key}{os.path.splitext(path)[1]}"))
+        try:
+            os.rename(staging, folder)
+        except OSError:
+            # Another job cached the same deck meanwhile
+            shutil.rmtree(staging, ignore_errors=True)
+        self._prune()
+
+    def _prune(self) -> None:
+        entries = [
+            os.path.join(self.root, name) for name in os.listdir(self.root)
+            if not name.startswith('.') and os.path.isdir(os.path.join(self.root, name))
+        ]
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for folder in entries[self.max_decks:]:
+            shutil.rmtree(folder, ignore_errors=True)